@@ -0,0 +1,95 @@
+"""Headless per-interaction rerun latency of the Streamlit dashboard.
+
+Drives ``interface/streamlit_app.py`` with Streamlit's ``AppTest`` through a
+fixed script of interactions (open the app, move the row slider, pick a
+region, change the sensitivity map and the optimization goal) and times each
+rerun. With ``--baseline REF`` the same script also runs against the app as it
+was at git revision ``REF`` (e.g. the version that drew all eight tabs on every
+rerun), and the two are printed side by side. The current app runs first, so only its
+``first run`` pays for loading the models and aggregates into the process-wide
+``resources`` cache.
+
+    python benchmarks/app_reruns.py --baseline HEAD~1 --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+APP = ROOT / "interface" / "streamlit_app.py"
+# Option keys of the app's Tab 6 selectboxes. ``select_index`` cannot be used on them: with a
+# ``format_func`` AppTest looks the index up among the labels and fails.
+SWEEP_OUTPUTS = ["sal_ro", "total_energy", "operational_cost"]
+OPTIMIZATION_GOALS = ["Минимизация затрат", "Минимизация энергопотребления", "Баланс затрат и энергии"]
+# (interaction, stage index, action); the action gets the repeat number so values alternate.
+SCRIPT = [
+    ("rerun", None, lambda at, i: at),
+    ("dataset rows", 0, lambda at, i: at.slider(key="dataset_rows").set_value(10 if i % 2 else 15)),
+    ("region", 1, lambda at, i: at.selectbox(key="region_select").select_index(i % 2)),
+    ("sensitivity output", 5, lambda at, i: at.selectbox(key="sweep_output").set_value(SWEEP_OUTPUTS[i % 3])),
+    ("optimization goal", 5, lambda at, i: at.selectbox(key="optimization_goal").set_value(OPTIMIZATION_GOALS[i % 3])),
+]
+
+
+def timed_run(at, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def profile(path, repeat, timeout):
+    """Median ms per interaction; switching stages is timed separately when the app has a stage selector."""
+    at = AppTest.from_file(str(path), default_timeout=timeout)
+    times = {"first run": [timed_run(at, timeout)]}
+    staged = any(radio.key == "current_tab" for radio in at.radio)
+    for i in range(1, repeat + 1):
+        for name, stage, action in SCRIPT:
+            if staged and stage is not None and at.radio(key="current_tab").value != stage:
+                at.radio(key="current_tab").set_value(stage)
+                times.setdefault("switch stage", []).append(timed_run(at, timeout))
+            action(at, i)
+            times.setdefault(name, []).append(timed_run(at, timeout))
+    return {name: statistics.median(values) for name, values in times.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=str(APP))
+    parser.add_argument("--baseline", default=None, help="git revision of the app to compare against")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds allowed per rerun")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    results = {"current": profile(args.app, args.repeat, args.timeout)}
+    if args.baseline:
+        source = subprocess.run(
+            ["git", "show", f"{args.baseline}:{APP.relative_to(ROOT).as_posix()}"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = Path(tmp) / "streamlit_app.py"
+            baseline.write_text(source)
+            results[args.baseline] = profile(baseline, args.repeat, args.timeout)
+
+    table = pd.DataFrame(results).rename_axis("interaction (median ms)")
+    if args.baseline:
+        table["speedup"] = table[args.baseline] / table["current"]
+    print(table.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Rows/sec of ``predict_batch`` against the old one-row-per-call scoring path.
+
+    python benchmarks/batch_scoring.py --rows 200000 --n-jobs 4
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from desalination import resources, scoring
+from desalination.schema import ANOMALY_MODEL_PATH, DATA_PATH, FEATURES, MODEL_PATH
+
+
+def per_row(frame, model, anomaly_model):
+    for _, row in frame.iterrows():
+        predict_input = pd.DataFrame([row[FEATURES].to_dict()])
+        anomaly_model.predict(predict_input)
+        model.predict(predict_input)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--anomaly-model", default=str(ANOMALY_MODEL_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--per-row-sample", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=scoring.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    model = resources.load_model(args.model)
+    anomaly_model = resources.load_anomaly_model(args.anomaly_model)
+    base = resources.load_dataset(args.data)
+    frame = base.iloc[np.arange(args.rows) % len(base)].reset_index(drop=True)
+
+    sample = frame.head(args.per_row_sample)
+    start = time.perf_counter()
+    per_row(sample, model, anomaly_model)
+    per_row_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    scored = scoring.predict_batch(frame, model, anomaly_model, chunk_size=args.chunk_size, n_jobs=args.n_jobs)
+    batch_rate = len(scored) / (time.perf_counter() - start)
+
+    reference = model.predict(sample[FEATURES])
+    np.testing.assert_allclose(scored[scoring.TARGETS].to_numpy()[: len(sample)], reference, rtol=1e-6)
+
+    print(f"{'path':<24}{'rows':>10}{'rows/sec':>14}")
+    print(f"{'per-row predict':<24}{len(sample):>10}{per_row_rate:>14,.0f}")
+    print(f"{'predict_batch':<24}{len(scored):>10}{batch_rate:>14,.0f}")
+    print(f"speed-up: {batch_rate / per_row_rate:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Time to first render and import-time breakdown of the dashboard in a cold interpreter.
+
+Each measurement starts a fresh Python process that renders the app once with
+Streamlit's ``AppTest`` (``first render``), which pays for the app's imports and
+model loading. ``warm-up`` and ``render after warm-up`` time
+``startup.warm_up`` followed by the first render, i.e. what the container does
+before reporting ready and what the first browser session then waits for. The
+import table is parsed from ``python -X importtime`` of the first render and
+sums cumulative time per top-level package.
+
+``server`` is a smoke run of the real entry point: ``interface/dashboard.py``
+is started as a subprocess and timed until ``/ready`` answers 200 and
+Streamlit's own ``/_stcore/health`` answers on the app port. The run fails if
+the process exits or either endpoint does not come up within ``--timeout``.
+
+With ``--baseline REF`` the same runs are repeated on the ``interface`` and
+``desalination`` trees of git revision ``REF`` (models and data are shared).
+
+    python benchmarks/cold_start.py --baseline HEAD~1 --repeat 3
+"""
+import argparse
+import io
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SHARED = ("models", "data", "output", ".cache")
+
+FIRST_RENDER = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=300)
+times = {{}}
+if {warm}:
+    from desalination import startup
+    start = time.perf_counter()
+    if not startup.warm_up(imports=()):
+        raise SystemExit(startup.status()["error"])
+    times["warm-up"] = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+at.run()
+times["render after warm-up" if {warm} else "first render"] = (time.perf_counter() - start) * 1000
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(json.dumps(times))
+"""
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run(root, warm=False, importtime=False):
+    code = FIRST_RENDER.format(root=str(root), app=str(root / "interface" / "streamlit_app.py"), warm=warm)
+    flags = ["-X", "importtime"] if importtime else []
+    done = subprocess.run([sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(done.stdout.strip().splitlines()[-1]), done.stderr
+
+
+def _responds(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def serve(root, timeout, port=8599, health_port=8598):
+    """ms until ``dashboard.py`` reports ready and until its Streamlit server answers."""
+    command = [sys.executable, str(root / "interface" / "dashboard.py"),
+               "--address", "127.0.0.1", "--port", str(port), "--health-port", str(health_port)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    start, times = time.perf_counter(), {}
+    checks = {"server ready": f"http://127.0.0.1:{health_port}/ready",
+              "server serving": f"http://127.0.0.1:{port}/_stcore/health"}
+    try:
+        while len(times) < len(checks):
+            if process.poll() is not None:
+                raise SystemExit(f"dashboard.py exited with {process.returncode}:\n{process.stderr.read()[-2000:]}")
+            if time.perf_counter() - start > timeout:
+                raise SystemExit(f"dashboard.py not up after {timeout} s: {sorted(set(checks) - set(times))}")
+            for name, url in checks.items():
+                if name not in times and _responds(url):
+                    times[name] = (time.perf_counter() - start) * 1000
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return times
+
+
+def import_breakdown(stderr):
+    """Cumulative import ms per top-level package, from ``-X importtime`` output."""
+    totals = Counter()
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and not match.group(3):
+            totals[match.group(4).split(".")[0]] += int(match.group(2)) / 1000
+    return totals
+
+
+def profile(root, repeat, warm, timeout):
+    times = {}
+    for _ in range(repeat):
+        for warmed in (False, True) if warm else (False,):
+            for name, ms in run(root, warmed)[0].items():
+                times.setdefault(name, []).append(ms)
+        if (root / "interface" / "dashboard.py").exists():
+            for name, ms in serve(root, timeout).items():
+                times.setdefault(name, []).append(ms)
+    _, stderr = run(root, importtime=True)
+    return {name: statistics.median(values) for name, values in times.items()}, import_breakdown(stderr)
+
+
+def extract(ref, dest):
+    """``interface`` and ``desalination`` of ``ref`` in ``dest``, sharing this checkout's models and data."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", ref, "interface", "desalination"], cwd=ROOT, capture_output=True, check=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    for name in SHARED:
+        if (ROOT / name).exists():
+            (dest / name).symlink_to(ROOT / name, target_is_directory=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=None, help="git revision to compare against")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12, help="packages shown in the import table")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds dashboard.py may take to come up")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    results = {"current": profile(ROOT, args.repeat, warm=True, timeout=args.timeout)}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            extract(args.baseline, Path(tmp))
+            has_startup = (Path(tmp) / "desalination" / "startup.py").exists()
+            results[args.baseline] = profile(Path(tmp), args.repeat, warm=has_startup, timeout=args.timeout)
+
+    print(pd.DataFrame({name: timings for name, (timings, _) in results.items()}).round(1).to_string())
+    imports = pd.DataFrame({name: breakdown for name, (_, breakdown) in results.items()}).fillna(0.0)
+    imports = imports.sort_values(imports.columns[-1], ascending=False).head(args.top)
+    print("\ncumulative import ms by top-level package (first render)")
+    print(imports.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
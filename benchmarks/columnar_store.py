@@ -0,0 +1,86 @@
+"""Load time and peak RSS of the Parquet store against the CSV path.
+
+The sensor CSV is tiled (with shifted timestamps) up to each ``--rows`` size and
+converted once; every measurement then runs in a fresh interpreter so peak RSS is
+not polluted by earlier runs.
+
+    python benchmarks/columnar_store.py --rows 1000000 10000000 --workdir /tmp/kz-store
+"""
+import argparse
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+
+from desalination import resources
+from desalination.schema import DATA_PATH, REGION_MEAN_COLS, REGION_COL, TIME_COL
+from desalination.store import read_store, write_store
+
+# What Tab 5 needs: one region's rows, all columns / Tab 7: a few columns, all regions.
+QUERIES = {
+    "csv": lambda path: resources.read_dataset(path),
+    "store": lambda root: read_store(root),
+    "store-projected": lambda root: read_store(root, columns=[REGION_COL] + REGION_MEAN_COLS),
+    "store-region": lambda root: read_store(root, regions=["Атырау"]),
+}
+
+
+def tiled_csv(source, rows, path):
+    base = pd.read_csv(source)
+    times = pd.to_datetime(base[TIME_COL])
+    span = times.max() - times.min() + pd.Timedelta(minutes=30)
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        for tile in range(-(-rows // len(base))):
+            part = base.head(rows - written).copy()
+            part[TIME_COL] = (times.head(len(part)) + tile * span).dt.strftime("%Y-%m-%d %H:%M")
+            part.to_csv(out, header=tile == 0, index=False)
+            written += len(part)
+
+
+def measure(kind, path):
+    start = time.perf_counter()
+    frame = QUERIES[kind](path)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed * 1000:.1f} {peak_mb:.1f} {len(frame)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--workdir", default="bench_store")
+    parser.add_argument("--measure", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    workdir = Path(args.workdir)
+    print(f"{'rows':>12}  {'path':<18}{'load ms':>12}{'peak RSS MB':>14}{'rows read':>12}")
+    for rows in args.rows:
+        csv_path, root = workdir / f"sensors_{rows}.csv", workdir / f"store_{rows}"
+        workdir.mkdir(parents=True, exist_ok=True)
+        tiled_csv(args.data, rows, csv_path)
+        shutil.rmtree(root, ignore_errors=True)
+        write_store(csv_path, root)
+        for kind in QUERIES:
+            target = csv_path if kind == "csv" else root
+            out = subprocess.run(
+                [sys.executable, __file__, "--measure", kind, str(target)],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            print(f"{rows:>12,}  {kind:<18}{float(out[0]):>12.1f}{float(out[1]):>14.1f}{int(out[2]):>12,}")
+        shutil.rmtree(root)
+        csv_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Build time of the rolling-window feature engine against pandas groupby, batch and streamed.
+
+Synthetic readings (one per region every 30 minutes) are generated for each
+``--rows`` size. Both engines are warmed up on a small frame first (the
+first call pays for importing ``scipy.signal``) and timed as the best of
+``--repeat`` runs. ``features.build_features`` is timed on the whole frame. On
+frames up to ``--pandas-max`` rows the same features are also built with
+``groupby().shift/rolling/ewm`` and compared. ``OnlineFeatures`` then streams the
+largest checked frame in ``--chunk-rows`` chunks, and its output is checked
+against the batch result.
+
+    python benchmarks/feature_engine.py --rows 1000000 10000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from desalination import features
+from desalination.schema import REGION_COL, REGIONS, TIME_COL
+
+
+def readings(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    index = np.arange(rows)
+    steps = index // len(REGIONS)
+    frame = pd.DataFrame({
+        TIME_COL: np.datetime64("2024-01-01T00:00:00") + (steps * 1800).astype("m8[s]"),
+        REGION_COL: pd.Categorical(np.asarray(REGIONS)[index % len(REGIONS)], categories=REGIONS),
+    })
+    daily = np.sin(2 * np.pi * steps / 48)
+    frame["шығыс_қысымы"] = 4.5 + 0.4 * daily + rng.normal(0, 0.1, rows)
+    frame["энергия_шығыны"] = 3.0 + 0.3 * daily + rng.normal(0, 0.05, rows)
+    return frame
+
+
+def with_pandas(frame, series=features.SERIES):
+    """The same features through pandas groupby, in (plant, time) order."""
+    ordered = frame.iloc[features.plant_order(frame)]
+    groups = ordered.groupby(REGION_COL, observed=True, sort=False)
+    columns = {}
+    for name in series:
+        column = groups[name]
+        for k in features.LAGS:
+            columns[f"{name}_lag{k}"] = column.shift(k)
+        for w in features.WINDOWS:
+            rolling = column.rolling(w, min_periods=1)
+            columns[f"{name}_mean{w}"] = rolling.mean().droplevel(0)
+            columns[f"{name}_std{w}"] = rolling.std().droplevel(0)
+            columns[f"{name}_trend{w}"] = (
+                (ordered[name] - column.shift(w - 1).fillna(column.transform("first")))
+                / np.minimum(groups.cumcount() + 1, w).sub(1).replace(0, np.nan)
+            )
+        for span in features.EWMA_SPANS:
+            columns[f"{name}_ewm{span}"] = column.ewm(span=span, adjust=False).mean().droplevel(0)
+    return pd.DataFrame(columns, index=ordered.index)[features.feature_names(series)]
+
+
+def timed(function, *args, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def stream(frame, chunk_rows):
+    online, parts = features.OnlineFeatures(), []
+    for offset in range(0, len(frame), chunk_rows):
+        parts.append(online.transform(frame.iloc[offset:offset + chunk_rows]))
+    return pd.concat(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--pandas-max", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    warm = readings(10_000)
+    features.build_features(warm)
+    with_pandas(warm)
+
+    results, checked = [], None
+    for rows in args.rows:
+        frame = readings(rows)
+        ours, seconds = timed(features.build_features, frame, repeat=args.repeat)
+        results.append({"rows": rows, "engine": "features.build_features", "seconds": seconds,
+                        "rows/s": rows / seconds, "MB": ours.memory_usage(index=False).sum() / 2**20})
+        if rows <= args.pandas_max:
+            theirs, seconds = timed(with_pandas, frame, repeat=args.repeat)
+            np.testing.assert_allclose(ours.to_numpy(), theirs.loc[ours.index].to_numpy(), rtol=1e-4, atol=1e-4)
+            results.append({"rows": rows, "engine": "pandas groupby", "seconds": seconds, "rows/s": rows / seconds,
+                            "MB": theirs.memory_usage(index=False).sum() / 2**20})
+            checked = (frame, ours)
+
+    if checked is not None:
+        frame, ours = checked
+        streamed, seconds = timed(stream, frame, args.chunk_rows)
+        np.testing.assert_allclose(streamed.loc[ours.index].to_numpy(), ours.to_numpy(), rtol=1e-5, atol=1e-5)
+        results.append({"rows": len(frame), "engine": f"OnlineFeatures ({args.chunk_rows:,}-row chunks)",
+                        "seconds": seconds, "rows/s": len(frame) / seconds})
+
+    print(f"{len(REGIONS)} plants, {len(features.feature_names())} features; results match where both ran")
+    print(pd.DataFrame(results).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
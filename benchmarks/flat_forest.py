@@ -0,0 +1,75 @@
+"""Load time, single-row latency and batch throughput of the compiled forest against the pickled model.
+
+Three paths are compared: the pickled sklearn model, the compiled forest on its
+own (the NumPy-only fallback) and the compiled forest as ``resources.load_predictor``
+serves it, which hands batches of more than ``forest.SMALL_BATCH`` rows to the
+pickle. Batches are dataset rows repeated to each ``--rows`` size. Without a
+compiled file at ``--forest`` the forest is compiled from the pickle in memory.
+
+    python scripts/compile_forest.py
+    python benchmarks/flat_forest.py --rows 1000 100000
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import numpy as np
+
+from desalination import resources
+from desalination.forest import SMALL_BATCH, FlatForest, compile_forest
+from desalination.schema import DATA_PATH, FEATURES, FOREST_PATH, MODEL_PATH
+
+
+def timed(fn, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--forest", default=str(FOREST_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=200, help="single-row repeats")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    load_pickle, model = timed(joblib.load, args.model)
+    if Path(args.forest).exists():
+        load_flat, forest = timed(FlatForest.load, args.forest)
+        routed = FlatForest.load(args.forest)
+    else:
+        print(f"{args.forest} not found; compiling {args.model} in memory")
+        load_flat, forest = float("nan"), compile_forest(model)
+        routed = compile_forest(model)
+    routed.batch_model = lambda: model
+    data = resources.read_dataset(args.data)[FEATURES]
+
+    paths = [("pickled model", load_pickle, model), ("flat forest", load_flat, forest),
+             ("flat + batches", load_flat, routed)]
+    print(f"{'path':<16}{'load ms':>10}{'1-row ms':>10}" + "".join(f"{f'{n:,} rows/s':>18}" for n in args.rows))
+    for name, load_ms, predictor in paths:
+        single_ms, _ = timed(predictor.predict, data.head(1), repeat=args.repeat)
+        line = f"{name:<16}{load_ms:>10.2f}{single_ms:>10.3f}"
+        for rows in args.rows:
+            X = data.iloc[np.arange(rows) % len(data)]
+            predictor.predict(X.head(2 * SMALL_BATCH))
+            batch_ms, _ = timed(predictor.predict, X)
+            line += f"{rows / batch_ms * 1000:>18,.0f}"
+        print(line)
+
+    X = data.iloc[np.arange(max(args.rows)) % len(data)]
+    diff = np.abs(forest.predict(X) - model.predict(X)).max()
+    print(f"max |flat - sklearn| over {len(X):,} rows: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
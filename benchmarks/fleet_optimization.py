@@ -0,0 +1,66 @@
+"""Fleet-wide optimization: closed-form batch solve on 100k cases vs the per-case pool path.
+
+The pool path is timed on ``--pool-cases`` rows and extrapolated; on those rows
+both paths must reach the same objective.
+
+    python benchmarks/fleet_optimization.py --cases 100000 --pool-cases 2000
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from desalination import fleet
+
+
+def random_cases(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "initial_salinity": rng.uniform(1000, 15000, n),
+        "flow_rate": rng.uniform(1, 10, n),
+        "energy_efficiency": rng.uniform(0.7, 0.9, n),
+        "membrane_age": rng.integers(30, 730, n),
+        "maintenance": (rng.random(n) < 0.02).astype(int),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--pool-cases", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-salinity", type=float, default=300)
+    parser.add_argument("--max-salinity", type=float, default=500)
+    parser.add_argument("--goal", default="cost")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    cases = random_cases(args.cases, seed=0)
+
+    start = time.perf_counter()
+    closed = fleet.solve_closed_form(cases, args.min_salinity, args.max_salinity, args.goal)
+    closed_s = time.perf_counter() - start
+
+    subset = cases.head(args.pool_cases)
+    start = time.perf_counter()
+    pooled = fleet.solve_pool(subset, args.min_salinity, args.max_salinity, args.goal, args.workers)
+    pool_s = time.perf_counter() - start
+
+    head = closed.head(args.pool_cases)
+    assert (head["Success"] == pooled["Success"]).all(), "feasibility differs between paths"
+    np.testing.assert_allclose(head["Objective"].dropna(), pooled["Objective"].dropna(), rtol=1e-6)
+
+    print(f"{'path':<14}{'cases':>10}{'seconds':>10}{'cases/sec':>14}")
+    print(f"{'closed form':<14}{len(closed):>10,}{closed_s:>10.3f}{len(closed) / closed_s:>14,.0f}")
+    print(f"{'process pool':<14}{len(pooled):>10,}{pool_s:>10.3f}{len(pooled) / pool_s:>14,.0f}")
+    print(f"pool path on {len(closed):,} cases ≈ {pool_s * len(closed) / len(pooled):.0f} s; "
+          f"{closed['Success'].mean():.1%} of cases feasible")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold start and scoring throughput of the compiled isolation forest against the pickled model.
+
+Cold start runs in a fresh interpreter, so it includes the imports each path needs
+(the pickle pulls in scikit-learn, the export only NumPy). "flat + batches" is
+the compiled forest as ``resources.load_anomaly_detector`` serves it, handing
+batches of more than ``forest.SMALL_BATCH`` rows to the pickle. Without a
+compiled file at ``--forest`` the forest is compiled in memory and its cold
+start is skipped.
+
+    python scripts/compile_isolation_forest.py
+    python benchmarks/isolation_forest.py --rows 200000
+"""
+import argparse
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from desalination import resources
+from desalination.isolation import FlatIsolationForest, compile_isolation_forest
+from desalination.schema import ANOMALY_FOREST_PATH, ANOMALY_MODEL_PATH, DATA_PATH, FEATURES
+
+COLD_START = {
+    "pickled model": "import joblib; joblib.load({path!r})",
+    "flat forest": "from desalination.isolation import FlatIsolationForest; FlatIsolationForest.load({path!r})",
+}
+
+
+def cold_start_ms(code):
+    script = f"import sys, time; sys.path.insert(0, {str(ROOT)!r}); t = time.perf_counter(); {code}; " \
+             "print((time.perf_counter() - t) * 1000)"
+    return float(subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout)
+
+
+def rows_per_sec(fn, X, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return len(X) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=str(ANOMALY_MODEL_PATH))
+    parser.add_argument("--forest", default=str(ANOMALY_FOREST_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    model = resources.load_anomaly_model(args.model)
+    compiled = Path(args.forest).exists()
+    if compiled:
+        forest, routed = FlatIsolationForest.load(args.forest), FlatIsolationForest.load(args.forest)
+    else:
+        print(f"{args.forest} not found; compiling {args.model} in memory")
+        forest, routed = compile_isolation_forest(model), compile_isolation_forest(model)
+    routed.batch_model = lambda: model
+    base = resources.load_dataset(args.data)[FEATURES]
+    X = base.iloc[np.arange(args.rows) % len(base)].reset_index(drop=True)
+
+    print(f"{'path':<16}{'cold ms':>10}{'1-row ms':>10}{'rows/sec':>14}")
+    paths = (("pickled model", model, args.model), ("flat forest", forest, args.forest),
+             ("flat + batches", routed, args.forest))
+    for name, scorer, path in paths:
+        # The routed forest starts like the flat one; an in-memory forest has no file to start from.
+        timed_start = name in COLD_START and (compiled or scorer is model)
+        cold = cold_start_ms(COLD_START[name].format(path=path)) if timed_start else np.nan
+        single = 1000 / rows_per_sec(scorer.predict, X.head(1), 200)
+        print(f"{name:<16}{cold:>10.1f}{single:>10.3f}{rows_per_sec(scorer.score_samples, X, args.repeat):>14,.0f}")
+
+    diff = np.abs(forest.score_samples(X) - model.score_samples(X)).max()
+    agree = (forest.predict(X) == model.predict(X)).mean()
+    print(f"max |flat - sklearn| score: {diff:.2e}; predict agreement {agree:.4%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Load time and per-worker memory of a model as a pickle, a compiled ``.npz`` and a memory-mapped ``.flat`` file.
+
+For each format ``--workers`` fresh interpreters load the model, score a block of
+dataset rows (touching the nodes a real request would) and then idle while
+their memory is read with psutil. USS is memory private to a worker; PSS splits
+shared pages evenly between the processes mapping them, so for the ``.flat``
+file the tree arrays count once across all workers instead of once per worker.
+The ``baseline`` row is an interpreter that imports NumPy and loads nothing.
+
+    python benchmarks/model_format.py --workers 8
+    python benchmarks/model_format.py --model models/anomaly_model.pkl
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import joblib
+import numpy as np
+import pandas as pd
+import psutil
+
+from desalination import resources
+from desalination.forest import compile_forest
+from desalination.isolation import compile_isolation_forest
+from desalination.schema import DATA_PATH, FEATURES, MODEL_PATH
+
+WORKER = """
+import sys, time
+sys.path.insert(0, {root!r})
+import numpy as np
+X = np.load({rows!r})
+start = time.perf_counter()
+{load}
+print((time.perf_counter() - start) * 1000, flush=True)
+{score}
+print("ready", flush=True)
+sys.stdin.read()
+"""
+LOADERS = {
+    "baseline": "model = None",
+    "pickle": "import joblib; model = joblib.load({path!r})",
+    "npz": "from desalination.{module} import {cls}; model = {cls}.load({path!r})",
+    "flat": "from desalination import artifact; model = artifact.load({path!r})",
+}
+
+
+def run_workers(code, n):
+    """Start ``n`` workers; returns their load times (ms) and memory (MB) once all are scoring-warm."""
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(n)
+    ]
+    try:
+        load_ms = [float(p.stdout.readline()) for p in procs]
+        for p in procs:
+            if p.stdout.readline().strip() != "ready":
+                raise RuntimeError("worker failed")
+        memory = [psutil.Process(p.pid).memory_full_info() for p in procs]
+    finally:
+        for p in procs:
+            p.communicate("")
+    return (load_ms, *([getattr(m, name) / 2**20 for m in memory] for name in ("rss", "uss", "pss")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=1000, help="rows each worker scores after loading")
+    args = parser.parse_args()
+
+    from sklearn.ensemble import IsolationForest
+
+    model = joblib.load(args.model)
+    if isinstance(model, IsolationForest):
+        flat, module = compile_isolation_forest(model), "isolation"
+    else:
+        flat, module = compile_forest(model), "forest"
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        X = resources.read_dataset(args.data)[FEATURES].head(args.rows).to_numpy(dtype=np.float32)
+        np.save(Path(tmp) / "rows.npy", X)
+        paths = {"pickle": Path(args.model), "npz": Path(tmp) / "model.npz", "flat": Path(tmp) / "model.flat"}
+        flat.save(paths["npz"])
+        flat.save(paths["flat"])
+
+        for name, loader in LOADERS.items():
+            path = paths.get(name)
+            code = WORKER.format(
+                root=str(ROOT), rows=str(Path(tmp) / "rows.npy"),
+                load=loader.format(path=str(path), module=module, cls=type(flat).__name__),
+                score="" if path is None else "model.predict(X)",
+            )
+            load_ms, rss, uss, pss = run_workers(code, args.workers)
+            rows.append({
+                "format": name, "file MB": path.stat().st_size / 2**20 if path else 0.0,
+                "load ms": statistics.median(load_ms), "RSS MB": statistics.mean(rss),
+                "USS MB": statistics.mean(uss), "PSS MB": statistics.mean(pss), "total PSS MB": sum(pss),
+            })
+
+    print(f"{type(model).__name__}: {flat.n_trees} trees, {len(flat.feature):,} nodes; "
+          f"{args.workers} workers, {args.rows} rows scored each")
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
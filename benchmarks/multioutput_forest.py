@@ -0,0 +1,77 @@
+"""Native multi-output forest vs ``MultiOutputRegressor`` of per-target forests.
+
+Both are trained with the same parameters on the first 80% of the rows in time
+order and evaluated on the rest. Reported per kind: fit time, pickle size and
+load time, predict latency (1 row and the whole test block, pickled and
+compiled) and per-target RMSE/R².
+
+    python benchmarks/multioutput_forest.py --source data/sensor_data_kz_realistic.csv
+"""
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import pandas as pd
+
+from desalination import training
+from desalination.forest import compile_forest
+from desalination.schema import DATA_PATH, FEATURES, TARGETS
+
+
+def timed(fn, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=str(DATA_PATH))
+    parser.add_argument("--max-rows", type=int, default=None)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    X, y, _ = training.load_training_data(args.source, args.max_rows)
+    X = pd.DataFrame(X, columns=FEATURES)
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X.iloc[:split], X.iloc[split:], y[:split], y[split:]
+
+    rows, accuracy = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in training.MODEL_KINDS:
+            model = training.make_model({"n_estimators": args.n_estimators}, kind, n_jobs=args.n_jobs)
+            fit_s, _ = timed(model.fit, X_train, y_train)
+            path = Path(tmp) / f"{kind}.pkl"
+            joblib.dump(model, path)
+            load_s, model = timed(joblib.load, path)
+            one_s, _ = timed(model.predict, X_test.head(1), repeat=args.repeat)
+            batch_s, predicted = timed(model.predict, X_test)
+            flat = compile_forest(model)
+            flat_one_s, _ = timed(flat.predict, X_test.head(1), repeat=args.repeat)
+            flat_batch_s, _ = timed(flat.predict, X_test)
+            rows.append({
+                "kind": kind, "trees": flat.n_trees, "nodes": len(flat.feature), "fit s": fit_s,
+                "pickle MB": path.stat().st_size / 2**20, "load ms": load_s * 1000,
+                "1-row ms": one_s * 1000, "batch ms": batch_s * 1000,
+                "flat 1-row ms": flat_one_s * 1000, "flat batch ms": flat_batch_s * 1000,
+            })
+            for target, values in training.metrics(y_test, predicted.reshape(len(X_test), -1)).items():
+                accuracy.append({"kind": kind, "target": target, **values})
+
+    print(f"{len(X_train):,} train / {len(X_test):,} test rows, {args.n_estimators} trees per forest")
+    print(pd.DataFrame(rows).round(3).to_string(index=False))
+    print(pd.DataFrame(accuracy).pivot(index="target", columns="kind").reindex(TARGETS).round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Incremental statistics against full pandas rescans as batches are appended.
+
+Each batch is folded into ``SensorAggregates`` in O(batch) while the baseline
+re-runs ``corr()`` and ``groupby().mean()`` over the whole history; results are
+checked against pandas after every batch, and the final state is checked again
+after a merge of two halves and a JSON round trip.
+
+    python benchmarks/online_stats.py --batches 20 --batch-rows 100000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from desalination import generator
+from desalination.ingest import SensorAggregates
+from desalination.schema import REGION_COL, REGION_MEAN_COLS, SUMMARY_COLS
+
+
+def check(aggregates, history):
+    np.testing.assert_allclose(aggregates.correlation(), history[SUMMARY_COLS].corr(), atol=1e-9)
+    expected = history.groupby(REGION_COL, observed=True)[REGION_MEAN_COLS].mean()
+    expected.index = expected.index.astype(str)
+    np.testing.assert_allclose(aggregates.region_means().loc[expected.index], expected, rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    online, halves = SensorAggregates(), [SensorAggregates(), SensorAggregates()]
+    parts, online_s, rescan_s = [], 0.0, 0.0
+    print(f"{'history rows':>14}{'online ms':>12}{'rescan ms':>12}")
+    for index, batch in enumerate(generator.iter_chunks(args.batches * args.batch_rows, chunk_rows=args.batch_rows)):
+        start = time.perf_counter()
+        online.update(batch)
+        online_ms = (time.perf_counter() - start) * 1000
+        halves[index * 2 // args.batches].update(batch)
+
+        parts.append(batch)
+        history = pd.concat(parts, ignore_index=True)
+        start = time.perf_counter()
+        history[SUMMARY_COLS].corr()
+        history.groupby(REGION_COL, observed=True)[REGION_MEAN_COLS].mean()
+        rescan_ms = (time.perf_counter() - start) * 1000
+        online_s, rescan_s = online_s + online_ms, rescan_s + rescan_ms
+        check(online, history)
+        print(f"{len(history):>14,}{online_ms:>12.2f}{rescan_ms:>12.2f}")
+
+    merged = halves[0].merge(halves[1])
+    restored = SensorAggregates.from_state(json.loads(json.dumps(merged.to_state())))
+    check(restored, history)
+    print(f"total: online {online_s:.0f} ms, rescans {rescan_s:.0f} ms; merge + JSON round trip match pandas")
+
+
+if __name__ == "__main__":
+    main()
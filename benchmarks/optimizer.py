@@ -0,0 +1,89 @@
+"""Function evaluations, wall time and success rate: dashboard SLSQP vs ``optimize.solve``.
+
+"legacy" is the Tab 6 closure (discontinuous R_ro factor, penalty, finite-difference
+gradients) started from random slider positions. A run counts as a success when
+the solver reports success, the final salinity is inside the target range and the
+objective is within 0.1% of a brute-force reference on a fine grid.
+
+    python benchmarks/optimizer.py --cases 500
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+from scipy.optimize import minimize
+
+from desalination import optimize
+
+GOAL_NAMES = {"cost": "Минимизация затрат", "energy": "Минимизация энергопотребления", "balance": "Баланс"}
+
+
+def legacy_solve(problem, initial_guess, maintenance, membrane_age):
+    def objective_function(params, goal=GOAL_NAMES[problem.goal]):
+        r_nano, r_ro, pressure = params
+        sal_ro = problem.initial_salinity * (1 - r_nano) * (1 - r_ro)
+        energy = (pressure * problem.flow_rate * (1.5 if r_ro > 0.95 else 1.0)) / (problem.energy_efficiency * 3600)
+        cost = energy * 0.1 + (0.2 if maintenance else 0.05) + 0.01 * (membrane_age / 365)
+        penalty = 0
+        if sal_ro < problem.min_salinity or sal_ro > problem.max_salinity:
+            penalty = 1000 + abs(sal_ro - (problem.min_salinity + problem.max_salinity) / 2) * 10
+        if goal == "Минимизация затрат":
+            return cost + penalty
+        elif goal == "Минимизация энергопотребления":
+            return energy + penalty
+        return (cost + energy) / 2 + penalty
+
+    return minimize(objective_function, initial_guess, bounds=optimize.BOUNDS, method="SLSQP")
+
+
+def reference(problem, points=121):
+    grid = optimize._grid(optimize.BOUNDS, points)
+    feasible = problem.violation(grid) <= 0
+    return problem.objective(grid[feasible]).min() if feasible.any() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    rng = np.random.default_rng(args.seed)
+
+    stats = {name: {"nfev": 0, "seconds": 0.0, "success": 0} for name in ("legacy", "solve")}
+    solvable = 0
+    for _ in range(args.cases):
+        maintenance, membrane_age = int(rng.random() < 0.1), int(rng.integers(30, 730))
+        low = int(rng.integers(10, 50)) * 10
+        problem = optimize.TwoStageProblem(
+            rng.uniform(1000, 15000), rng.uniform(1, 10), rng.uniform(0.7, 0.9), maintenance, membrane_age,
+            low, int(rng.integers(low // 10, 51)) * 10, str(rng.choice(optimize.GOALS)),
+        )
+        best = reference(problem)
+        solvable += best is not None
+        guess = [rng.uniform(*bound) for bound in optimize.BOUNDS]
+
+        for name, run in (("legacy", lambda: legacy_solve(problem, guess, maintenance, membrane_age)),
+                          ("solve", lambda: optimize.solve(problem))):
+            start = time.perf_counter()
+            result = run()
+            stats[name]["seconds"] += time.perf_counter() - start
+            stats[name]["nfev"] += result.nfev
+            ok = (result.success and best is not None and problem.violation(result.x) <= optimize.FEASIBILITY_TOL
+                  and problem.objective(result.x) <= best * 1.001)
+            stats[name]["success"] += bool(ok)
+
+    print(f"{args.cases} cases, {solvable} with a feasible target range")
+    print(f"{'solver':<10}{'mean nfev':>12}{'mean ms':>10}{'success':>10}")
+    for name, s in stats.items():
+        print(f"{name:<10}{s['nfev'] / args.cases:>12.1f}{s['seconds'] * 1000 / args.cases:>10.2f}"
+              f"{s['success'] / max(solvable, 1):>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
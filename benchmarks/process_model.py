@@ -0,0 +1,96 @@
+"""Cost per Tab 6 evaluation: inline formulas vs the memoized model vs the response surface.
+
+Replays ``--moves`` random slider moves (values on the slider steps, as Streamlit
+sends them), times a vectorized what-if sweep of ``--sweep`` points and checks
+the response surface against the exact model.
+
+    python benchmarks/process_model.py --moves 20000 --sweep 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from desalination import process
+
+
+def inline(initial_salinity, r_nano, r_ro, input_pressure, flow_rate, energy_efficiency, maintenance, age):
+    sal_nano = initial_salinity * (1 - r_nano)
+    sal_ro = sal_nano * (1 - r_ro)
+    total_recovery = 0.6 * 0.4
+    output_flow = flow_rate * total_recovery
+    energy_nano = (input_pressure * flow_rate) / (energy_efficiency * 3600) * 0.5
+    energy_ro = (input_pressure * flow_rate * 1.5) / (energy_efficiency * 3600)
+    total_energy = energy_nano + energy_ro
+    operational_cost = total_energy * 0.1 + (0.2 if maintenance else 0.05) + 0.01 * (age / 365)
+    return sal_nano, sal_ro, output_flow, total_energy, operational_cost
+
+
+def slider_moves(n, seed):
+    """``(n, 6)`` slider states; each move changes one slider by one to three steps."""
+    rng = np.random.default_rng(seed)
+    axes = [process.slider_axis(name) for name in process.SLIDERS]
+    index = np.array([len(axis) // 2 for axis in axes])
+    states = np.empty((n, len(axes)))
+    for i in range(n):
+        k = rng.integers(len(axes))
+        index[k] = np.clip(index[k] + rng.integers(-3, 4), 0, len(axes[k]) - 1)
+        states[i] = [axis[j] for axis, j in zip(axes, index)]
+    return states
+
+
+def per_call(fn, states):
+    start = time.perf_counter()
+    for state in states:
+        fn(*state, 0, 180)
+    return (time.perf_counter() - start) / len(states)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--moves", type=int, default=20_000)
+    parser.add_argument("--sweep", type=int, default=1_000_000)
+    args = parser.parse_args()
+    states = slider_moves(args.moves, seed=0)
+    model = process.DesalinationProcess()
+
+    start = time.perf_counter()
+    surface = process.ResponseSurface(model)
+    build_s = time.perf_counter() - start
+
+    process.cache_clear()
+    timings = {
+        "inline": per_call(inline, states),
+        "model": per_call(model.evaluate, states),
+        "cached": per_call(process.evaluate_cached, states),
+        "surface": per_call(surface.evaluate, states),
+    }
+    info = process.cache_info()
+    print(f"{'path':<10}{'µs/call':>10}")
+    for name, seconds in timings.items():
+        print(f"{name:<10}{seconds * 1e6:>10.2f}")
+    print(f"cache: {info.hits:,} hits / {info.misses:,} misses; surface: {surface.size:,} nodes built in {build_s:.3f} s")
+
+    rng = np.random.default_rng(1)
+    sweep = [rng.uniform(low, high, args.sweep) for low, high, _ in process.SLIDERS.values()]
+    start = time.perf_counter()
+    exact = model.evaluate(*sweep, 0, 180)
+    exact_s = time.perf_counter() - start
+    start = time.perf_counter()
+    approx = surface.evaluate(*sweep, 0, 180)
+    surface_s = time.perf_counter() - start
+    print(f"sweep of {args.sweep:,} points: model {exact_s:.3f} s, surface {surface_s:.3f} s")
+
+    for name in ("sal_ro", "total_energy", "operational_cost"):
+        error = np.max(np.abs(getattr(approx, name) / getattr(exact, name) - 1))
+        print(f"surface max relative error, {name}: {error:.2e}")
+    on_nodes = surface.evaluate(*states.T, 0, 180)
+    np.testing.assert_allclose(on_nodes.total_energy, model.evaluate(*states.T, 0, 180).total_energy, rtol=1e-9)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Startup / rerun latency of model and dataset loading.
+
+"before" repeats what the app did on every rerun (two ``joblib.load`` calls and a
+CSV parse); "after" goes through ``desalination.resources``, where the first
+call is the cold start and later calls are cache hits.
+
+    python benchmarks/resource_loading.py --model models/kz_model.pkl --reruns 20
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import pandas as pd
+
+from desalination import resources
+from desalination.schema import ANOMALY_MODEL_PATH, DATA_PATH, MODEL_PATH
+
+
+def load_uncached(model_path, anomaly_path, data_path):
+    joblib.load(model_path)
+    joblib.load(anomaly_path)
+    df = pd.read_csv(data_path)
+    df["уақыт"] = pd.to_datetime(df["уақыт"])
+
+
+def load_cached(model_path, anomaly_path, data_path):
+    resources.load_model(model_path)
+    resources.load_anomaly_model(anomaly_path)
+    resources.load_dataset(data_path)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--anomaly-model", default=str(ANOMALY_MODEL_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+    paths = (args.model, args.anomaly_model, args.data)
+    warnings.filterwarnings("ignore")
+
+    before = [timed(load_uncached, *paths) for _ in range(args.reruns)]
+    resources.clear()
+    cold = timed(load_cached, *paths)
+    warm = [timed(load_cached, *paths) for _ in range(args.reruns)]
+
+    print(f"{'path':<28}{'startup ms':>12}{'rerun ms':>12}")
+    print(f"{'before (load every rerun)':<28}{before[0]:>12.2f}{sum(before) / len(before):>12.2f}")
+    print(f"{'after (resources cache)':<28}{cold:>12.2f}{sum(warm) / len(warm):>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Chart payload and query time of rollup + LTTB history plots as the history grows.
+
+Synthetic readings (one per region every ``--cadence`` seconds) are fed to
+``rollup.Rollups`` chunk by chunk. For each history length the whole range and
+the last day are charted for one region. The table reports ingest throughput,
+the memory the rollups hold (every level, deep) and the process's peak RSS so
+far, query + downsample time, the points sent and the Plotly JSON payload. For
+comparison, histories up to ``--raw-max`` rows are also charted raw (every row,
+as the notebooks' ``sns.lineplot`` does).
+
+    python benchmarks/rollups.py --rows 100000 1000000 10000000
+"""
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from desalination import rollup
+from desalination.schema import REGION_COL, REGIONS, TIME_COL
+
+METRIC = "шығыс_қысымы"
+
+
+def chunks(rows, cadence, chunk_rows, seed=0):
+    """Time-ordered synthetic readings for every region, ``chunk_rows`` at a time."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2024-01-01T00:00:00")
+    for offset in range(0, rows, chunk_rows):
+        index = np.arange(offset, min(offset + chunk_rows, rows))
+        seconds = (index // len(REGIONS)) * cadence
+        # A weekly cycle with noise and rare spikes, so downsampling has peaks to keep.
+        pressure = 4.5 + 0.5 * np.sin(2 * np.pi * seconds / (7 * 86_400)) + rng.normal(0, 0.1, len(index))
+        pressure += (rng.random(len(index)) < 1e-4) * 3.0
+        frame = pd.DataFrame({
+            TIME_COL: start + seconds.astype("m8[s]"),
+            REGION_COL: np.asarray(REGIONS)[index % len(REGIONS)],
+        })
+        for metric in rollup.METRICS:
+            frame[metric] = (pressure if metric == METRIC else rng.normal(1, 0.1, len(index))).astype(np.float32)
+        yield frame
+
+
+def chart(series, title):
+    start = time.perf_counter()
+    payload = rollup.history_figure(series, title).to_json()
+    return (time.perf_counter() - start) * 1000, len(payload) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--cadence", type=int, default=30, help="seconds between readings of a region")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--max-points", type=int, default=rollup.MAX_POINTS)
+    parser.add_argument("--raw-max", type=int, default=1_000_000)
+    args = parser.parse_args()
+    region = REGIONS[0]
+
+    results = []
+    for rows in args.rows:
+        rollups, raw = rollup.Rollups(), []
+        start = time.perf_counter()
+        for chunk in chunks(rows, args.cadence, args.chunk_rows):
+            rollups.update(chunk)
+            if rows <= args.raw_max:
+                raw.append(chunk[chunk[REGION_COL] == region].set_index(TIME_COL)[METRIC])
+        held_mb = sum(rollups.frame(name).memory_usage(deep=True).sum() for name in rollup.RESOLUTIONS) / 2**20
+        ingest_s = time.perf_counter() - start
+        # ru_maxrss is in kilobytes on Linux.
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        end = rollups.frame("1min").index.get_level_values(TIME_COL).max()
+
+        for label, window in (("all", None), ("last day", end - pd.Timedelta(days=1))):
+            start = time.perf_counter()
+            resolution, series = rollups.series(METRIC, region, window, None, args.max_points)
+            points = rollup.downsample(series, max_points=args.max_points)
+            query_ms = (time.perf_counter() - start) * 1000
+            chart_ms, payload_kb = chart(points, label)
+            results.append({
+                "rows": rows, "range": label, "ingest rows/s": rows / ingest_s, "rollups MB": held_mb,
+                "peak RSS MB": peak_mb, "level": resolution,
+                "buckets": len(series), "points": len(points), "query ms": query_ms,
+                "figure ms": chart_ms, "payload KB": payload_kb,
+            })
+        if raw:
+            series = pd.concat(raw).to_frame("mean").assign(min=lambda f: f["mean"], max=lambda f: f["mean"])
+            chart_ms, payload_kb = chart(series, "raw")
+            results.append({
+                "rows": rows, "range": "all (raw)", "level": "raw", "points": len(series),
+                "figure ms": chart_ms, "payload KB": payload_kb,
+            })
+
+    print(f"{len(REGIONS)} regions, one reading each every {args.cadence}s; charts for {region}")
+    print(pd.DataFrame(results).round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
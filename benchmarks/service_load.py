@@ -0,0 +1,108 @@
+"""Latency percentiles and throughput of the prediction service at increasing concurrency.
+
+Starts ``interface/service.py`` on a free port unless ``--url`` points at a
+running instance, then sends ``--requests`` requests per concurrency level to
+``/predict`` (or ``/predict/batch`` with ``--bulk-rows``).
+
+    python benchmarks/service_load.py --concurrency 1 8 32 128 --requests 2000
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx
+import numpy as np
+
+from desalination import resources
+from desalination.schema import DATA_PATH, FEATURES
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(client, url, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get(f"{url}/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"service at {url} did not become ready")
+
+
+async def run_level(client, url, rows, concurrency, requests, bulk_rows):
+    endpoint = f"{url}/predict/batch" if bulk_rows else f"{url}/predict"
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            if bulk_rows:
+                start_row = i * bulk_rows % len(rows)
+                payload = {"rows": rows[start_row:start_row + bulk_rows]}
+            else:
+                payload = rows[i % len(rows)]
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return np.array(latencies), elapsed
+
+
+async def main_async(args):
+    frame = resources.load_dataset(args.data).head(10_000)
+    rows = [{col: float(value) for col, value in zip(FEATURES, values)} for values in frame[FEATURES].to_numpy()]
+    server, url = None, args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen([sys.executable, str(ROOT / "interface" / "service.py"), "--port", str(port),
+                                   "--max-wait-ms", str(args.max_wait_ms)])
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            await wait_ready(client, url)
+            await run_level(client, url, rows, 4, 50, args.bulk_rows)  # warm-up
+            unit = "rows" if args.bulk_rows else "req"
+            print(f"{'concurrency':>12}{'p50 ms':>10}{'p99 ms':>10}{unit + '/sec':>14}")
+            for concurrency in args.concurrency:
+                latencies, elapsed = await run_level(client, url, rows, concurrency, args.requests, args.bulk_rows)
+                rate = len(latencies) * (args.bulk_rows or 1) / elapsed
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                print(f"{concurrency:>12}{p50:>10.2f}{p99:>10.2f}{rate:>14,.0f}")
+            print("server:", (await client.get(f"{url}/health")).json())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running service; by default one is started")
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per concurrency level")
+    parser.add_argument("--bulk-rows", type=int, default=0, help="rows per /predict/batch request (0: /predict)")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
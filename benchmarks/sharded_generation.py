@@ -0,0 +1,51 @@
+"""Scaling efficiency of sharded generation at 1, 2, 4 and 8 worker processes.
+
+Efficiency is ``t(1) / (workers * t(workers))``; every run must produce the same
+manifest digest, i.e. byte-identical shards.
+
+    python benchmarks/sharded_generation.py --start 2024-01-01 --end 2024-03-01 --step-seconds 30
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from desalination import sharded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-03-01")
+    parser.add_argument("--step-seconds", type=int, default=30)
+    parser.add_argument("--block-rows", type=int, default=sharded.BLOCK_ROWS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    baseline, digest = None, None
+    print(f"{'workers':>8}{'rows':>14}{'seconds':>10}{'rows/sec':>14}{'efficiency':>12}")
+    for workers in args.workers:
+        root = Path(tempfile.mkdtemp(prefix="kz-shards-"))
+        try:
+            start = time.perf_counter()
+            manifest = sharded.generate_sharded(
+                root, args.start, args.end, args.step_seconds, workers=workers, block_rows=args.block_rows,
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(root)
+        if digest is not None and manifest["digest"] != digest:
+            raise SystemExit(f"output differs with {workers} workers")
+        digest = manifest["digest"]
+        baseline = baseline or elapsed * workers
+        print(f"{workers:>8}{manifest['rows']:>14,}{elapsed:>10.2f}{manifest['rows'] / elapsed:>14,.0f}"
+              f"{baseline / (workers * elapsed):>12.0%}")
+    print(f"digest {digest[:16]} identical for all worker counts")
+
+
+if __name__ == "__main__":
+    main()
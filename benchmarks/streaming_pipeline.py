@@ -0,0 +1,67 @@
+"""Sustained readings/sec, per-stage latency and memory of the streaming anomaly pipeline.
+
+The sensor CSV is replayed ``--repeat`` times as fast as possible; process RSS
+is sampled every second so a leak would show as a rising series. The bundled
+CSV has only 500 readings, so its rate is dominated by start-up; measure the
+target rate on a large feed (e.g. from ``scripts/sensors_kz_realistic.py``).
+
+    python benchmarks/streaming_pipeline.py --repeat 20
+    python benchmarks/streaming_pipeline.py --data sensors.csv --repeat 2
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+import psutil
+
+from desalination import resources, streaming
+from desalination.schema import DATA_PATH
+
+TARGET_RATE = 50_000
+
+
+async def sample_rss(samples, interval=1.0):
+    process = psutil.Process()
+    while True:
+        samples.append(process.memory_info().rss / 2**20)
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    model = resources.load_anomaly_detector()
+    samples = []
+    sampler = asyncio.create_task(sample_rss(samples))
+    try:
+        return await streaming.run_pipeline(
+            args.data, model, packet_rows=args.packet_rows, window_rows=args.window_rows,
+            queue_size=args.queue_size, repeat=args.repeat,
+        ), samples
+    finally:
+        sampler.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--packet-rows", type=int, default=streaming.PACKET_ROWS)
+    parser.add_argument("--window-rows", type=int, default=streaming.WINDOW_ROWS)
+    parser.add_argument("--queue-size", type=int, default=streaming.QUEUE_SIZE)
+    args = parser.parse_args()
+
+    report, rss = asyncio.run(run(args))
+    print(pd.DataFrame(report["stages"]).round(2).to_string(index=False))
+    rate = report["stages"][-1]["rows"] / report["elapsed"]
+    print(f"end to end: {rate:,.0f} readings/sec ({'ok' if rate >= TARGET_RATE else 'below'} {TARGET_RATE:,} target)")
+    if rss:
+        half = len(rss) // 2
+        print(f"RSS MB: start {rss[0]:.0f}, max {max(rss):.0f}, "
+              f"first-half max {max(rss[:half] or rss):.0f}, second-half max {max(rss[half:]):.0f}")
+
+
+if __name__ == "__main__":
+    main()
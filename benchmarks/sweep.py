@@ -0,0 +1,70 @@
+"""Points/sec and peak memory of streamed grid sweeps (process model and regression model).
+
+The process sweep covers all six Tab 6 sliders; the model sweep covers salinity,
+inlet pressure and temperature with the other features fixed. Peak memory is
+the largest Python/NumPy allocation traced by ``tracemalloc`` during the sweep.
+
+    python benchmarks/sweep.py --process-points 10 --model-points 100
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from desalination import process, resources, sweep
+from desalination.schema import FEATURES
+
+MODEL_FIXED = {
+    "өңір_код": 0, "pH": 7.5, "су_деңгейі": 5.0, "фильтр_тиімділігі": 0.85,
+    "мембрана_жасы": 365, "техникалық_жағдай": 0, "зауыт_сыйымдылығы": 20000,
+}
+
+
+def timed(grid, chunks, x, y):
+    tracemalloc.start()
+    start = time.perf_counter()
+    surfaces = sweep.reduce(grid, chunks, x, y)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return surfaces, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--process-points", type=int, default=10, help="points per slider axis")
+    parser.add_argument("--model-points", type=int, default=100, help="points per feature axis")
+    parser.add_argument("--chunk-points", type=int, default=sweep.CHUNK_POINTS)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    process_grid = sweep.Grid.linspace({
+        name: (low, high, args.process_points) for name, (low, high, _) in process.SLIDERS.items()
+    })
+    model_grid = sweep.Grid.linspace({
+        "тұздылық": (1000, 15000, args.model_points),
+        "кіру_қысымы": (2, 7, args.model_points),
+        "температура": (5, 40, args.model_points),
+    })
+    assert set(MODEL_FIXED) | set(model_grid.names) == set(FEATURES)
+    model = resources.load_predictor()
+
+    runs = {
+        "process": timed(process_grid, sweep.process_chunks(process_grid, chunk_points=args.chunk_points),
+                         "initial_salinity", "pressure"),
+        "model": timed(model_grid, sweep.model_chunks(model_grid, MODEL_FIXED, model, args.chunk_points, args.n_jobs),
+                       "тұздылық", "кіру_қысымы"),
+    }
+    print(f"{'sweep':<10}{'points':>12}{'seconds':>10}{'points/sec':>14}{'peak MB':>10}")
+    for name, (_, seconds, peak) in runs.items():
+        size = (process_grid if name == "process" else model_grid).size
+        print(f"{name:<10}{size:>12,}{seconds:>10.2f}{size / seconds:>14,.0f}{peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Latency and throughput of TreeSHAP explanations of the regression model.
+
+Times building the path cache (once per model), a single-row explanation (Tab
+5) and batches of dataset rows repeated to ``--rows``, single-threaded and over
+all cores. It checks that the attributions add up to the forest's predictions.
+When the ``shap`` package is installed, ``shap.TreeExplainer`` is run on the
+same rows for speed and agreement.
+
+    python scripts/compile_forest.py
+    python benchmarks/tree_shap.py --rows 1000 100000
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import numpy as np
+
+from desalination import explain, resources, scoring
+from desalination.forest import compile_forest
+from desalination.schema import DATA_PATH, MODEL_PATH
+
+
+def timed(fn, *args, repeat=1, **kwargs):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def with_shap(model, X):
+    """``shap.TreeExplainer`` values as ``(rows, features, targets)``, or None if unavailable."""
+    try:
+        import shap
+    except ImportError:
+        return None
+    if hasattr(model.estimators_[0], "estimators_"):
+        # MultiOutputRegressor: one explainer per target's forest.
+        return np.stack([shap.TreeExplainer(forest).shap_values(X) for forest in model.estimators_], axis=2)
+    values = shap.TreeExplainer(model).shap_values(X)
+    return np.stack(values, axis=2) if isinstance(values, list) else values.reshape(len(X), X.shape[1], -1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--shap-rows", type=int, default=200, help="rows explained by the shap package")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    model = joblib.load(args.model)
+    forest = compile_forest(model)
+    build_ms, paths = timed(explain.TreePaths, forest)
+    X = scoring.feature_matrix(resources.read_dataset(args.data))
+    lengths = {group[0].shape[0]: group[0].shape[1] for group in paths.groups}
+    print(f"{forest.n_trees} trees, {paths.n_paths:,} paths (unique features per path: {lengths}); "
+          f"path cache built in {build_ms:.1f} ms")
+
+    explain.paths(forest)
+    single_ms, _ = timed(explain.explain, X[:1], forest, repeat=args.repeat)
+    print(f"{'1 row':>14}: {single_ms:9.2f} ms")
+    for rows in args.rows:
+        batch = X[np.arange(rows) % len(X)]
+        for n_jobs in (1, -1):
+            ms, (values, expected) = timed(explain.explain, batch, forest, n_jobs=n_jobs)
+            print(f"{rows:>10,} rows, n_jobs={n_jobs:>2}: {ms:9.1f} ms ({rows / ms * 1000:,.0f} rows/s)")
+        additivity = np.abs(expected + values.sum(axis=1) - forest.predict(batch)).max()
+        print(f"{'':>14}  max |expected + sum(SHAP) - prediction|: {additivity:.2e}")
+
+    rows = X[:args.shap_rows]
+    shap_ms, reference = timed(with_shap, model, rows)
+    if reference is None:
+        print("shap is not installed; skipped the reference comparison")
+        return
+    ours_ms, (values, _) = timed(explain.explain, rows, forest)
+    print(f"shap.TreeExplainer on {len(rows)} rows: {shap_ms:.1f} ms, ours: {ours_ms:.1f} ms, "
+          f"max |difference|: {np.abs(values - reference).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared data, model and optimisation code for the desalination dashboard."""
@@ -0,0 +1,143 @@
+"""On-disk cache of ``SensorAggregates`` keyed by a dataset fingerprint.
+
+The fingerprint is a content hash of the CSV, so the cache survives restarts and
+copies of the same file, and any change to the data (or to ``VERSION``, bumped
+whenever the aggregates change shape) lands in a new entry. Each entry is a
+directory with the accumulator state as JSON and the raw-row sample and time
+rollups as Parquet.
+
+For files on disk the cache also remembers how many bytes the last entry
+covered. If the file has only grown since (its prefix still hashes to that
+entry), the saved state is loaded and only the appended rows are ingested.
+"""
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from .ingest import CHUNK_ROWS, SensorAggregates, ingest
+from .rollup import Rollups
+from .schema import ROOT
+
+CACHE_DIR = ROOT / ".cache" / "aggregates"
+VERSION = 4
+_BLOCK = 1 << 20
+
+
+def fingerprint(path_or_buffer):
+    """``blake2b`` of the file contents (buffers are rewound afterwards)."""
+    digest = hashlib.blake2b(f"v{VERSION}".encode(), digest_size=16)
+    if hasattr(path_or_buffer, "read"):
+        position = path_or_buffer.tell()
+        while block := path_or_buffer.read(_BLOCK):
+            digest.update(block if isinstance(block, bytes) else block.encode())
+        path_or_buffer.seek(position)
+    else:
+        with open(path_or_buffer, "rb") as f:
+            for block in iter(lambda: f.read(_BLOCK), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _digests(path, prefix_bytes):
+    """Fingerprint of the whole file and of its first ``prefix_bytes`` bytes, in one read."""
+    digest = hashlib.blake2b(f"v{VERSION}".encode(), digest_size=16)
+    prefix, read = None, 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_BLOCK), b""):
+            if prefix_bytes is not None and read <= prefix_bytes < read + len(block):
+                digest.update(block[:prefix_bytes - read])
+                prefix = digest.copy().hexdigest()
+                digest.update(block[prefix_bytes - read:])
+            else:
+                digest.update(block)
+            read += len(block)
+    if prefix_bytes == read:
+        prefix = digest.hexdigest()
+    return digest.hexdigest(), prefix
+
+
+def _record_path(cache_dir, path):
+    name = hashlib.blake2b(str(path).encode(), digest_size=16).hexdigest()
+    return Path(cache_dir) / "files" / f"{name}.json"
+
+
+def _ingest_appended(path, record, chunk_rows, cache_dir):
+    """Previous entry plus the rows after ``record["bytes"]``, or ``None`` if it can't resume."""
+    base = load(record["key"], cache_dir)
+    if base is None:
+        return None
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]))
+        f.seek(record["bytes"] - 1)
+        if f.read(1) != b"\n":
+            return None  # the last covered row was not terminated, so it may have been extended
+        return ingest(f, chunk_rows, aggregates=base, names=header)
+
+
+def load(key, cache_dir=CACHE_DIR):
+    """Cached aggregates for ``key``, or ``None`` on a miss."""
+    entry = Path(cache_dir) / key
+    try:
+        state = json.loads((entry / "state.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    sample_path = entry / "sample.parquet"
+    sample = pd.read_parquet(sample_path) if sample_path.exists() else None
+    return SensorAggregates.from_state(state, sample, Rollups.load(entry))
+
+
+def store(key, aggregates, cache_dir=CACHE_DIR):
+    """Write an entry atomically: build it in a temp dir, then rename into place."""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-"))
+    try:
+        (tmp / "state.json").write_text(json.dumps(aggregates.to_state(), ensure_ascii=False), encoding="utf-8")
+        sample = aggregates.sample()
+        if len(sample):
+            sample.to_parquet(tmp / "sample.parquet", index=False)
+        aggregates.rollups.save(tmp)
+        os.replace(tmp, cache_dir / key)
+    except OSError:
+        # Another process stored the same key first; its entry is equivalent.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_or_compute(path_or_buffer, chunk_rows=CHUNK_ROWS, cache_dir=CACHE_DIR):
+    """Aggregates of a sensor CSV, computed once per distinct content.
+
+    Files that were only appended to since their last entry cost O(new rows).
+    """
+    if hasattr(path_or_buffer, "read"):
+        key = fingerprint(path_or_buffer)
+        aggregates = load(key, cache_dir)
+        if aggregates is None:
+            aggregates = ingest(path_or_buffer, chunk_rows)
+            store(key, aggregates, cache_dir)
+        return aggregates
+
+    path = Path(path_or_buffer).resolve()
+    record_path = _record_path(cache_dir, path)
+    try:
+        record = json.loads(record_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        record = None
+    size = path.stat().st_size
+    grown = record is not None and 0 < record["bytes"] < size
+    key, prefix = _digests(path, record["bytes"] if grown else None)
+    aggregates = load(key, cache_dir)
+    if aggregates is None:
+        if grown and prefix == record["key"]:
+            aggregates = _ingest_appended(path, record, chunk_rows, cache_dir)
+        if aggregates is None:
+            aggregates = ingest(path, chunk_rows)
+        store(key, aggregates, cache_dir)
+    record_path.parent.mkdir(parents=True, exist_ok=True)
+    record_path.write_text(json.dumps({"path": str(path), "bytes": size, "key": key}), encoding="utf-8")
+    return aggregates
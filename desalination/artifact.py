@@ -0,0 +1,80 @@
+"""Memory-mappable model files: a small JSON header followed by raw NumPy buffers.
+
+Layout::
+
+    b"DSMODEL1" | header length (uint64, little-endian) | JSON header | padding | arrays
+
+The header names the model class, its scalar metadata and, per array, the
+dtype, shape and byte offset. Every array starts on a ``ALIGN``-byte boundary,
+so ``read`` returns read-only ``np.frombuffer`` views straight into a shared
+``mmap`` of the file: loading parses only the header, pages are read on first
+touch, and every process that maps the same file shares one copy of them in
+the page cache.
+"""
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"DSMODEL1"
+ALIGN = 64
+FORMAT_VERSION = 1
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def write(path, kind, arrays, meta=None):
+    """Write ``arrays`` (name -> ndarray) and JSON-serializable ``meta`` for a model of class ``kind``."""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    entries, offset = {}, 0
+    for name, array in arrays.items():
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps(
+        {"format": FORMAT_VERSION, "kind": kind, "meta": meta or {}, "arrays": entries}, ensure_ascii=False,
+    ).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def read(path):
+    """``(kind, arrays, meta)``; arrays are read-only views into a shared memory map."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a model file")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"unsupported model file format {header['format']}")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data_start = _aligned(len(MAGIC) + 8 + length)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype, count, data_start + entry["offset"]).reshape(entry["shape"])
+    return header["kind"], arrays, header["meta"]
+
+
+def load(path):
+    """Model object stored at ``path`` (``FlatForest`` or ``FlatIsolationForest``)."""
+    from .forest import FlatForest
+    from .isolation import FlatIsolationForest
+
+    kind, arrays, meta = read(path)
+    classes = {cls.__name__: cls for cls in (FlatForest, FlatIsolationForest)}
+    if kind not in classes:
+        raise ValueError(f"unknown model kind {kind!r} in {path}")
+    return classes[kind].from_arrays(arrays, meta)
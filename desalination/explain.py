@@ -0,0 +1,204 @@
+"""Per-row SHAP attributions of the regression forest (path-dependent TreeSHAP).
+
+Each leaf's value is shared among the features on its root-to-leaf path. Let a
+path have unique features ``1..d``. ``z_k`` is the share of training weight
+(node cover) that follows the path's splits on feature ``k``. ``o_k`` is 1 if
+the row satisfies all of those splits and 0 otherwise. Feature ``i`` then gets
+
+    v * (o_i - z_i) * sum_s  s! (d - 1 - s)! / d!  *  e_s
+
+where ``e_s`` is the coefficient of ``t**s`` in ``prod_{k != i} (z_k + o_k t)``.
+This is the Shapley weighting over subsets of the other path features. The
+result matches the recursive algorithm of Lundberg et al., and the
+attributions plus ``expected_value`` sum to the prediction.
+
+``TreePaths`` extracts every path of every tree once per model and caches it.
+For each path it keeps the unique features, the interval each must fall in,
+``z`` and the leaf value, grouped by ``d``. A row only changes which pattern of
+``o`` each path sees. So for paths with ``d <= TABLE_MAX_LENGTH``, the shares
+of all ``2**d`` patterns are tabulated up front. Explaining a block of rows is
+then one interval test per path feature, one table lookup per path and one
+matrix product that scatters the shares, times the leaf values, onto
+(feature, target). Longer paths evaluate the polynomial per row instead, by
+building the full product and dividing each feature's factor back out.
+``explain`` spreads row blocks over threads, like ``scoring.predict_batch``.
+"""
+import math
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from . import resources, scoring
+from .forest import FlatForest, compile_forest
+from .schema import FEATURES, TARGETS
+
+BLOCK_ROWS = 256
+# Row x path pairs evaluated per step; bounds the working arrays of one thread.
+BLOCK_CELLS = 1 << 16
+# Longest path whose shares are tabulated for every pattern (2**d * d values per path).
+TABLE_MAX_LENGTH = 8
+_PATHS = weakref.WeakKeyDictionary()
+
+
+class TreePaths:
+    """Root-to-leaf paths of all trees of a ``FlatForest``, grouped by number of unique features."""
+
+    def __init__(self, forest):
+        if forest.cover is None:
+            raise ValueError("The compiled forest has no node cover; re-export it with scripts/compile_forest.py")
+        n_nodes, n_features = len(forest.feature), len(forest.feature_names_in_)
+        ids = np.arange(n_nodes)
+        internal = forest.left != ids
+        parent = np.full(n_nodes, -1)
+        parent[forest.left[internal]] = ids[internal]
+        parent[forest.right[internal]] = ids[internal]
+        is_left = np.zeros(n_nodes, dtype=bool)
+        is_left[forest.left[internal]] = True
+
+        # Walk every leaf up to its root at once, merging repeated splits on a feature.
+        leaves = np.flatnonzero(~internal)
+        lower = np.full((len(leaves), n_features), -np.inf)
+        upper = np.full((len(leaves), n_features), np.inf)
+        zero = np.ones((len(leaves), n_features))
+        on_path = np.zeros((len(leaves), n_features), dtype=bool)
+        node = leaves.copy()
+        for _ in range(forest.max_depth):
+            rows = np.flatnonzero(parent[node] >= 0)
+            if len(rows) == 0:
+                break
+            child = node[rows]
+            up = parent[child]
+            feature, threshold, went_left = forest.feature[up], forest.threshold[up], is_left[child]
+            upper[rows, feature] = np.where(went_left, np.minimum(upper[rows, feature], threshold), upper[rows, feature])
+            lower[rows, feature] = np.where(went_left, lower[rows, feature], np.maximum(lower[rows, feature], threshold))
+            zero[rows, feature] *= forest.cover[child] / forest.cover[up]
+            on_path[rows, feature] = True
+            node[rows] = up
+
+        values = forest.value[leaves] * forest.scale
+        self.features = list(forest.feature_names_in_)
+        self.targets = list(forest.targets)
+        self.expected_value = (values * zero.prod(axis=1)[:, None]).sum(axis=0)
+        self.groups = []
+        length = on_path.sum(axis=1)
+        for d in np.unique(length[length > 0]):
+            members = np.flatnonzero(length == d)
+            # The path's features first, in column order.
+            columns = np.argsort(~on_path[members], axis=1, kind="stable")[:, :d]
+            lo, hi, z = (np.take_along_axis(a[members], columns, axis=1) for a in (lower, upper, zero))
+            weights = np.array([math.factorial(s) * math.factorial(d - 1 - s) / math.factorial(d) for s in range(d)])
+            # Row p * d + i spreads share i of path p over (feature, target): its leaf value in the feature's block.
+            scatter = np.zeros((len(members), d, n_features, len(self.targets)))
+            scatter[np.arange(len(members))[:, None], np.arange(d), columns] = values[members][:, None, :]
+            scatter = scatter.reshape(len(members) * d, -1)
+            table = _pattern_table(z, weights).reshape(-1, d) if d <= TABLE_MAX_LENGTH else None
+            # Transposed so each path position is a contiguous row; bounds as float32 for float32 rows.
+            self.groups.append((
+                np.ascontiguousarray(columns.T), _float32_bound(lo.T), _float32_bound(hi.T), z, weights, scatter, table,
+            ))
+
+    @property
+    def n_paths(self):
+        return sum(group[0].shape[1] for group in self.groups)
+
+    def shap_values(self, X):
+        """Attributions of a float32 block, shape ``(rows, features, targets)``."""
+        X = np.asarray(X, dtype=np.float32)
+        out = np.zeros((len(X), len(self.features) * len(self.targets)))
+        for columns, lower, upper, zero, weights, scatter, table in self.groups:
+            d, n_paths = columns.shape
+            step = max(1, BLOCK_CELLS // max(len(X) * d, 1))
+            for start in range(0, n_paths, step):
+                stop = min(start + step, n_paths)
+                # Bit k of ``pattern`` is o_k: whether the row satisfies the path's splits on its k-th feature.
+                pattern = np.zeros((len(X), stop - start), dtype=np.intp)
+                for k in range(d):
+                    x = X[:, columns[k, start:stop]]
+                    pattern |= np.left_shift((x > lower[k, start:stop]) & (x <= upper[k, start:stop]), k, dtype=np.intp)
+                if table is None:
+                    one = ((pattern[..., None] >> np.arange(d)) & 1).astype(np.float64)
+                    share = _shares(one, zero[start:stop], weights)
+                else:
+                    share = table.take(pattern + (np.arange(start, stop) << d), axis=0)
+                out += share.reshape(len(X), -1) @ scatter[start * d:stop * d]
+        return out.reshape(len(X), len(self.features), len(self.targets))
+
+
+def _float32_bound(threshold):
+    """Largest float32 not above each float64 threshold.
+
+    For a float32 ``x``, ``x <= t`` and ``x > t`` give the same answers against
+    this value as against ``t`` itself, which is how ``apply_trees`` compares.
+    """
+    rounded = threshold.astype(np.float32)
+    return np.ascontiguousarray(np.where(rounded > threshold, np.nextafter(rounded, np.float32(-np.inf)), rounded))
+
+
+def _shares(one, zero, weights):
+    """Shares ``(o_i - z_i) * sum_s w_s e_s`` of every path feature, for ``one`` of shape ``(..., paths, d)``."""
+    d = zero.shape[1]
+    # Coefficients of prod_k (z_k + o_k t), lowest power first.
+    poly = np.zeros(one.shape[:-1] + (d + 1,))
+    poly[..., 0] = 1.0
+    for k in range(d):
+        poly[..., 1:k + 2] = poly[..., 1:k + 2] * zero[:, k, None] + one[..., k, None] * poly[..., :k + 1]
+        poly[..., 0] *= zero[:, k]
+
+    share = np.empty_like(one)
+    for i in range(d):
+        z = zero[:, i]
+        # o_i = 1: divide out (z_i + t), from the top coefficient down.
+        e = poly[..., d]
+        satisfied = weights[d - 1] * e
+        for s in range(d - 1, 0, -1):
+            e = poly[..., s] - z * e
+            satisfied += weights[s - 1] * e
+        # o_i = 0: the factor is the constant z_i.
+        unsatisfied = poly[..., :d] @ weights / z
+        share[..., i] = (one[..., i] - z) * np.where(one[..., i] > 0, satisfied, unsatisfied)
+    return share
+
+
+def _pattern_table(zero, weights):
+    """Shares for every pattern of ``o``, shape ``(paths, 2**d, d)``; pattern bit ``i`` is ``o_i``."""
+    d = zero.shape[1]
+    patterns = ((np.arange(2 ** d)[:, None] >> np.arange(d)) & 1).astype(np.float64)
+    table = np.empty((len(zero), 2 ** d, d))
+    step = max(1, BLOCK_CELLS // 2 ** d)
+    for start in range(0, len(zero), step):
+        part = slice(start, start + step)
+        one = np.broadcast_to(patterns[:, None, :], (2 ** d, len(zero[part]), d))
+        table[part] = _shares(one, zero[part], weights).transpose(1, 0, 2)
+    return table
+
+
+def paths(model):
+    """``TreePaths`` of a ``FlatForest`` or sklearn forest, built once per model object."""
+    if model not in _PATHS:
+        _PATHS[model] = TreePaths(model if isinstance(model, FlatForest) else compile_forest(model))
+    return _PATHS[model]
+
+
+def explain(frame, model=None, n_jobs=-1, block_rows=BLOCK_ROWS):
+    """``(values, expected_value)`` for every row of ``frame`` (a frame or a float32 feature matrix).
+
+    ``values`` has shape ``(rows, features, targets)``. For each row,
+    ``expected_value + values.sum(axis=1)`` is the model's prediction. Row
+    blocks are spread over ``n_jobs`` threads.
+    """
+    model = model if model is not None else resources.load_predictor()
+    tree_paths = paths(model)
+    X = frame if isinstance(frame, np.ndarray) else scoring.feature_matrix(frame)
+    slices = [slice(start, start + block_rows) for start in range(0, len(X), block_rows)]
+    if len(slices) <= 1:
+        return tree_paths.shap_values(X), tree_paths.expected_value
+    from joblib import Parallel, delayed
+
+    parts = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(tree_paths.shap_values)(X[s]) for s in slices)
+    return np.concatenate(parts), tree_paths.expected_value
+
+
+def mean_abs(values, features=FEATURES, targets=TARGETS):
+    """Mean |SHAP| per feature (rows) and target (columns): global importance in each target's units."""
+    return pd.DataFrame(np.abs(values).mean(axis=0), index=list(features), columns=list(targets))
@@ -0,0 +1,210 @@
+"""Lag, rolling-window and EWMA features per plant for time-aware forecasting.
+
+Readings are ordered by (``өңір``, ``уақыт``) once with ``np.lexsort``, which
+leaves every plant's rows contiguous. All features are then computed for all
+plants at once with array arithmetic on that order:
+
+- lags gather ``x[i - k]``, masked where the lag reaches into the previous plant;
+- rolling means and standard deviations are differences of cumulative sums,
+  with each window clipped at its plant's first row (like ``min_periods=1``);
+- trends are the per-step slope across each window;
+- EWMAs (``adjust=False``) run ``scipy.signal.lfilter`` over each plant's rows.
+
+Warm, this is 8-9x faster than the same features through pandas groupby
+(``benchmarks/feature_engine.py``: 0.54 s against 4.9 s at 1M rows) at half
+the memory, and ``OnlineFeatures`` reuses ``_compute`` so streamed features
+match the batch ones exactly.
+
+Windows and lags count readings, not wall time. The streamed and sharded
+generators report every 30 minutes, but the bundled CSV is irregular per
+plant (median 3.5 hours, up to 34 hours apart), so there a window spans a
+varying stretch of time; ``horizon_times`` dates the targets of such data.
+Series values must be finite; callers drop incomplete readings first.
+
+``OnlineFeatures`` produces the same values for streamed chunks. Per plant it
+keeps only the last ``HISTORY`` readings and the EWMA values, so its state is
+O(window).
+"""
+import numpy as np
+import pandas as pd
+
+from .schema import REGION_COL, TIME_COL
+
+SERIES = ["шығыс_қысымы", "энергия_шығыны"]
+LAGS = (1, 2, 4, 8)
+WINDOWS = (4, 16, 48)
+EWMA_SPANS = (8, 48)
+# Readings of context a plant needs for its next row's features to be complete.
+HISTORY = max(max(LAGS), max(WINDOWS))
+_PER_SERIES = len(LAGS) + 3 * len(WINDOWS) + len(EWMA_SPANS)
+
+
+def feature_names(series=SERIES):
+    names = []
+    for name in series:
+        names += [f"{name}_lag{k}" for k in LAGS]
+        for w in WINDOWS:
+            names += [f"{name}_mean{w}", f"{name}_std{w}", f"{name}_trend{w}"]
+        names += [f"{name}_ewm{span}" for span in EWMA_SPANS]
+    return names
+
+
+def plant_order(frame):
+    """Row positions that sort ``frame`` by plant, then time (stable)."""
+    codes = pd.Categorical(frame[REGION_COL]).codes
+    times = frame[TIME_COL].to_numpy().astype("M8[ns]").view(np.int64)
+    return np.lexsort((times, codes))
+
+
+def _lfilter_ewma(x, span, previous=None):
+    """``adjust=False`` EWMA of ``x``, continuing from ``previous`` (else seeded with ``x[0]``)."""
+    from scipy.signal import lfilter
+
+    alpha = 2.0 / (span + 1.0)
+    seed = x[0] if previous is None else previous
+    return lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * seed])[0]
+
+
+def _compute(values, bounds, ewma=None):
+    """Features of the emitted rows of every group.
+
+    ``values`` is ``(n, k)`` with each group's rows contiguous and in time order.
+    ``bounds`` holds ``(start, emit, end)`` per group: rows ``[start, emit)``
+    are context only (earlier readings), rows ``[emit, end)`` get features.
+    ``ewma`` is an optional ``(groups, k, len(EWMA_SPANS))`` array of EWMA values
+    just before ``emit``. Returns the ``(emitted rows, features)`` float32 matrix
+    and the EWMA values after each group's last row.
+    """
+    n, k = values.shape
+    bounds = np.asarray(bounds, dtype=np.int64).reshape(-1, 3)
+    row = np.concatenate([np.arange(emit, end) for _, emit, end in bounds]) if len(bounds) else np.zeros(0, np.int64)
+    first = np.repeat(bounds[:, 0], bounds[:, 2] - bounds[:, 1])
+    out = np.empty((len(row), k * _PER_SERIES), dtype=np.float32, order="F")
+    last_ewma = np.full((len(bounds), k, len(EWMA_SPANS)), np.nan)
+    col = 0
+    for j in range(k):
+        raw = values[:, j]
+        # Centering keeps the cumulative sums small, so window differences stay accurate.
+        center = raw.mean() if n else 0.0
+        x = raw - center
+        for lag in LAGS:
+            source = row - lag
+            out[:, col] = np.where(source >= first, raw[np.maximum(source, 0)], np.nan)
+            col += 1
+        c1 = np.concatenate([[0.0], np.cumsum(x)])
+        c2 = np.concatenate([[0.0], np.cumsum(x * x)])
+        for w in WINDOWS:
+            low = np.maximum(row + 1 - w, first)
+            count = (row + 1 - low).astype(np.float64)
+            mean = (c1[row + 1] - c1[low]) / count
+            var = ((c2[row + 1] - c2[low]) - count * mean * mean) / np.maximum(count - 1, 1)
+            out[:, col] = mean + center
+            out[:, col + 1] = np.where(count > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[:, col + 2] = np.where(count > 1, (raw[row] - raw[low]) / (count - 1), np.nan)
+            col += 3
+        position = 0
+        for g, (_, emit, end) in enumerate(bounds):
+            rows = slice(position, position + end - emit)
+            for s, span in enumerate(EWMA_SPANS):
+                if end > emit:
+                    previous = None if ewma is None or np.isnan(ewma[g, j, s]) else ewma[g, j, s]
+                    smoothed = _lfilter_ewma(raw[emit:end], span, previous)
+                    out[rows, col + s] = smoothed
+                    last_ewma[g, j, s] = smoothed[-1]
+                elif ewma is not None:
+                    last_ewma[g, j, s] = ewma[g, j, s]
+            position += end - emit
+        col += len(EWMA_SPANS)
+    return out, last_ewma
+
+
+def _bounds(codes):
+    """``(start, start, end)`` of each run of equal values in sorted ``codes``."""
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, np.int64)
+    ends = np.r_[starts[1:], len(codes)]
+    return np.column_stack([starts, starts, ends])
+
+
+def build_features(frame, series=SERIES):
+    """Features of every row of ``frame``, returned in (plant, time) order with ``frame``'s index."""
+    order = plant_order(frame)
+    ordered = frame.iloc[order]
+    values = ordered[series].to_numpy(dtype=np.float64)
+    codes = pd.Categorical(ordered[REGION_COL]).codes
+    matrix, _ = _compute(values, _bounds(codes))
+    return pd.DataFrame(matrix, index=ordered.index, columns=feature_names(series), copy=False)
+
+
+def _ahead(ordered, h):
+    """Positions ``h`` readings ahead within each plant of a (plant, time) ordered frame, and where they exist."""
+    bounds = _bounds(pd.Categorical(ordered[REGION_COL]).codes)
+    last = np.repeat(bounds[:, 2], bounds[:, 2] - bounds[:, 0]) - 1
+    row = np.arange(len(ordered))
+    return np.minimum(row + h, last), row + h <= last
+
+
+def horizon_targets(frame, horizons, series=SERIES):
+    """``series`` values ``h`` readings ahead per plant, aligned with ``build_features`` rows.
+
+    NaN where the horizon runs past the plant's last reading.
+    """
+    ordered = frame.iloc[plant_order(frame)]
+    values = ordered[series].to_numpy(dtype=np.float64)
+    ahead = {h: _ahead(ordered, h) for h in horizons}
+    columns = {}
+    for j, name in enumerate(series):
+        for h in horizons:
+            positions, valid = ahead[h]
+            columns[f"{name}+{h}"] = np.where(valid, values[positions, j], np.nan)
+    return pd.DataFrame(columns, index=ordered.index)
+
+
+def horizon_times(frame, h):
+    """Time of each plant's reading ``h`` readings ahead, aligned with ``build_features`` rows.
+
+    Readings need not be evenly spaced, so this is the only reliable way to
+    date a horizon target. NaT where the horizon runs past the plant's last reading.
+    """
+    ordered = frame.iloc[plant_order(frame)]
+    times = ordered[TIME_COL].to_numpy().astype("M8[ns]")
+    ahead, valid = _ahead(ordered, h)
+    return pd.Series(np.where(valid, times[ahead], np.datetime64("NaT")), index=ordered.index)
+
+
+class OnlineFeatures:
+    """Streaming counterpart of ``build_features``.
+
+    ``transform`` takes chunks of new readings in time order per plant and
+    returns the features ``build_features`` would give them over the whole
+    history seen so far.
+    """
+
+    def __init__(self, series=SERIES):
+        self.series = list(series)
+        self._tail = {}
+        self._ewma = {}
+
+    def transform(self, chunk):
+        order = plant_order(chunk)
+        ordered = chunk.iloc[order]
+        new = ordered[self.series].to_numpy(dtype=np.float64)
+        regions = ordered[REGION_COL].astype(str).to_numpy()
+        runs = _bounds(pd.Categorical(regions).codes)
+
+        blocks, bounds, ewma, start = [], [], [], 0
+        for run_start, _, run_end in runs:
+            region = regions[run_start]
+            tail = self._tail.get(region, np.empty((0, len(self.series))))
+            blocks += [tail, new[run_start:run_end]]
+            bounds.append((start, start + len(tail), start + len(tail) + run_end - run_start))
+            ewma.append(self._ewma.get(region, np.full((len(self.series), len(EWMA_SPANS)), np.nan)))
+            start = bounds[-1][2]
+        values = np.concatenate(blocks) if blocks else new
+        matrix, last_ewma = _compute(values, bounds, np.asarray(ewma) if ewma else None)
+
+        for g, (run_start, _, _) in enumerate(runs):
+            block_start, _, block_end = bounds[g]
+            self._tail[regions[run_start]] = values[max(block_start, block_end - HISTORY):block_end].copy()
+            self._ewma[regions[run_start]] = last_ewma[g]
+        return pd.DataFrame(matrix, index=ordered.index, columns=feature_names(self.series), copy=False)
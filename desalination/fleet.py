@@ -0,0 +1,123 @@
+"""Batch Tab 6 optimization for every plant and hour at once.
+
+Within each ``R_ro`` regime of ``optimize`` the objective grows with pressure
+only and the salinity constraint involves only ``R_nano`` and ``R_ro``. So the
+optimum has a closed form: the lowest pressure, the cheapest regime whose
+reachable salinity band ``S0·(1-R_nano)·(1-R_ro)`` overlaps the target range, and
+any ``(R_nano, R_ro)`` that hits a salinity inside that overlap.
+``solve_closed_form`` evaluates this for all cases as array operations.
+``solve_pool`` runs the general per-case ``optimize.solve`` in a process pool
+for objectives that do not fit this form and to cross-check the closed form.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import optimize, process
+
+CASE_COLS = ["initial_salinity", "flow_rate", "energy_efficiency", "membrane_age", "maintenance"]
+# Same headers as output/data/desalination_results.csv.
+RESULT_COLS = [
+    "Initial Salinity (ppm)", "Nano Salinity (ppm)", "RO Salinity (ppm)", "Output Flow (m³/h)",
+    "Total Recovery (%)", "Energy Nano (kWh/m³)", "Energy RO (kWh/m³)", "Total Energy (kWh/m³)",
+    "Operational Cost ($/m³)",
+]
+
+
+def _case_arrays(cases):
+    missing = [col for col in CASE_COLS if col not in cases.columns]
+    if missing:
+        raise ValueError(f"Missing case columns: {', '.join(missing)}")
+    return [cases[col].to_numpy(dtype=np.float64) for col in CASE_COLS]
+
+
+def _objective(goal, pressure, factor, flow, efficiency, fixed_cost):
+    energy = pressure * flow * factor / (efficiency * 3600)
+    cost = energy * 0.1 + fixed_cost
+    return {"cost": cost, "energy": energy, "balance": (cost + energy) / 2}[goal]
+
+
+def results_frame(cases, r_nano, r_ro, pressure, objective, success):
+    """Decision variables plus the Tab 6 process outputs, one row per case."""
+    s0, flow, efficiency, age, maintenance = _case_arrays(cases)
+    out = process.DesalinationProcess().evaluate(s0, r_nano, r_ro, pressure, flow, efficiency, maintenance, age)
+    frame = pd.DataFrame({
+        "R_nano": r_nano, "R_ro": r_ro, "Pressure (bar)": pressure,
+        RESULT_COLS[0]: s0,
+        RESULT_COLS[1]: out.sal_nano,
+        RESULT_COLS[2]: out.sal_ro,
+        RESULT_COLS[3]: out.output_flow,
+        RESULT_COLS[4]: out.total_recovery * 100,
+        RESULT_COLS[5]: out.energy_nano,
+        RESULT_COLS[6]: out.energy_ro,
+        RESULT_COLS[7]: out.total_energy,
+        RESULT_COLS[8]: out.operational_cost,
+        "Objective": objective, "Success": success,
+    }, index=cases.index)
+    # Infeasible cases have no decision; keep the row so the frame aligns with the input.
+    undecided = [col for col in frame.columns if col not in (RESULT_COLS[0], RESULT_COLS[3], RESULT_COLS[4], "Success")]
+    frame.loc[~frame["Success"], undecided] = np.nan
+    return frame
+
+
+def solve_closed_form(cases, min_salinity, max_salinity, goal="cost"):
+    """Optimal ``(R_nano, R_ro, pressure)`` for every row of ``cases`` (see ``CASE_COLS``).
+
+    ``min_salinity``/``max_salinity`` are scalars or per-case arrays.
+    """
+    s0, flow, efficiency, age, maintenance = _case_arrays(cases)
+    n = len(s0)
+    low = np.broadcast_to(np.asarray(min_salinity, dtype=np.float64), (n,))
+    high = np.broadcast_to(np.asarray(max_salinity, dtype=np.float64), (n,))
+    fixed_cost = process.fixed_cost(maintenance, age)
+    (nano_low, nano_high), _, (pressure_low, _) = optimize.BOUNDS
+    pressure = np.full(n, pressure_low)
+
+    best = np.full(n, np.inf)
+    r_nano, r_ro = np.full(n, np.nan), np.full(n, np.nan)
+    for (ro_low, ro_high), factor in optimize.REGIMES:
+        reach_low = s0 * (1 - nano_high) * (1 - ro_high)
+        reach_high = s0 * (1 - nano_low) * (1 - ro_low)
+        band_low, band_high = np.maximum(reach_low, low), np.minimum(reach_high, high)
+        feasible = band_low <= band_high
+        target = np.clip((low + high) / 2, band_low, band_high)
+        # Start from the regime's lowest R_ro; if R_nano would leave its bounds, pin it and solve for R_ro.
+        ro = np.full(n, ro_low)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nano = 1 - target / (s0 * (1 - ro))
+            pinned = np.clip(nano, nano_low, nano_high)
+            ro = np.where(pinned != nano, 1 - target / (s0 * (1 - pinned)), ro)
+        nano, ro = pinned, np.clip(ro, ro_low, ro_high)
+
+        objective = _objective(goal, pressure, factor, flow, efficiency, fixed_cost)
+        better = feasible & (objective < best)
+        best = np.where(better, objective, best)
+        r_nano, r_ro = np.where(better, nano, r_nano), np.where(better, ro, r_ro)
+
+    return results_frame(cases, r_nano, r_ro, pressure, best, np.isfinite(best))
+
+
+def _solve_rows(task):
+    rows, goal = task
+    out = []
+    for s0, flow, efficiency, age, maintenance, low, high in rows:
+        problem = optimize.TwoStageProblem(s0, flow, efficiency, maintenance, age, low, high, goal)
+        result = optimize.solve(problem)
+        out.append((*result.x, result.fun, True) if result.success else (np.nan,) * 4 + (False,))
+    return out
+
+
+def solve_pool(cases, min_salinity, max_salinity, goal="cost", workers=None, chunk_rows=500):
+    """General path: ``optimize.solve`` per case, spread over a process pool."""
+    arrays = _case_arrays(cases)
+    n = len(arrays[0])
+    low = np.broadcast_to(np.asarray(min_salinity, dtype=np.float64), (n,))
+    high = np.broadcast_to(np.asarray(max_salinity, dtype=np.float64), (n,))
+    rows = np.column_stack(arrays + [low, high])
+    tasks = [(rows[i:i + chunk_rows], goal) for i in range(0, n, chunk_rows)]
+    with ProcessPoolExecutor(workers) as pool:
+        solved = [row for part in pool.map(_solve_rows, tasks) for row in part]
+    columns = list(zip(*solved)) if solved else [()] * 5
+    r_nano, r_ro, pressure, objective = (np.asarray(col, dtype=np.float64) for col in columns[:4])
+    return results_frame(cases, r_nano, r_ro, pressure, objective, np.asarray(columns[4], dtype=bool))
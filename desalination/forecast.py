@@ -0,0 +1,107 @@
+"""Multi-horizon forecasts of output pressure and energy from per-plant history.
+
+A reading's inputs are its sensor values (``schema.FEATURES``), the current
+``features.SERIES`` values and the lag, rolling and EWMA history of ``features.SERIES`` for its plant. The targets are
+those series ``HORIZONS`` readings ahead. One native multi-output
+RandomForest from ``training.make_model`` predicts every (series, horizon) pair
+at once.
+
+``train`` holds out the last ``HOLDOUT`` share of time for evaluation. A
+reading is trained on only if its furthest target was taken before the
+cutoff (``features.horizon_times``), so no training target lies in the test
+period however unevenly the plant reports. It then refits on all rows.
+"""
+import numpy as np
+import pandas as pd
+
+from . import features, training
+from .schema import FEATURES, REGION_COL, TIME_COL
+
+# Readings ahead: 30 minutes to 4 hours at the generated 30-minute cadence (longer on irregular data).
+HORIZONS = (1, 2, 4, 8)
+HOLDOUT = 0.2
+PARAMS = {"n_estimators": 200, "min_samples_leaf": 5, "max_features": 0.5, "max_samples": 0.3}
+
+
+def target_names(horizons=HORIZONS, series=features.SERIES):
+    return [f"{name}+{h}" for name in series for h in horizons]
+
+
+def input_names():
+    return FEATURES + features.SERIES + features.feature_names()
+
+
+def _ordered(frame):
+    frame = frame.dropna(subset=[REGION_COL, TIME_COL] + FEATURES + features.SERIES)
+    return frame.iloc[features.plant_order(frame)]
+
+
+def _inputs(ordered):
+    history = features.build_features(ordered)
+    return pd.concat([ordered[FEATURES + features.SERIES].astype(np.float32), history], axis=1)
+
+
+def cadence(ordered):
+    """Median time between consecutive readings of the same plant."""
+    times = ordered[TIME_COL].to_numpy()
+    same = ordered[REGION_COL].to_numpy()[1:] == ordered[REGION_COL].to_numpy()[:-1]
+    steps = np.diff(times)[same]
+    return pd.Timedelta(np.median(steps)) if len(steps) else pd.Timedelta(0)
+
+
+def training_set(frame, horizons=HORIZONS):
+    """``(X, Y, times, target_times)`` for every reading whose targets are all inside its plant's history.
+
+    ``target_times`` is when the furthest target was taken.
+    """
+    ordered = _ordered(frame)
+    X = _inputs(ordered)
+    Y = features.horizon_targets(ordered, horizons)
+    keep = Y.notna().all(axis=1).to_numpy()
+    target_times = features.horizon_times(ordered, max(horizons)).to_numpy()
+    return X[keep], Y.to_numpy()[keep], ordered[TIME_COL].to_numpy()[keep], target_times[keep]
+
+
+class Forecaster:
+    """Fitted model with the horizons and cadence needed to date its forecasts."""
+
+    def __init__(self, model, horizons=HORIZONS, step=None):
+        self.model = model
+        self.horizons = tuple(horizons)
+        self.step = step
+
+    def predict(self, history):
+        """Forecasts from each plant's latest reading in ``history``.
+
+        ``history`` should hold at least ``features.HISTORY`` recent readings
+        per plant; shorter histories give partial-window features. Returns one
+        row per plant with the base reading time and a column per ``target_names``.
+        """
+        ordered = _ordered(history)
+        latest = ~ordered[REGION_COL].duplicated(keep="last").to_numpy()
+        X = _inputs(ordered)[latest]
+        predicted = np.asarray(self.model.predict(X)).reshape(len(X), -1)
+        result = pd.DataFrame(predicted, columns=target_names(self.horizons), index=ordered.index[latest])
+        result.insert(0, TIME_COL, ordered[TIME_COL].to_numpy()[latest])
+        result.insert(0, REGION_COL, ordered[REGION_COL].astype(str).to_numpy()[latest])
+        return result.reset_index(drop=True)
+
+
+def train(source=None, horizons=HORIZONS, params=PARAMS, n_jobs=-1, seed=42):
+    """Evaluate on a time holdout, refit on everything; returns ``(Forecaster, report)``."""
+    frame = training.load_frame([REGION_COL] + FEATURES + features.SERIES, source)
+    step = cadence(_ordered(frame))
+    X, Y, times, target_times = training_set(frame, horizons)
+    targets = target_names(horizons)
+
+    cutoff = np.sort(times)[int(len(times) * (1 - HOLDOUT))]
+    train_rows = target_times < cutoff
+    test_rows = times >= cutoff
+    model = training.make_model(params, "native", seed, n_jobs).fit(X[train_rows], Y[train_rows])
+    report = {
+        "rows": int(len(X)), "train_rows": int(train_rows.sum()), "test_rows": int(test_rows.sum()),
+        "cutoff": str(cutoff), "step": str(step), "params": params,
+        "metrics": training.metrics(Y[test_rows], model.predict(X[test_rows]), targets),
+    }
+    model = training.make_model(params, "native", seed, n_jobs).fit(X, Y)
+    return Forecaster(model, horizons, step), report
@@ -0,0 +1,226 @@
+"""Flat, array-based inference for the RandomForest regression model.
+
+``compile_forest`` (needs scikit-learn) flattens every tree of a fitted
+multi-output ``RandomForestRegressor`` or ``MultiOutputRegressor`` of forests
+into one set of contiguous node arrays. ``FlatForest`` walks all trees for a
+block of rows at once with plain NumPy, so serving only needs NumPy and the
+exported file (``.npz``, or the memory-mapped format of ``artifact``).
+
+Leaves point to themselves, so a fixed number of steps (the deepest tree's
+depth) brings every row of every tree to its leaf without per-tree dispatch.
+That lockstep walk is the fastest path for a few rows, but every row takes the
+deepest tree's number of steps in every tree. Larger blocks are walked one tree
+at a time (``sum_leaves``), where each step only touches the rows still
+descending; that is still several times slower than scikit-learn's compiled
+traversal, so when the source model is at hand (``batch_model``) blocks of
+more than ``SMALL_BATCH`` rows go to it (``benchmarks/flat_forest.py``).
+"""
+import numpy as np
+
+from .schema import FEATURES, TARGETS
+
+# Above this many rows scikit-learn predicts faster than the lockstep walk.
+SMALL_BATCH = 256
+# Rows per ``sum_leaves`` call: large enough to amortize the per-tree loop.
+TREE_BLOCK_ROWS = 65_536
+
+
+def apply_trees(X, feature, threshold, left, right, roots, max_depth):
+    """Walk every row of a float32 matrix down every tree; leaves must point to themselves."""
+    node = np.repeat(roots[None, :], len(X), axis=0)
+    rows = np.arange(len(X))[:, None]
+    for _ in range(max_depth):
+        go_left = X[rows, feature[node]] <= threshold[node]
+        node = np.where(go_left, left[node], right[node])
+    return node
+
+
+def sum_leaves(X, feature, threshold, left, right, roots, leaf_value):
+    """Sum of ``leaf_value`` at every row's leaf over all trees, walking one tree at a time.
+
+    Rows drop out of the walk once they reach a leaf, so a tree costs its rows'
+    actual depths rather than the deepest tree's.
+    """
+    n_features = X.shape[1]
+    flat = X.ravel()
+    total = np.zeros((len(X),) + leaf_value.shape[1:])
+    for root in roots:
+        node = np.full(len(X), root, dtype=np.int32)
+        active = np.arange(len(X))
+        while len(active):
+            current = node[active]
+            go_left = flat[active * n_features + feature[current]] <= threshold[current]
+            following = np.where(go_left, left[current], right[current])
+            node[active] = following
+            active = active[following != current]
+        total += leaf_value[node]
+    return total
+
+
+class FlatForest:
+    """All trees of an ensemble as contiguous node arrays.
+
+    ``value`` holds one column per target; trees of a ``MultiOutputRegressor``
+    only fill their own target's column and ``scale`` turns the per-target sum of
+    leaf values into the forest average. ``cover`` is the training weight that
+    reached each node; only ``explain`` needs it, and exports made before it was
+    recorded load without it.
+
+    ``batch_model``, if set, is a zero-argument callable returning the sklearn
+    model the forest was compiled from (``resources.load_predictor`` sets it);
+    ``predict`` hands it blocks of more than ``SMALL_BATCH`` rows.
+    """
+
+    batch_model = None
+
+    def __init__(self, feature, threshold, left, right, value, roots, scale, max_depth,
+                 importances, features=FEATURES, targets=TARGETS, cover=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.scale = np.ascontiguousarray(scale, dtype=np.float64)
+        self.max_depth = int(max_depth)
+        self.feature_importances_ = np.asarray(importances, dtype=np.float64)
+        self.feature_names_in_ = np.asarray(features, dtype=object)
+        self.targets = list(targets)
+        self.cover = None if cover is None else np.ascontiguousarray(cover, dtype=np.float64)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Global leaf index of every row in every tree, shape ``(n_rows, n_trees)``."""
+        return apply_trees(self._as_matrix(X), self.feature, self.threshold, self.left, self.right,
+                           self.roots, self.max_depth)
+
+    def predict(self, X):
+        """Same result as ``model.predict`` on the compiled model, one row per input row."""
+        if len(X) > SMALL_BATCH and self.batch_model is not None:
+            return np.asarray(self.batch_model().predict(X)).reshape(len(X), -1)
+        X = self._as_matrix(X)
+        if len(X) <= SMALL_BATCH:
+            return self.value[self.apply(X)].sum(axis=1) * self.scale
+        out = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), TREE_BLOCK_ROWS):
+            block = X[start:start + TREE_BLOCK_ROWS]
+            out[start:start + len(block)] = sum_leaves(
+                block, self.feature, self.threshold, self.left, self.right, self.roots, self.value,
+            ) * self.scale
+        return out
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)]
+        # float32 like sklearn; comparisons against the float64 thresholds match its split.
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def save(self, path):
+        """Write ``.npz``, or for any other suffix the memory-mappable ``artifact`` format."""
+        if str(path).endswith(".npz"):
+            np.savez(
+                path, feature=self.feature, threshold=self.threshold, left=self.left,
+                right=self.right, value=self.value, roots=self.roots, scale=self.scale,
+                max_depth=self.max_depth, importances=self.feature_importances_,
+                features=np.asarray(self.feature_names_in_, dtype=str),
+                targets=np.asarray(self.targets, dtype=str),
+                **({} if self.cover is None else {"cover": self.cover}),
+            )
+            return
+        from . import artifact
+
+        arrays = {
+            "feature": self.feature, "threshold": self.threshold, "left": self.left, "right": self.right,
+            "value": self.value, "roots": self.roots, "scale": self.scale, "importances": self.feature_importances_,
+        }
+        if self.cover is not None:
+            arrays["cover"] = self.cover
+        meta = {"max_depth": self.max_depth, "features": list(self.feature_names_in_), "targets": self.targets}
+        artifact.write(path, type(self).__name__, arrays, meta)
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(
+            arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"], arrays["value"],
+            arrays["roots"], arrays["scale"], meta["max_depth"], arrays["importances"],
+            meta["features"], meta["targets"], arrays.get("cover"),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load either format; artifact files are memory-mapped rather than read."""
+        if not str(path).endswith(".npz"):
+            from . import artifact
+
+            return artifact.load(path)
+        with np.load(path) as data:
+            return cls(
+                data["feature"], data["threshold"], data["left"], data["right"],
+                data["value"], data["roots"], data["scale"], data["max_depth"],
+                data["importances"], data["features"].tolist(), data["targets"].tolist(),
+                data["cover"] if "cover" in data.files else None,
+            )
+
+
+def _forests(model):
+    """``(forest, target_columns)`` pairs for a forest or a ``MultiOutputRegressor`` of forests."""
+    if hasattr(model.estimators_[0], "estimators_"):
+        return [(forest, [i]) for i, forest in enumerate(model.estimators_)]
+    return [(model, list(range(model.n_outputs_)))]
+
+
+def forest_importances(model):
+    """Feature importances of a sklearn forest, averaged over the per-target forests if wrapped."""
+    return np.mean([forest.feature_importances_ for forest, _ in _forests(model)], axis=0)
+
+
+def forest_features(model):
+    """Feature names a sklearn forest was fitted with (the first ``FEATURES`` if fitted on an array)."""
+    features = getattr(model, "feature_names_in_", None)
+    if features is None:
+        forest = _forests(model)[0][0]
+        features = getattr(forest, "feature_names_in_", FEATURES[:forest.n_features_in_])
+    return list(features)
+
+
+def compile_forest(model, targets=None):
+    """Flatten a fitted sklearn forest (or ``MultiOutputRegressor`` of forests).
+
+    ``targets`` names the model's outputs; by default ``TARGETS`` if the model
+    has that many and ``output_0``, ``output_1``, ... otherwise.
+    """
+    forests = _forests(model)
+    n_targets = sum(len(cols) for _, cols in forests)
+    if targets is None:
+        targets = TARGETS if n_targets == len(TARGETS) else [f"output_{i}" for i in range(n_targets)]
+    elif len(targets) != n_targets:
+        raise ValueError(f"model has {n_targets} outputs, got {len(targets)} target names")
+    feature, threshold, left, right, value, roots, cover = [], [], [], [], [], [], []
+    counts = np.zeros(n_targets)
+    max_depth, offset = 0, 0
+    for forest, cols in forests:
+        counts[cols] += len(forest.estimators_)
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left < 0
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+            left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+            node_value = np.zeros((tree.node_count, n_targets))
+            node_value[:, cols] = tree.value[:, :, 0]
+            value.append(node_value)
+            cover.append(tree.weighted_n_node_samples)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += tree.node_count
+
+    return FlatForest(
+        np.concatenate(feature), np.concatenate(threshold), np.concatenate(left),
+        np.concatenate(right), np.concatenate(value), np.asarray(roots), 1.0 / counts,
+        max_depth, forest_importances(model), forest_features(model), targets, np.concatenate(cover),
+    )
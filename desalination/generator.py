@@ -0,0 +1,197 @@
+"""Vectorized synthetic sensor data in the ``sensor_data_kz_realistic.csv`` schema.
+
+Every chunk is generated column-wise with its own ``np.random.Generator``, seeded
+from ``SeedSequence(seed, spawn_key=(chunk_index,))``, so a given seed and chunk
+size always produce the same rows no matter how many chunks are written or in
+which order. Regions, methods and anomaly weights come from a
+``Profile`` (``config/profiles/*.yaml``); distributions, anomaly injection and the
+cost formulas are those of the original per-row generator scripts.
+"""
+import numpy as np
+import pandas as pd
+
+from .schema import REGION_COL, ROOT, TIME_COL
+
+START_TIME = "2024-07-01 00:00"
+STEP = np.timedelta64(30, "m")
+CHUNK_ROWS = 100_000
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+DEFAULT_PROFILE_PATH = ROOT / "config" / "profiles" / "kz_realistic.yaml"
+
+# Anomaly kinds the generator knows how to inject; profiles give their weights.
+ANOMALY_TYPES = ["none", "high_salinity", "low_ph", "pressure_spike", "membrane_fouling"]
+
+
+class Profile:
+    """Region, method and anomaly profiles precomputed into lookup arrays.
+
+    Built once from a config file and shared by every chunk: per-region
+    temperature ranges, salinity means, capacities and method CDFs are indexed
+    by ``өңір_код``, per-method factors by the method index.
+    """
+
+    def __init__(self, config):
+        regions, methods, anomalies = config["regions"], config["methods"], config["anomalies"]
+        unknown = [name for name in anomalies if name not in ANOMALY_TYPES]
+        if unknown or "none" not in anomalies:
+            raise ValueError(f"Anomalies must include 'none' and only use {ANOMALY_TYPES}, got {list(anomalies)}")
+        self.regions = list(regions)
+        self.methods = list(methods)
+        self.anomaly_types = list(anomalies)
+
+        profiles = list(regions.values())
+        self.temp_low = np.array([p["temp"][0] for p in profiles], dtype=np.float64)
+        self.temp_high = np.array([p["temp"][1] for p in profiles], dtype=np.float64)
+        self.salinity_mean = np.array([np.mean(p["salinity"]) for p in profiles], dtype=np.float64)
+        self.capacity = np.array([p["capacity"] for p in profiles], dtype=np.int32)
+        weights = np.array([[p["methods"].get(m, 0.0) for m in self.methods] for p in profiles])
+        self.method_cdf = np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+        self.energy_factor = np.array([methods[m]["energy_factor"] for m in self.methods], dtype=np.float64)
+        self.filter_efficiency = np.array([methods[m]["filter_efficiency"] for m in self.methods], dtype=np.float64)
+        anomaly_weights = np.array(list(anomalies.values()), dtype=np.float64)
+        self.anomaly_cdf = np.cumsum(anomaly_weights) / anomaly_weights.sum()
+        # -1 for kinds this profile never injects, so the masks below stay empty.
+        self.anomaly_code = {name: self.anomaly_types.index(name) if name in anomalies else -1 for name in ANOMALY_TYPES}
+
+    @classmethod
+    def load(cls, path=None):
+        import yaml
+
+        with open(path or DEFAULT_PROFILE_PATH, encoding="utf-8") as f:
+            return cls(yaml.safe_load(f))
+
+
+_default_profile = None
+
+
+def default_profile():
+    """The ``kz_realistic`` profile, loaded once per process."""
+    global _default_profile
+    if _default_profile is None:
+        _default_profile = Profile.load()
+    return _default_profile
+
+
+def _choose(cdf, u):
+    """Index of the bucket ``u`` falls in, for per-row CDFs of shape ``(n, k)``."""
+    return np.minimum((u[:, None] >= cdf).sum(axis=1), cdf.shape[1] - 1)
+
+
+def _timestamps(start_time, offset, rows, step):
+    return np.datetime64(start_time, "s") + (offset + np.arange(rows)) * step
+
+
+def generate_chunk(chunk_index, offset, rows, seed=42, start_time=START_TIME, step=STEP, profile=None):
+    """Rows ``offset .. offset + rows`` of the dataset (random region per reading)."""
+    profile = profile or default_profile()
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    times = _timestamps(start_time, offset, rows, step)
+    code = rng.integers(0, len(profile.regions), rows)
+    return _readings(rng, times, code, profile)
+
+
+def generate_plant_block(region_code, block_index, offset, rows, seed=42, start_time=START_TIME, step=STEP,
+                         profile=None):
+    """Readings ``offset .. offset + rows`` of one region's plant, seeded per (region, block)."""
+    profile = profile or default_profile()
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(region_code, block_index)))
+    times = _timestamps(start_time, offset, rows, step)
+    return _readings(rng, times, np.full(rows, region_code, dtype=np.int64), profile)
+
+
+def _readings(rng, times, code, profile):
+    rows = len(times)
+    anomaly_code = profile.anomaly_code
+    hour = (times - times.astype("M8[D]")).astype("m8[h]").astype(np.int64)
+    month = times.astype("M8[M]").astype(np.int64) % 12 + 1
+
+    seasonal_temp = 6 * np.sin(2 * np.pi * (month - 6) / 12)
+    seasonal_salinity = 300 * np.sin(2 * np.pi * (month - 8) / 12)
+    daily_temp = np.where(hour < 6, -2, np.where((hour > 12) & (hour < 17), 3, 0))
+    temp = np.clip(rng.uniform(profile.temp_low[code], profile.temp_high[code]) + seasonal_temp + daily_temp, 0, 50)
+    salinity = np.clip(rng.normal(profile.salinity_mean[code], 600) + seasonal_salinity, 500, 16000)
+
+    ph = np.clip(rng.normal(7.4 - 0.00004 * salinity, 0.3), 6.0, 8.5)
+    pressure = np.clip(rng.normal(4.5, 0.9, rows), 2.0, 7.5)
+    level = np.clip(rng.normal(60, 20, rows), 10, 120)
+
+    method = _choose(profile.method_cdf[code], rng.random(rows))
+    filter_efficiency = np.clip(rng.normal(profile.filter_efficiency[method], 0.05), 0.7, 0.95)
+
+    membrane_age = rng.integers(30, 730, rows)
+    maintenance_status = (rng.random(rows) < 0.02).astype(np.int8)
+
+    anomaly_type = np.searchsorted(profile.anomaly_cdf, rng.random(rows), side="right")
+    anomaly_type = anomaly_type.clip(max=len(profile.anomaly_types) - 1)
+    salinity = np.where(anomaly_type == anomaly_code["high_salinity"], salinity * rng.uniform(1.3, 1.8, rows), salinity)
+    ph = np.where(anomaly_type == anomaly_code["low_ph"], rng.uniform(4.5, 5.5, rows), ph)
+    pressure = np.where(anomaly_type == anomaly_code["pressure_spike"], pressure * rng.uniform(1.5, 2.0, rows), pressure)
+    filter_efficiency = np.where(anomaly_type == anomaly_code["membrane_fouling"], filter_efficiency * rng.uniform(0.6, 0.8, rows), filter_efficiency)
+
+    output_pressure = np.clip(
+        0.002 * salinity + 0.04 * temp - 0.25 * ph + 0.1 * pressure - 0.05 * (membrane_age / 365)
+        + rng.normal(0, 0.3, rows),
+        0, 10,
+    )
+    energy_base = profile.energy_factor[method] * pressure / filter_efficiency
+    energy_consumption = np.clip(energy_base + rng.normal(0, 0.2, rows), 0.5, 5.0)
+
+    energy_cost = energy_consumption * 0.1
+    maintenance_cost = np.where(maintenance_status == 1, 0.2, 0.05) + 0.01 * (membrane_age / 365)
+    operational_cost = np.clip(energy_cost + maintenance_cost, 0.1, 2.0)
+
+    return pd.DataFrame({
+        TIME_COL: times.astype("M8[ns]"),
+        REGION_COL: pd.Categorical.from_codes(code, profile.regions),
+        "өңір_код": code.astype(np.int16 if len(profile.regions) > 127 else np.int8),
+        "температура": temp.round(2),
+        "тұздылық": salinity.round(2),
+        "pH": ph.round(2),
+        "кіру_қысымы": pressure.round(2),
+        "су_деңгейі": level.round(2),
+        "шығыс_қысымы": output_pressure.round(2),
+        "аномалия": (anomaly_type != anomaly_code["none"]).astype(np.int8),
+        "аномалия_түрі": pd.Categorical.from_codes(anomaly_type, profile.anomaly_types),
+        "әдіс": pd.Categorical.from_codes(method, profile.methods),
+        "фильтр_тиімділігі": filter_efficiency.round(2),
+        "мембрана_жасы": membrane_age.astype(np.int16),
+        "техникалық_жағдай": maintenance_status,
+        "зауыт_сыйымдылығы": profile.capacity[code],
+        "энергия_шығыны": energy_consumption.round(2),
+        "операциялық_шығын": operational_cost.round(2),
+    })
+
+
+def iter_chunks(rows, seed=42, start_time=START_TIME, chunk_rows=CHUNK_ROWS, profile=None):
+    profile = profile or default_profile()
+    for chunk_index, offset in enumerate(range(0, rows, chunk_rows)):
+        yield generate_chunk(chunk_index, offset, min(chunk_rows, rows - offset), seed, start_time, STEP, profile)
+
+
+def write_chunks(chunks, path, fmt="csv", time_format=TIME_FORMAT):
+    """Append frames to one CSV or Parquet file; returns the number of rows written."""
+    rows = 0
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            for chunk in chunks:
+                chunk.to_csv(out, header=rows == 0, index=False, date_format=time_format)
+                rows += len(chunk)
+        return rows
+    if fmt != "parquet":
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -0,0 +1,242 @@
+"""Streaming ingestion of sensor CSVs into running aggregates.
+
+Plant exports can be several GB, so they are read ``CHUNK_ROWS`` rows at a time
+with the categories from ``schema.PARSE_DTYPES``. Rows with a non-numeric cell
+in a numeric column, or an empty or non-integral integer column, are dropped and
+counted as rejected, and the rest are downcast to ``schema.DTYPES``. Each chunk
+is validated, folded
+into ``SensorAggregates`` (mergeable per region/method moments behind the
+regional means, correlation matrix and method histograms, plus the time
+rollups of ``rollup.Rollups``) and dropped; only a small per-region sample of
+raw rows is kept for the row-level tabs.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from .schema import (
+    CATEGORY_COLS, FEATURES, FLOAT_DTYPES, INT_DTYPES, METHOD_COL, PARSE_DTYPES, REGION_COL, REGION_MEAN_COLS,
+    SUMMARY_COLS, TIME_COL,
+)
+from .rollup import Rollups
+from .stats import Moments, merge_all
+
+CHUNK_ROWS = 100_000
+SAMPLE_ROWS = 1_000
+REQUIRED_COLS = [REGION_COL] + FEATURES[1:]
+
+
+class MissingColumnsError(ValueError):
+    """The CSV lacks columns the dashboard needs (as opposed to values that do not parse)."""
+
+
+def validate_chunk(chunk):
+    """Raise ``MissingColumnsError`` if a chunk lacks the columns the dashboard needs."""
+    missing = [col for col in REQUIRED_COLS + REGION_MEAN_COLS + [METHOD_COL] if col not in chunk.columns]
+    if missing:
+        raise MissingColumnsError(f"Missing columns: {', '.join(dict.fromkeys(missing))}")
+
+
+def coerce_integers(frame):
+    """``(frame, invalid)``: rows with empty, fractional or out-of-range integer columns dropped, the rest downcast."""
+    columns = [col for col in INT_DTYPES if col in frame.columns]
+    if not columns:
+        return frame, 0
+    values = frame[columns].to_numpy(dtype=np.float64)
+    low = np.array([np.iinfo(INT_DTYPES[col]).min for col in columns])
+    high = np.array([np.iinfo(INT_DTYPES[col]).max for col in columns])
+    with np.errstate(invalid="ignore"):
+        valid = ((values == np.round(values)) & (values >= low) & (values <= high)).all(axis=1)
+    if not valid.all():
+        frame = frame[valid]
+    return frame.astype({col: INT_DTYPES[col] for col in columns}), int((~valid).sum())
+
+
+def coerce_numbers(frame):
+    """``(frame, invalid)``: rows with a non-numeric cell dropped, numeric columns typed as ``schema.DTYPES``.
+
+    Empty float cells stay NaN (a missing reading); integer columns then go
+    through ``coerce_integers``. ``invalid`` counts every dropped row.
+    """
+    columns = [col for col in list(FLOAT_DTYPES) + list(INT_DTYPES) if col in frame.columns]
+    invalid = np.zeros(len(frame), dtype=bool)
+    coerced = {}
+    for col in columns:
+        # The parser only leaves a column as text when some cell is not a number.
+        if not is_numeric_dtype(frame[col]):
+            numbers = pd.to_numeric(frame[col], errors="coerce")
+            invalid |= (numbers.isna() & frame[col].notna()).to_numpy()
+            coerced[col] = numbers
+    if coerced:
+        frame = frame.assign(**coerced)
+    if invalid.any():
+        frame = frame[~invalid]
+    frame = frame.astype({col: FLOAT_DTYPES[col] for col in columns if col in FLOAT_DTYPES})
+    frame, rejected = coerce_integers(frame)
+    return frame, int(invalid.sum()) + rejected
+
+
+def iter_parsed(path_or_buffer, chunk_rows=CHUNK_ROWS, names=None):
+    """Yield ``(chunk, invalid)``: validated, typed chunks of a sensor CSV and the rows dropped from each.
+
+    ``names`` reads a headerless continuation, e.g. rows appended after an offset.
+    """
+    header = "infer" if names is None else None
+    with pd.read_csv(path_or_buffer, dtype=PARSE_DTYPES, chunksize=chunk_rows, header=header, names=names) as reader:
+        for chunk in reader:
+            validate_chunk(chunk)
+            if TIME_COL in chunk.columns:
+                chunk[TIME_COL] = pd.to_datetime(chunk[TIME_COL])
+            yield coerce_numbers(chunk)
+
+
+def iter_chunks(path_or_buffer, chunk_rows=CHUNK_ROWS, names=None):
+    """Yield validated, typed chunks of a sensor CSV (``iter_parsed`` without the counts)."""
+    for chunk, _ in iter_parsed(path_or_buffer, chunk_rows, names):
+        yield chunk
+
+
+class SensorAggregates:
+    """Mergeable statistics over every ingested row, independent of the row count.
+
+    Only the weekly level of ``rollups`` grows, with the time span covered (see ``rollup.RETENTION``).
+
+    One ``Moments`` accumulator per (region, method) pair; region means, counts,
+    method histograms and the correlation matrix are all derived by merging
+    them. Appending a batch costs O(batch), and states from shards or workers
+    combine with ``merge``.
+    """
+
+    def __init__(self, sample_rows=SAMPLE_ROWS):
+        self.sample_rows = sample_rows
+        self.rows = 0
+        self.rejected = 0
+        self._moments = {}
+        self._samples = []
+        self._sampled = {}
+        self.rollups = Rollups()
+
+    def update(self, chunk, invalid=0):
+        """Fold in a chunk; ``invalid`` counts rows already dropped from it while parsing."""
+        self.rows += len(chunk) + invalid
+        self.rollups.update(chunk)
+        valid = chunk.dropna(subset=[REGION_COL, METHOD_COL] + REGION_MEAN_COLS)
+        self.rejected += len(chunk) - len(valid) + invalid
+        if valid.empty:
+            return self
+
+        values = valid[REGION_MEAN_COLS].to_numpy(dtype=np.float64)
+        regions = valid[REGION_COL].astype(str)
+        methods = valid[METHOD_COL].astype(str)
+        for key, positions in pd.DataFrame({"r": regions, "m": methods}).groupby(["r", "m"]).indices.items():
+            batch = Moments.of(values[positions])
+            if key in self._moments:
+                self._moments[key].merge(batch)
+            else:
+                self._moments[key] = batch
+
+        already = regions.map(self._sampled).fillna(0).to_numpy()
+        keep = valid.groupby(regions).cumcount().to_numpy() + already < self.sample_rows
+        if keep.any():
+            self._add_sample(valid[keep])
+        return self
+
+    def _add_sample(self, rows):
+        self._samples.append(rows)
+        for region, count in rows[REGION_COL].astype(str).value_counts().items():
+            self._sampled[region] = self._sampled.get(region, 0) + int(count)
+
+    def merge(self, other):
+        """Fold in the state of another ``SensorAggregates`` (another shard or batch)."""
+        self.rows += other.rows
+        self.rejected += other.rejected
+        for key, moments in other._moments.items():
+            if key in self._moments:
+                self._moments[key].merge(moments)
+            else:
+                self._moments[key] = moments.copy()
+        self.rollups.merge(other.rollups)
+        sample = other.sample()
+        if len(sample):
+            regions = sample[REGION_COL].astype(str)
+            already = regions.map(self._sampled).fillna(0).to_numpy()
+            keep = sample.groupby(regions, observed=True).cumcount().to_numpy() + already < self.sample_rows
+            if keep.any():
+                self._add_sample(sample[keep])
+        return self
+
+    def to_state(self):
+        """JSON-serializable accumulators (everything except the raw-row sample)."""
+        return {
+            "sample_rows": self.sample_rows,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "moments": [[region, method, m.to_state()] for (region, method), m in self._moments.items()],
+            "sampled": self._sampled,
+        }
+
+    @classmethod
+    def from_state(cls, state, sample=None, rollups=None):
+        aggregates = cls(state["sample_rows"])
+        if rollups is not None:
+            aggregates.rollups = rollups
+        aggregates.rows = state["rows"]
+        aggregates.rejected = state["rejected"]
+        aggregates._moments = {
+            (region, method): Moments.from_state(m) for region, method, m in state["moments"]
+        }
+        aggregates._sampled = dict(state["sampled"])
+        if sample is not None and len(sample):
+            aggregates._samples = [sample]
+        return aggregates
+
+    def _by_region(self):
+        grouped = {}
+        for (region, _), moments in self._moments.items():
+            grouped.setdefault(region, []).append(moments)
+        return {region: merge_all(parts, len(REGION_MEAN_COLS)) for region, parts in sorted(grouped.items())}
+
+    def region_counts(self):
+        counts = {region: m.n for region, m in self._by_region().items()}
+        return pd.Series(counts, name="count", dtype="int64").rename_axis(REGION_COL)
+
+    def region_means(self):
+        """Per-region column means, like ``df.groupby("өңір")[REGION_MEAN_COLS].mean()``."""
+        means = {region: m.mean for region, m in self._by_region().items()}
+        return pd.DataFrame.from_dict(means, orient="index", columns=REGION_MEAN_COLS).rename_axis(REGION_COL)
+
+    def correlation(self, columns=SUMMARY_COLS, region=None):
+        """Pearson correlation, like ``df[columns].corr()`` (optionally for one region)."""
+        parts = [m for (r, _), m in self._moments.items() if region is None or r == region]
+        corr = merge_all(parts, len(REGION_MEAN_COLS)).correlation()
+        full = pd.DataFrame(corr, index=REGION_MEAN_COLS, columns=REGION_MEAN_COLS)
+        return full.loc[columns, columns]
+
+    def method_counts(self):
+        """Long frame of ``өңір``, ``әдіс`` and ``count`` rows."""
+        rows = [(region, method, m.n) for (region, method), m in sorted(self._moments.items())]
+        return pd.DataFrame(rows, columns=[REGION_COL, METHOD_COL, "count"])
+
+    def sample(self):
+        """Up to ``sample_rows`` raw rows per region, in ingestion order."""
+        if not self._samples:
+            return pd.DataFrame(columns=REQUIRED_COLS)
+        frame = pd.concat(self._samples, ignore_index=True)
+        for col in CATEGORY_COLS:
+            if col in frame.columns:
+                frame[col] = frame[col].astype("category")
+        return frame
+
+
+def ingest(path_or_buffer, chunk_rows=CHUNK_ROWS, sample_rows=SAMPLE_ROWS, on_chunk=None,
+           aggregates=None, names=None):
+    """Stream a sensor CSV into ``SensorAggregates``; ``on_chunk`` sees every raw chunk.
+
+    Passing existing ``aggregates`` continues them, so appended rows cost O(new rows).
+    """
+    aggregates = aggregates if aggregates is not None else SensorAggregates(sample_rows)
+    for chunk, invalid in iter_parsed(path_or_buffer, chunk_rows, names):
+        aggregates.update(chunk, invalid)
+        if on_chunk is not None:
+            on_chunk(chunk)
+    return aggregates
@@ -0,0 +1,162 @@
+"""Flat, array-based scoring for the IsolationForest anomaly model.
+
+An isolation forest scores a row by the average depth at which its trees
+isolate it, ``2 ** (-mean_path / c(max_samples))``. For a given leaf that path
+length is a constant: the leaf depth plus ``c(n)``, the average path length of an
+unbuilt subtree over the ``n`` training samples left in the leaf. So
+``compile_isolation_forest`` (needs scikit-learn) stores it per node next to the
+flattened split arrays, and ``FlatIsolationForest`` reduces scoring to one tree
+walk and a gather-and-sum with plain NumPy. As for the regression forest
+(``forest``), batches go to the sklearn model when it is at hand.
+"""
+import numpy as np
+
+from .forest import SMALL_BATCH, TREE_BLOCK_ROWS, apply_trees, sum_leaves
+from .schema import FEATURES
+
+
+def average_path_length(n):
+    """``c(n)``: average path length of an unsuccessful BST search among ``n`` points."""
+    n = np.asarray(n, dtype=np.float64)
+    out = np.zeros_like(n)
+    out[n == 2] = 1.0
+    big = n > 2
+    out[big] = 2.0 * (np.log(n[big] - 1.0) + np.euler_gamma) - 2.0 * (n[big] - 1.0) / n[big]
+    return out
+
+
+class FlatIsolationForest:
+    """All isolation trees as contiguous node arrays; same results as sklearn's
+    ``score_samples``/``decision_function``/``predict``.
+
+    ``path`` is the per-node path length ``depth + c(n_node_samples)``; only its
+    leaf entries are ever read. ``batch_model`` works as in ``forest.FlatForest``.
+    """
+
+    batch_model = None
+
+    def __init__(self, feature, threshold, left, right, path, roots, max_depth, normalizer, offset,
+                 features=FEATURES):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.path = np.ascontiguousarray(path, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        # n_trees * c(max_samples): turns the summed path lengths into the normalized mean.
+        self.normalizer = float(normalizer)
+        self.offset_ = float(offset)
+        self.feature_names_in_ = np.asarray(features, dtype=object)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def score_samples(self, X):
+        """Opposite of the anomaly score; lower is more abnormal."""
+        if len(X) > SMALL_BATCH and self.batch_model is not None:
+            return self.batch_model().score_samples(X)
+        X = self._as_matrix(X)
+        arrays = (self.feature, self.threshold, self.left, self.right, self.roots)
+        if len(X) <= SMALL_BATCH:
+            depths = self.path[apply_trees(X, *arrays, self.max_depth)].sum(axis=1)
+        else:
+            depths = np.concatenate([
+                sum_leaves(X[start:start + TREE_BLOCK_ROWS], *arrays, self.path)
+                for start in range(0, len(X), TREE_BLOCK_ROWS)
+            ])
+        if self.normalizer == 0:
+            return -np.ones(len(X))
+        return -(2.0 ** (-depths / self.normalizer))
+
+    def decision_function(self, X):
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X):
+        """``-1`` for anomalies, ``1`` for normal rows."""
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)]
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def save(self, path):
+        """Write ``.npz``, or for any other suffix the memory-mappable ``artifact`` format."""
+        arrays = {
+            "feature": self.feature, "threshold": self.threshold, "left": self.left, "right": self.right,
+            "path": self.path, "roots": self.roots,
+        }
+        meta = {
+            "max_depth": self.max_depth, "normalizer": self.normalizer, "offset": self.offset_,
+            "features": list(self.feature_names_in_),
+        }
+        if str(path).endswith(".npz"):
+            np.savez(
+                path, **arrays, max_depth=self.max_depth, normalizer=self.normalizer, offset=self.offset_,
+                features=np.asarray(self.feature_names_in_, dtype=str),
+            )
+            return
+        from . import artifact
+
+        artifact.write(path, type(self).__name__, arrays, meta)
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(
+            arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"], arrays["path"],
+            arrays["roots"], meta["max_depth"], meta["normalizer"], meta["offset"], meta["features"],
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load either format; artifact files are memory-mapped rather than read."""
+        if not str(path).endswith(".npz"):
+            from . import artifact
+
+            return artifact.load(path)
+        with np.load(path) as data:
+            return cls(
+                data["feature"], data["threshold"], data["left"], data["right"], data["path"],
+                data["roots"], data["max_depth"], data["normalizer"], data["offset"],
+                data["features"].tolist(),
+            )
+
+
+def _node_depths(children_left, children_right):
+    depth = np.zeros(len(children_left), dtype=np.int64)
+    # sklearn numbers children after their parent, so one forward pass suffices.
+    for node in range(len(children_left)):
+        if children_left[node] >= 0:
+            depth[children_left[node]] = depth[children_right[node]] = depth[node] + 1
+    return depth
+
+
+def compile_isolation_forest(model):
+    """Flatten a fitted sklearn ``IsolationForest``."""
+    feature, threshold, left, right, path, roots = [], [], [], [], [], []
+    max_depth, offset = 0, 0
+    # Like sklearn, trees only see a column subset when max_features < 1.0.
+    subsampled = getattr(model, "_max_features", model.n_features_in_) != model.n_features_in_
+    for estimator, features in zip(model.estimators_, model.estimators_features_):
+        tree = estimator.tree_
+        ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left < 0
+        split = np.where(is_leaf, 0, tree.feature)
+        feature.append(np.asarray(features)[split] if subsampled else split)
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+        depth = _node_depths(tree.children_left, tree.children_right)
+        path.append(depth + average_path_length(tree.n_node_samples))
+        roots.append(offset)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += tree.node_count
+
+    normalizer = len(model.estimators_) * average_path_length([model.max_samples_])[0]
+    features = getattr(model, "feature_names_in_", FEATURES[:model.n_features_in_])
+    return FlatIsolationForest(
+        np.concatenate(feature), np.concatenate(threshold), np.concatenate(left), np.concatenate(right),
+        np.concatenate(path), np.asarray(roots), max_depth, normalizer, model.offset_, list(features),
+    )
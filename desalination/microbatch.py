@@ -0,0 +1,106 @@
+"""Coalesce concurrent scoring requests into micro-batches.
+
+Tree models score one row in about the time they score a few hundred, so a
+server that calls them per request wastes most of each call. ``MicroBatcher``
+queues the feature rows of concurrent requests and scores them together once
+``max_rows`` rows are waiting or ``max_wait`` seconds have passed since the
+first one arrived, whichever comes first. Scoring runs in a worker thread so
+the event loop keeps accepting requests meanwhile. If a batch fails, each of
+its requests is scored on its own, so only the request that caused the error
+receives it.
+"""
+import asyncio
+
+import numpy as np
+
+MAX_ROWS = 512
+MAX_WAIT = 0.002
+
+
+class MicroBatcher:
+    """``await batcher.submit(X)`` returns ``score(X)``, computed inside a shared batch.
+
+    ``score`` maps a ``(rows, features)`` array to a sequence of per-row results
+    (an array or frame with one row per input row).
+    """
+
+    def __init__(self, score, max_rows=MAX_ROWS, max_wait=MAX_WAIT):
+        self.score = score
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, X):
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.asarray(X), future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        size = len(pending[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while size < self.max_rows:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    async def _score_alone(self, x, future):
+        try:
+            result = await asyncio.to_thread(self.score, x)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.rows += len(x)
+        if not future.done():
+            future.set_result(result)
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            if len(pending) == 1:
+                await self._score_alone(*pending[0])
+                continue
+            try:
+                X = np.concatenate([x for x, _ in pending])
+                results = await asyncio.to_thread(self.score, X)
+            except Exception:
+                for x, future in pending:
+                    await self._score_alone(x, future)
+                continue
+            self.batches += 1
+            self.rows += len(X)
+            offset = 0
+            for x, future in pending:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(x)])
+                offset += len(x)
+
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows, "mean_batch_rows": self.rows / max(self.batches, 1)}
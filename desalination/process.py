@@ -0,0 +1,161 @@
+"""The Tab 6 two-stage (nanofiltration, then reverse osmosis) process model.
+
+``DesalinationProcess.evaluate`` is pure and broadcasts over arrays, so a
+what-if sweep over many slider positions is one call. ``ResponseSurface``
+tabulates the model once over the slider ranges and answers by multilinear
+interpolation, and ``evaluate_cached`` memoizes results on the slider state
+rounded to the slider steps, which is what a Streamlit rerun asks for again
+and again.
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+RECOVERY_NANO = 0.6
+RECOVERY_RO = 0.4
+# Tab 6 slider (low, high, step), in ``DesalinationProcess.evaluate`` argument order.
+SLIDERS = {
+    "initial_salinity": (1000.0, 15000.0, 100.0),
+    "r_nano": (0.5, 0.8, 0.01),
+    "r_ro": (0.9, 0.98, 0.01),
+    "pressure": (2.0, 7.0, 0.1),
+    "flow_rate": (1.0, 10.0, 0.5),
+    "energy_efficiency": (0.7, 0.9, 0.01),
+}
+CACHE_SIZE = 4096
+
+
+class ProcessOutputs(NamedTuple):
+    sal_nano: np.ndarray
+    sal_ro: np.ndarray
+    output_flow: np.ndarray
+    total_recovery: np.ndarray
+    energy_nano: np.ndarray
+    energy_ro: np.ndarray
+    total_energy: np.ndarray
+    operational_cost: np.ndarray
+
+
+def fixed_cost(maintenance, membrane_age):
+    """Maintenance and membrane-ageing part of the operational cost ($/m³)."""
+    return np.where(np.asarray(maintenance) > 0, 0.2, 0.05) + 0.01 * (np.asarray(membrane_age) / 365)
+
+
+class DesalinationProcess:
+    """Salinity, flow, energy and cost of the two stages for given operating points."""
+
+    def __init__(self, recovery_nano=RECOVERY_NANO, recovery_ro=RECOVERY_RO):
+        self.recovery_nano = recovery_nano
+        self.recovery_ro = recovery_ro
+
+    def salinity(self, initial_salinity, r_nano, r_ro):
+        """``(sal_nano, sal_ro)`` in ppm."""
+        sal_nano = initial_salinity * (1 - np.asarray(r_nano))
+        return sal_nano, sal_nano * (1 - np.asarray(r_ro))
+
+    def energy(self, pressure, flow_rate, energy_efficiency):
+        """``(energy_nano, energy_ro)`` in kWh/m³."""
+        base = np.asarray(pressure) * flow_rate / (np.asarray(energy_efficiency) * 3600)
+        return base * 0.5, base * 1.5
+
+    def evaluate(self, initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency,
+                 maintenance=0, membrane_age=0):
+        sal_nano, sal_ro = self.salinity(initial_salinity, r_nano, r_ro)
+        energy_nano, energy_ro = self.energy(pressure, flow_rate, energy_efficiency)
+        return self._outputs(sal_nano, sal_ro, flow_rate, energy_nano, energy_ro, maintenance, membrane_age)
+
+    def _outputs(self, sal_nano, sal_ro, flow_rate, energy_nano, energy_ro, maintenance, membrane_age):
+        total_recovery = self.recovery_nano * self.recovery_ro
+        total_energy = energy_nano + energy_ro
+        return ProcessOutputs(
+            sal_nano=sal_nano,
+            sal_ro=sal_ro,
+            output_flow=np.asarray(flow_rate) * total_recovery,
+            total_recovery=np.broadcast_to(total_recovery, np.shape(sal_nano)),
+            energy_nano=energy_nano,
+            energy_ro=energy_ro,
+            total_energy=total_energy,
+            operational_cost=total_energy * 0.1 + fixed_cost(maintenance, membrane_age),
+        )
+
+
+def slider_axis(name, step=None):
+    low, high, slider_step = SLIDERS[name]
+    step = step or slider_step
+    return np.linspace(low, high, int(round((high - low) / step)) + 1)
+
+
+class ResponseSurface:
+    """``DesalinationProcess`` tabulated over the slider ranges, read back by interpolation.
+
+    Salinity depends only on ``(initial_salinity, r_nano, r_ro)`` and energy only
+    on ``(pressure, flow_rate, energy_efficiency)``, so two 3-D tables cover the
+    6-D slider space. With the default axes (one node per slider step) every
+    slider position is a grid node and the lookup is exact; in between, the
+    salinity table is exact (it is multilinear) and energy is off by well under
+    0.1% from the curvature in ``1/η``. Points outside the ranges raise
+    ``ValueError``.
+    """
+
+    def __init__(self, process=None, steps=None):
+        from scipy.interpolate import RegularGridInterpolator
+
+        self.process = process or DesalinationProcess()
+        steps = steps or {}
+        axes = {name: slider_axis(name, steps.get(name)) for name in SLIDERS}
+        s0, r_nano, r_ro, pressure, flow, efficiency = (axes[name] for name in SLIDERS)
+
+        sal_grid = np.meshgrid(s0, r_nano, r_ro, indexing="ij")
+        energy_grid = np.meshgrid(pressure, flow, efficiency, indexing="ij")
+        self._salinity = RegularGridInterpolator(
+            (s0, r_nano, r_ro), np.stack(self.process.salinity(*sal_grid), axis=-1))
+        # Energy is linear in pressure and flow, so tabulating the common factor suffices.
+        self._energy = RegularGridInterpolator(
+            (pressure, flow, efficiency), self.process.energy(*energy_grid)[0])
+        self.size = sal_grid[0].size + energy_grid[0].size
+
+    def evaluate(self, initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency,
+                 maintenance=0, membrane_age=0):
+        shape = np.broadcast_shapes(*(np.shape(v) for v in (
+            initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency)))
+        sal = self._salinity(_points(shape, initial_salinity, r_nano, r_ro))
+        energy_nano = self._energy(_points(shape, pressure, flow_rate, energy_efficiency)).reshape(shape)
+        return self.process._outputs(
+            sal[:, 0].reshape(shape), sal[:, 1].reshape(shape), np.broadcast_to(flow_rate, shape),
+            energy_nano, energy_nano * 3, maintenance, membrane_age,
+        )
+
+
+def _points(shape, *values):
+    return np.stack([np.broadcast_to(np.asarray(v, dtype=np.float64), shape).ravel() for v in values], axis=-1)
+
+
+def quantize(initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency):
+    """Slider state snapped to the slider steps and ranges, as a hashable tuple."""
+    state = []
+    for (low, high, step), value in zip(SLIDERS.values(), (
+            initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency)):
+        steps = round((min(max(float(value), low), high) - low) / step)
+        state.append(round(low + steps * step, 10))
+    return tuple(state)
+
+
+_default_process = DesalinationProcess()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _evaluate_state(state, maintenance, membrane_age):
+    outputs = _default_process.evaluate(*state, maintenance, membrane_age)
+    return ProcessOutputs(*(float(v) for v in outputs))
+
+
+def evaluate_cached(initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency,
+                    maintenance=0, membrane_age=0):
+    """Scalar ``DesalinationProcess.evaluate`` on the quantized slider state, memoized."""
+    state = quantize(initial_salinity, r_nano, r_ro, pressure, flow_rate, energy_efficiency)
+    return _evaluate_state(state, int(bool(maintenance)), float(membrane_age))
+
+
+cache_info = _evaluate_state.cache_info
+cache_clear = _evaluate_state.cache_clear
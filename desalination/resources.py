@@ -0,0 +1,190 @@
+"""Process-wide cache for models and datasets.
+
+Streamlit re-executes the app script on every widget interaction, but imported
+modules stay in ``sys.modules``, so the cache below survives reruns and is shared
+by every session served by the process. Entries are keyed by the resolved path
+and invalidated when the file's signature (mtime + size) changes.
+
+Cached objects are shared: callers must treat them as read-only.
+"""
+import importlib.util
+import os
+import threading
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import (
+    ANOMALY_FOREST_PATH, ANOMALY_MODEL_PATH, DATA_PATH, FOREST_PATH, MODEL_PATH, PARSE_DTYPES, STORE_PATH,
+    TIME_COL,
+)
+
+# Reentrant: some loaders (``load_sample_shap``) load other cached resources.
+_lock = threading.RLock()
+_cache = {}
+
+
+def file_signature(path):
+    """Cheap change detector for a file: ``(mtime_ns, size)``."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached(kind, path, loader):
+    path = Path(path).resolve()
+    signature = file_signature(path)
+    key = (kind, str(path))
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        value = loader(path)
+        _cache[key] = (signature, value)
+        return value
+
+
+def _load_pickle(path):
+    from .startup import import_lock
+
+    # Unpickling imports scikit-learn (see ``startup``).
+    with import_lock:
+        import joblib
+
+        return joblib.load(path)
+
+
+def read_dataset(path_or_buffer):
+    """Parse a sensor CSV into a typed frame (categories, float32, parsed time).
+
+    Rows with a non-numeric cell or an empty or non-integral integer column are
+    dropped (``ingest.coerce_numbers``).
+    """
+    from .ingest import coerce_numbers
+
+    df = pd.read_csv(path_or_buffer, dtype=PARSE_DTYPES)
+    if TIME_COL in df.columns:
+        df[TIME_COL] = pd.to_datetime(df[TIME_COL])
+    return coerce_numbers(df)[0]
+
+
+def load_model(path=MODEL_PATH):
+    """Unpickle a model once per process; reload only if the file changed."""
+    return _cached("model", path, _load_pickle)
+
+
+def load_anomaly_model(path=ANOMALY_MODEL_PATH):
+    return _cached("model", path, _load_pickle)
+
+
+def load_forest(path=FOREST_PATH):
+    """Compiled ``FlatForest`` export of the regression model (no sklearn import)."""
+    from .forest import FlatForest
+
+    return _cached("forest", path, FlatForest.load)
+
+
+def load_anomaly_forest(path=ANOMALY_FOREST_PATH):
+    """Compiled ``FlatIsolationForest`` export of the anomaly model (no sklearn import)."""
+    from .isolation import FlatIsolationForest
+
+    return _cached("anomaly_forest", path, FlatIsolationForest.load)
+
+
+def _is_current(compiled_path, source_path):
+    """True if the compiled export exists and is not older than the pickle it came from."""
+    if not os.path.exists(compiled_path):
+        return False
+    return not os.path.exists(source_path) or file_signature(source_path)[0] <= file_signature(compiled_path)[0]
+
+
+def _with_batch_model(compiled, model_path, load):
+    """Let ``compiled`` hand batches to its pickle, loaded on first use (if sklearn is installed)."""
+    if compiled.batch_model is None and os.path.exists(model_path) and importlib.util.find_spec("sklearn"):
+        compiled.batch_model = partial(load, model_path)
+    return compiled
+
+
+def load_predictor(model_path=MODEL_PATH, forest_path=FOREST_PATH):
+    """The compiled forest unless it is missing or older than the pickle it came from.
+
+    The compiled forest scores single rows and small batches; larger batches go
+    to the pickle (see ``forest.SMALL_BATCH``).
+    """
+    if _is_current(forest_path, model_path):
+        return _with_batch_model(load_forest(forest_path), model_path, load_model)
+    return load_model(model_path)
+
+
+def load_anomaly_detector(model_path=ANOMALY_MODEL_PATH, forest_path=ANOMALY_FOREST_PATH):
+    """The compiled isolation forest unless it is missing or older than its pickle (batches as above)."""
+    if _is_current(forest_path, model_path):
+        return _with_batch_model(load_anomaly_forest(forest_path), model_path, load_anomaly_model)
+    return load_anomaly_model(model_path)
+
+
+def load_sample_shap(model_path=MODEL_PATH, forest_path=FOREST_PATH):
+    """``explain.explain`` of the dashboard's rows (the aggregates' sample with the store) for the served model.
+
+    Cached per process and keyed on the served model file, so only the first
+    session after a start or a model change pays for it (Tab 8).
+    """
+    from . import explain
+
+    def compute(_):
+        rows = load_aggregates().sample() if has_store() else load_dataset()
+        return explain.explain(rows, load_predictor(model_path, forest_path))
+
+    return _cached("sample_shap", forest_path if _is_current(forest_path, model_path) else model_path, compute)
+
+
+def load_dataset(path=DATA_PATH):
+    """Typed sensor frame shared read-only by all sessions."""
+    return _cached("dataset", path, read_dataset)
+
+
+def has_store(root=STORE_PATH):
+    from .store import MANIFEST
+
+    return (Path(root) / MANIFEST).exists()
+
+
+def load_history(root=STORE_PATH, columns=None, regions=None, start=None, end=None):
+    """Projected, filtered slice of the Parquet store, cached per query.
+
+    Keyed on the store's manifest, which ``write_store`` rewrites after every conversion.
+    """
+    from .store import MANIFEST, read_store
+
+    query = (
+        "history",
+        tuple(columns) if columns is not None else None,
+        tuple(regions) if regions is not None else None,
+        str(start), str(end),
+    )
+    return _cached(query, Path(root) / MANIFEST, lambda manifest: read_store(manifest.parent, columns, regions, start, end))
+
+
+def load_aggregates(path=None):
+    """``SensorAggregates`` of the dashboard's data (Tabs 2, 3, 6 and 7).
+
+    By default they come from the same source as the row-level tabs: the
+    store's own aggregates (``store.load_aggregates``) if it has been built,
+    otherwise the bundled CSV. A CSV's aggregates are computed once per file
+    content and persisted by ``aggregate_cache``, so a restart only hashes the
+    file instead of re-reading it.
+    """
+    if path is None and has_store():
+        from .store import MANIFEST
+        from .store import load_aggregates as load_store_aggregates
+
+        return _cached("aggregates", Path(STORE_PATH) / MANIFEST, lambda manifest: load_store_aggregates(manifest.parent))
+
+    from .aggregate_cache import load_or_compute
+
+    return _cached("aggregates", path if path is not None else DATA_PATH, load_or_compute)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
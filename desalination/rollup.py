@@ -0,0 +1,252 @@
+"""Multi-resolution time rollups of the sensor metrics and LTTB downsampling.
+
+``Rollups`` keeps count/sum/min/max of every metric per region and time bucket
+at each of ``RESOLUTIONS`` (1 minute, 1 hour, 1 day, 7 days). The finer levels
+only keep the ``RETENTION`` before the newest reading (2 days of minutes, 90
+days of hours, 2 years of days), so their size is bounded whatever the
+history; only the weekly level grows, by one bucket per region and week. A chunk's rows are bucketed at
+the finest level that retains them and folded into the coarser ones, so
+ingestion costs O(chunk) and states merge like ``SensorAggregates``. Partial
+frames are appended and compacted (and pruned) every ``COMPACT_PARTS`` updates.
+
+``Rollups.series`` answers a chart query from the finest level that covers the
+visible range and keeps it under ``OVERSAMPLE * max_points`` buckets, and
+``downsample`` (``lttb``) reduces that to ``max_points``, so neither the query
+nor the points sent to the browser grow with the history.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .schema import REGION_COL, REGION_MEAN_COLS, TIME_COL
+
+RESOLUTIONS = {"1min": "1min", "1h": "1h", "1d": "1D", "1w": "7D"}
+# History kept before the newest reading; the coarsest level keeps everything.
+RETENTION = {"1min": pd.Timedelta(days=2), "1h": pd.Timedelta(days=90), "1d": pd.Timedelta(days=730)}
+METRICS = REGION_MEAN_COLS
+STATS = ("count", "sum", "min", "max")
+COMPACT_PARTS = 32
+MAX_POINTS = 1_000
+OVERSAMPLE = 8
+_SEP = "|"
+_COMBINE = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+
+
+def _bucket(chunk, freq, metrics):
+    times = chunk[TIME_COL].dt.floor(freq)
+    values = chunk[metrics].astype(np.float64)
+    # Grouping by region codes rather than strings; the index level is made str afterwards.
+    regions = chunk[REGION_COL].astype("category")
+    groups = values.groupby([regions, times], sort=True, observed=True)
+    stats = pd.concat({stat: getattr(groups, stat)() for stat in STATS}, axis=1)
+    stats.columns = [f"{metric}{_SEP}{stat}" for stat, metric in stats.columns]
+    stats = stats[[f"{metric}{_SEP}{stat}" for metric in metrics for stat in STATS]]
+    stats.index = stats.index.set_levels(stats.index.levels[0].astype(str), level=0)
+    stats.index.names = [REGION_COL, TIME_COL]
+    return stats
+
+
+def _combine(frame, freq=None, by_region=True):
+    """Merge rows of ``frame`` that share a bucket, optionally coarsened to ``freq`` or across regions."""
+    times = frame.index.get_level_values(TIME_COL)
+    if freq is not None:
+        times = times.floor(freq)
+    keys = [frame.index.get_level_values(REGION_COL), times] if by_region else [times]
+    funcs = {col: _COMBINE[col.rsplit(_SEP, 1)[1]] for col in frame.columns}
+    combined = frame.groupby(keys, sort=True).agg(funcs)
+    combined.index.names = [REGION_COL, TIME_COL] if by_region else [TIME_COL]
+    return combined
+
+
+class Rollups:
+    """Count, sum, min and max of ``metrics`` per (region, bucket) at every resolution."""
+
+    def __init__(self, metrics=METRICS):
+        self.metrics = list(metrics)
+        self._parts = {name: [] for name in RESOLUTIONS}
+        self.newest = pd.NaT
+
+    def _cutoff(self, name):
+        """Start of the history level ``name`` retains (``None``: all of it)."""
+        return self.newest - RETENTION[name] if name in RETENTION else None
+
+    def update(self, chunk):
+        if TIME_COL not in chunk.columns or REGION_COL not in chunk.columns:
+            return self
+        chunk = chunk.dropna(subset=[REGION_COL, TIME_COL])
+        if chunk.empty:
+            return self
+        self.newest = max(chunk[TIME_COL].max(), self.newest) if pd.notna(self.newest) else chunk[TIME_COL].max()
+        times = chunk[TIME_COL].to_numpy()
+        partial, covered = None, None
+        for name, freq in RESOLUTIONS.items():
+            # Rows the finer levels did not retain enter at this level; the rest fold up from there.
+            cutoff = self._cutoff(name)
+            rows = times < covered.to_datetime64() if covered is not None else np.ones(len(chunk), dtype=bool)
+            if cutoff is not None:
+                rows &= times >= cutoff.to_datetime64()
+            parts = [] if partial is None else [_combine(partial, freq)]
+            if rows.any():
+                parts.append(_bucket(chunk[rows], freq, self.metrics))
+            if parts:
+                partial = _combine(pd.concat(parts)) if len(parts) > 1 else parts[0]
+                self._add(name, partial)
+            covered = cutoff
+        return self
+
+    def merge(self, other):
+        """Fold in the rollups of another shard or batch."""
+        if pd.notna(other.newest):
+            self.newest = max(other.newest, self.newest) if pd.notna(self.newest) else other.newest
+        for name in RESOLUTIONS:
+            if len(other.frame(name)):
+                self._add(name, other.frame(name))
+        return self
+
+    def _add(self, name, partial):
+        self._parts[name].append(partial)
+        if len(self._parts[name]) > COMPACT_PARTS:
+            self._compact(name)
+
+    def _compact(self, name):
+        parts = self._parts[name]
+        if len(parts) > 1:
+            parts = [_combine(pd.concat(parts))]
+        cutoff = self._cutoff(name)
+        if parts and cutoff is not None:
+            times = parts[0].index.get_level_values(TIME_COL)
+            parts = [parts[0][times >= cutoff.floor(RESOLUTIONS[name])]]
+        self._parts[name] = parts
+
+    def frame(self, name):
+        """All buckets of resolution ``name``, indexed by (region, bucket start)."""
+        self._compact(name)
+        if not self._parts[name]:
+            columns = [f"{metric}{_SEP}{stat}" for metric in self.metrics for stat in STATS]
+            index = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=[REGION_COL, TIME_COL])
+            return pd.DataFrame(columns=columns, index=index, dtype=np.float64)
+        return self._parts[name][0]
+
+    def span(self):
+        """``(first, last)`` bucket bounds of the whole history, or ``None`` if it is empty."""
+        coarsest = list(RESOLUTIONS)[-1]
+        times = self.frame(coarsest).index.get_level_values(TIME_COL)
+        if len(times) == 0:
+            return None
+        return times.min(), times.max() + pd.Timedelta(RESOLUTIONS[coarsest])
+
+    def resolution(self, start=None, end=None, max_points=MAX_POINTS):
+        """Finest level that still retains ``start`` and has at most ``OVERSAMPLE * max_points``
+        buckets between ``start`` and ``end``.
+
+        Decided from the time span alone, so it costs the same however long the history is.
+        """
+        coarsest = list(RESOLUTIONS)[-1]
+        span = self.span()
+        if span is None:
+            return coarsest
+        low = pd.Timestamp(start) if start is not None else span[0]
+        high = pd.Timestamp(end) if end is not None else span[1]
+        for name, freq in RESOLUTIONS.items():
+            cutoff = self._cutoff(name)
+            retained = cutoff is None or low >= cutoff
+            if retained and (high - low) / pd.Timedelta(freq) <= OVERSAMPLE * max_points:
+                return name
+        return coarsest
+
+    def series(self, metric, region=None, start=None, end=None, max_points=MAX_POINTS):
+        """``(resolution, frame)`` of ``metric`` over time with ``count``, ``min``, ``mean`` and ``max``.
+
+        ``region=None`` combines all regions; the level is picked by ``resolution``.
+        """
+        name = self.resolution(start, end, max_points)
+        frame = self.frame(name)[[f"{metric}{_SEP}{stat}" for stat in STATS]]
+        if len(frame):
+            frame = frame.loc[pd.IndexSlice[:, start:end], :]
+        if region is None:
+            frame = _combine(frame, by_region=False)
+        elif region in frame.index.get_level_values(REGION_COL):
+            frame = frame.xs(region, level=REGION_COL)
+        else:
+            frame = frame.droplevel(REGION_COL).iloc[:0]
+        frame = frame.rename(columns=lambda col: col.rsplit(_SEP, 1)[1])
+        frame = frame[frame["count"] > 0]
+        return name, pd.DataFrame({
+            "count": frame["count"], "min": frame["min"], "mean": frame["sum"] / frame["count"], "max": frame["max"],
+        })
+
+    def save(self, directory):
+        """Write one ``rollup_<resolution>.parquet`` per level into ``directory``."""
+        for name in RESOLUTIONS:
+            self.frame(name).reset_index().to_parquet(Path(directory) / f"rollup_{name}.parquet", index=False)
+
+    @classmethod
+    def load(cls, directory, metrics=METRICS):
+        """Rollups saved by ``save``; levels without a file start empty.
+
+        ``newest`` is restored as the start of the latest bucket of the finest saved level.
+        """
+        rollups = cls(metrics)
+        for name in RESOLUTIONS:
+            path = Path(directory) / f"rollup_{name}.parquet"
+            if path.exists():
+                frame = pd.read_parquet(path)
+                frame[REGION_COL] = frame[REGION_COL].astype(str)
+                rollups._parts[name] = [frame.set_index([REGION_COL, TIME_COL])]
+                if pd.isna(rollups.newest) and len(frame):
+                    rollups.newest = frame[TIME_COL].max()
+        return rollups
+
+
+def lttb(x, y, n_out):
+    """Indices of ``n_out`` points of the series ``(x, y)`` picked by largest-triangle-three-buckets.
+
+    The first and last points are kept. The points in between are split into
+    ``n_out - 2`` equal buckets and each contributes the point that forms the
+    largest triangle with the point kept before it and the mean of the next
+    bucket, which preserves peaks and troughs that plain decimation drops.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n) if n <= n_out else np.array([0, n - 1])
+    # Bucket k covers [starts[k], starts[k + 1]); the last "bucket" is the final point.
+    starts = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(np.append(starts, n))
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        lo, hi = starts[k], starts[k + 1]
+        area = np.abs((x[a] - mean_x[k + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[k + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[k + 1] = a
+    return kept
+
+
+def downsample(frame, column="mean", max_points=MAX_POINTS):
+    """Rows of a time-indexed ``frame`` chosen by ``lttb`` on ``column``."""
+    frame = frame[frame[column].notna()]
+    if len(frame) <= max_points:
+        return frame
+    return frame.iloc[lttb(frame.index.asi8, frame[column].to_numpy(), max_points)]
+
+
+def history_figure(series, title, template="plotly", label=None):
+    """Plotly figure of a ``Rollups.series`` frame: the mean as a line inside its min-max band."""
+    import plotly.graph_objects as go
+
+    times = series.index
+    fig = go.Figure([
+        go.Scatter(x=times, y=series["max"], mode="lines", line={"width": 0}, showlegend=False, hoverinfo="skip"),
+        go.Scatter(x=times, y=series["min"], mode="lines", line={"width": 0}, fill="tonexty",
+                   fillcolor="rgba(66, 165, 245, 0.25)", name="min – max"),
+        go.Scatter(x=times, y=series["mean"], mode="lines", line={"color": "#1565C0"}, name="mean"),
+    ])
+    fig.update_layout(title=title, template=template, xaxis_title=TIME_COL, yaxis_title=label)
+    return fig
@@ -0,0 +1,61 @@
+"""Column names, dtypes and default file locations shared by the app and scripts."""
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT / "data" / "sensor_data_kz_realistic.csv"
+MODEL_PATH = ROOT / "models" / "kz_model.pkl"
+ANOMALY_MODEL_PATH = ROOT / "models" / "anomaly_model.pkl"
+# Flat-array export of MODEL_PATH (scripts/compile_forest.py), served without sklearn and
+# memory-mapped on load (desalination/artifact.py).
+FOREST_PATH = ROOT / "models" / "kz_model.flat"
+# Same for ANOMALY_MODEL_PATH (scripts/compile_isolation_forest.py).
+ANOMALY_FOREST_PATH = ROOT / "models" / "anomaly_model.flat"
+# Multi-horizon pressure/energy forecaster (scripts/train_forecaster.py).
+FORECAST_MODEL_PATH = ROOT / "models" / "forecast_model.pkl"
+# Parquet copy of DATA_PATH partitioned by region and month (scripts/build_store.py).
+STORE_PATH = ROOT / "data" / "sensor_store"
+
+TIME_COL = "уақыт"
+REGION_COL = "өңір"
+METHOD_COL = "әдіс"
+
+CATEGORY_COLS = ["өңір", "аномалия_түрі", "әдіс"]
+SENSOR_COLS = [
+    "температура", "тұздылық", "pH", "кіру_қысымы", "су_деңгейі", "шығыс_қысымы",
+    "фильтр_тиімділігі", "энергия_шығыны", "операциялық_шығын",
+]
+
+# Explicit dtypes for the sensor CSV: categories for labels, float32 for sensor
+# readings (the tree models cast to float32 anyway) and the narrowest ints that fit.
+DTYPES = {
+    **{col: "category" for col in CATEGORY_COLS},
+    **{col: "float32" for col in SENSOR_COLS},
+    "өңір_код": "int8",
+    "аномалия": "int8",
+    "мембрана_жасы": "int16",
+    "техникалық_жағдай": "int8",
+    "зауыт_сыйымдылығы": "int32",
+}
+INT_DTYPES = {col: dtype for col, dtype in DTYPES.items() if dtype.startswith("int")}
+FLOAT_DTYPES = {col: dtype for col, dtype in DTYPES.items() if dtype.startswith("float")}
+# What the CSV parser is given: only the categories. Numeric columns are left to the
+# parser's inference, so one non-numeric, empty or fractional cell rejects that row
+# (``ingest.coerce_numbers``) rather than the whole file.
+PARSE_DTYPES = {col: dtype for col, dtype in DTYPES.items() if dtype == "category"}
+
+FEATURES = [
+    "өңір_код", "температура", "тұздылық", "pH", "кіру_қысымы", "су_деңгейі",
+    "фильтр_тиімділігі", "мембрана_жасы", "техникалық_жағдай", "зауыт_сыйымдылығы",
+]
+TARGETS = ["шығыс_қысымы", "энергия_шығыны", "операциялық_шығын"]
+
+# Columns behind the correlation matrix (Tab 3) and the regional summary (Tab 7).
+SUMMARY_COLS = ["температура", "тұздылық", "pH", "кіру_қысымы", "шығыс_қысымы", "энергия_шығыны", "операциялық_шығын"]
+# Per-region means also feed the Tab 6 defaults.
+REGION_MEAN_COLS = SUMMARY_COLS + ["фильтр_тиімділігі"]
+
+# Order defines "өңір_код" (see scripts/sensors_kz_realistic.py).
+REGIONS = [
+    "Маңғыстау", "Қызылорда", "Алматы", "Атырау", "Солтүстік Қазақстан",
+    "Жамбыл", "Шымкент", "Ақтөбе", "Түркістан", "Павлодар",
+]
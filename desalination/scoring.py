@@ -0,0 +1,78 @@
+"""Vectorized batch scoring with the regression and anomaly models."""
+import numpy as np
+import pandas as pd
+
+from . import resources
+from .schema import FEATURES, REGION_COL, REGIONS, TARGETS
+
+ANOMALY_COL = "аномалия"
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+def feature_matrix(frame):
+    """Validate the 10-feature schema once and return a C-contiguous float32 array.
+
+    ``өңір_код`` is derived from ``өңір`` when an upload only carries region names.
+    """
+    missing = [col for col in FEATURES if col not in frame.columns]
+    if missing == ["өңір_код"] and REGION_COL in frame.columns:
+        codes = pd.Categorical(frame[REGION_COL], categories=REGIONS).codes
+        if (codes < 0).any():
+            unknown = sorted(set(frame[REGION_COL][codes < 0].astype(str)))
+            raise ValueError(f"Unknown regions: {', '.join(unknown)}")
+        frame = frame.assign(өңір_код=codes)
+        missing = []
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+    return np.ascontiguousarray(frame[FEATURES].to_numpy(dtype=np.float32))
+
+
+def feature_importances(model):
+    """Importance per feature (Tab 8) for any regression model the app can load.
+
+    Covers the compiled ``FlatForest``, a native multi-output forest and a
+    ``MultiOutputRegressor`` of forests (averaged over the per-target forests).
+    """
+    if not hasattr(model, "estimators_"):
+        return pd.Series(model.feature_importances_, index=list(model.feature_names_in_))
+    from .forest import forest_features, forest_importances
+
+    return pd.Series(forest_importances(model), index=forest_features(model))
+
+
+def _score_chunk(model, anomaly_model, X):
+    # Wrapping the float32 block keeps sklearn's feature-name check without a copy.
+    chunk = pd.DataFrame(X, columns=FEATURES, copy=False)
+    predictions = model.predict(chunk)
+    flags = anomaly_model.predict(chunk) == -1
+    return predictions, flags
+
+
+def predict_batch(frame, model=None, anomaly_model=None, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=None):
+    """Score every row of ``frame`` with both models in a single pass.
+
+    Rows are processed in ``chunk_size`` slices spread over ``n_jobs`` threads
+    (tree inference releases the GIL). Returns a frame indexed like ``frame`` with
+    one column per target plus a boolean ``аномалия`` flag.
+    """
+    model = model if model is not None else resources.load_predictor()
+    anomaly_model = anomaly_model if anomaly_model is not None else resources.load_anomaly_detector()
+    X = feature_matrix(frame)
+    if len(X) == 0:
+        result = pd.DataFrame(np.empty((0, len(TARGETS))), columns=TARGETS, index=frame.index)
+        result[ANOMALY_COL] = np.zeros(0, dtype=bool)
+        return result
+
+    slices = [slice(start, start + chunk_size) for start in range(0, len(X), chunk_size)]
+    if len(slices) == 1:
+        parts = [_score_chunk(model, anomaly_model, X)]
+    else:
+        from joblib import Parallel, delayed
+
+        parts = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(_score_chunk)(model, anomaly_model, X[s]) for s in slices
+        )
+    predictions = np.concatenate([p for p, _ in parts]).reshape(len(X), -1)
+    result = pd.DataFrame(predictions, columns=TARGETS, index=frame.index)
+    result[ANOMALY_COL] = np.concatenate([f for _, f in parts])
+    return result
@@ -0,0 +1,89 @@
+"""Multi-process generation of per-plant sensor history in independent shards.
+
+The time range is cut into blocks of ``block_rows`` readings and every
+(region, block) pair is one shard with its own ``SeedSequence(seed,
+spawn_key=(region, block))`` stream (see ``generator.generate_plant_block``).
+A shard's rows therefore never depend on which worker produced it or how many
+workers ran. Workers write one file per shard and ``manifest.json`` lists the
+shards in canonical (region, block) order together with their checksums.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import generator
+from .resources import read_dataset
+
+MANIFEST = "manifest.json"
+BLOCK_ROWS = 100_000
+SHARD_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def plan(start, end, step_seconds, block_rows, regions):
+    """Shard specs covering ``start <= уақыт < end`` for every region, in canonical order."""
+    step = np.timedelta64(step_seconds, "s")
+    total = int((np.datetime64(end, "s") - np.datetime64(start, "s")) // step)
+    return [
+        {"region": int(region), "block": block, "offset": offset, "rows": min(block_rows, total - offset)}
+        for region in regions
+        for block, offset in enumerate(range(0, total, block_rows))
+    ]
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for piece in iter(lambda: f.read(1 << 20), b""):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def _write_shard(task):
+    spec, root, seed, start, step_seconds, fmt, profile = task
+    frame = generator.generate_plant_block(
+        spec["region"], spec["block"], spec["offset"], spec["rows"], seed, start,
+        np.timedelta64(step_seconds, "s"), profile,
+    )
+    path = Path(root) / f"shard-r{spec['region']:02d}-b{spec['block']:05d}.{fmt}"
+    generator.write_chunks([frame], path, fmt, SHARD_TIME_FORMAT)
+    return {**spec, "file": path.name, "sha256": _file_digest(path)}
+
+
+def generate_sharded(root, start, end, step_seconds=30, seed=42, workers=None,
+                     block_rows=BLOCK_ROWS, fmt="parquet", profile=None):
+    """Generate all shards with ``workers`` processes and write the manifest; returns it."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    profile = profile or generator.default_profile()
+    specs = plan(start, end, step_seconds, block_rows, range(len(profile.regions)))
+    tasks = [(spec, str(root), seed, start, step_seconds, fmt, profile) for spec in specs]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        shards = [_write_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            shards = list(pool.map(_write_shard, tasks))
+    manifest = {
+        "start": str(start), "end": str(end), "step_seconds": step_seconds, "seed": seed,
+        "format": fmt, "rows": sum(s["rows"] for s in shards), "shards": shards,
+        # Depends only on shard contents, so it is the same for any worker count.
+        "digest": hashlib.sha256("".join(s["sha256"] for s in shards).encode()).hexdigest(),
+    }
+    (root / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1))
+    return manifest
+
+
+def read_sharded(root):
+    """Merge the shards of a manifest into one frame, in canonical order."""
+    root = Path(root)
+    manifest = json.loads((root / MANIFEST).read_text())
+    if manifest["format"] == "parquet":
+        frames = [pd.read_parquet(root / s["file"]) for s in manifest["shards"]]
+    else:
+        frames = [read_dataset(root / s["file"]) for s in manifest["shards"]]
+    return pd.concat(frames, ignore_index=True)
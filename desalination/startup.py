@@ -0,0 +1,143 @@
+"""Warm-up and readiness reporting for the dashboard process.
+
+``start`` runs ``warm_up`` on a background thread of the Streamlit server
+process: it loads both models and the dataset aggregates into the
+``resources`` cache and scores one row, so the first session finds everything
+loaded and the model code paths already exercised. Only then is the process
+reported ready. Imports that only some stages need (``WARM_IMPORTS``) and
+the pickles compiled forests hand their batches to (``batch_model``) are
+loaded after readiness, so they never delay it.
+
+Two threads importing into the same import cycle at once can hand one of them
+a partially initialized module (``pandas has no attribute 'Series'``). So the
+warm-up thread, the app's script thread and ``resources`` (whose unpickling
+imports scikit-learn) import heavy packages only while holding
+``import_lock``; callers that also hold the ``resources`` cache lock take it
+first. The entry point (``interface/dashboard.py``) imports Streamlit before
+starting the warm-up, so nothing is imported eagerly on its behalf.
+
+A small HTTP server on ``HEALTH_PORT`` answers the container's probes:
+
+    GET /health   200 while the process is up (liveness), with the warm-up status
+    GET /ready    200 once warm-up succeeded, 503 before that or if it failed
+"""
+import importlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HEALTH_PORT = 8502
+WARM_IMPORTS = ("plotly.express", "plotly.graph_objects", "scipy.optimize", "scipy.interpolate")
+# Everything the warm-up's loaders import lazily, imported up front under ``import_lock``.
+LOAD_IMPORTS = ("desalination.resources", "desalination.scoring", "desalination.store", "desalination.aggregate_cache",
+                "desalination.forest", "desalination.isolation", "joblib")
+
+import_lock = threading.RLock()
+
+_ready = threading.Event()
+_state = {"status": "starting", "error": None, "timings": {}}
+_started = time.perf_counter()
+
+
+def imported(name):
+    """``importlib.import_module(name)`` under ``import_lock``."""
+    with import_lock:
+        return importlib.import_module(name)
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def status():
+    return {**_state, "timings": dict(_state["timings"]), "uptime": time.perf_counter() - _started}
+
+
+def _timed(name, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    _state["timings"][name] = time.perf_counter() - start
+    return result
+
+
+def _dummy_rows(stats):
+    """One plausible feature row: sample medians, or zeros if there is no sample."""
+    import pandas as pd
+
+    from .schema import FEATURES
+
+    sample = stats.sample() if stats is not None else None
+    if sample is None or len(sample) == 0:
+        return pd.DataFrame([[0.0] * len(FEATURES)], columns=FEATURES)
+    return sample[FEATURES].median().to_frame().T
+
+
+def warm_up(imports=WARM_IMPORTS):
+    """Load the models and aggregates, score one row and mark the process ready.
+
+    Failures are recorded in ``status()`` and leave the process not ready.
+    """
+    _state["status"] = "warming"
+    try:
+        for name in LOAD_IMPORTS:
+            imported(name)
+        from . import resources, scoring
+
+        model = _timed("predictor", resources.load_predictor)
+        anomaly_model = _timed("anomaly_detector", resources.load_anomaly_detector)
+        try:
+            stats = _timed("aggregates", resources.load_aggregates)
+        except FileNotFoundError:
+            stats = None
+        _timed("first_prediction", scoring.predict_batch, _dummy_rows(stats), model, anomaly_model)
+    except Exception as exc:
+        _state.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        return False
+    _state["status"] = "ready"
+    _state["timings"]["ready"] = time.perf_counter() - _started
+    _ready.set()
+    for name in imports:
+        _timed(f"import {name}", imported, name)
+    for name, predictor in (("predictor", model), ("anomaly_detector", anomaly_model)):
+        if getattr(predictor, "batch_model", None) is not None:
+            _timed(f"{name} batch model", predictor.batch_model)
+    return True
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/health":
+            code = 200
+        elif self.path == "/ready":
+            code = 200 if is_ready() else 503
+        else:
+            code = 404
+        body = json.dumps(status()).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_health(port=HEALTH_PORT, host="0.0.0.0"):
+    """Start the probe server on a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _HealthHandler)
+    threading.Thread(target=server.serve_forever, name="health", daemon=True).start()
+    return server
+
+
+def start(health_port=HEALTH_PORT, host="0.0.0.0", imports=WARM_IMPORTS):
+    """Serve the probes (unless ``health_port`` is None) and warm up on a background thread.
+
+    Call it after importing Streamlit: Streamlit's own imports do not take ``import_lock``.
+    """
+    if health_port is not None:
+        serve_health(health_port, host)
+    thread = threading.Thread(target=warm_up, args=(imports,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,73 @@
+"""Mergeable running moments (count, mean, co-moment matrix).
+
+``Moments.update`` folds in a batch in O(batch) and ``Moments.merge`` combines
+partial results from other chunks, shards or workers with the pairwise update
+of Chan et al., which stays accurate where raw sums of squares would cancel.
+"""
+import numpy as np
+
+
+class Moments:
+    """Count, mean vector and co-moment matrix ``Σ (x - mean)(x - mean)ᵀ``."""
+
+    def __init__(self, k):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros((k, k))
+
+    @classmethod
+    def of(cls, values):
+        """Moments of a ``(rows, k)`` batch, computed two-pass."""
+        values = np.asarray(values, dtype=np.float64)
+        moments = cls(values.shape[1])
+        if len(values):
+            moments.n = len(values)
+            moments.mean = values.mean(axis=0)
+            centered = values - moments.mean
+            moments.m2 = centered.T @ centered
+        return moments
+
+    def update(self, values):
+        return self.merge(Moments.of(values))
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean.copy(), other.m2.copy()
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean = self.mean + delta * (other.n / n)
+        self.n = n
+        return self
+
+    def copy(self):
+        return Moments(len(self.mean)).merge(self)
+
+    def covariance(self, ddof=1):
+        return self.m2 / max(self.n - ddof, 1)
+
+    def correlation(self):
+        std = np.sqrt(np.diag(self.m2))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / np.outer(std, std)
+
+    def to_state(self):
+        return {"n": self.n, "mean": self.mean.tolist(), "m2": self.m2.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        moments = cls(len(state["mean"]))
+        moments.n = state["n"]
+        moments.mean = np.asarray(state["mean"], dtype=np.float64)
+        moments.m2 = np.asarray(state["m2"], dtype=np.float64)
+        return moments
+
+
+def merge_all(moments, k):
+    total = Moments(k)
+    for part in moments:
+        total.merge(part)
+    return total
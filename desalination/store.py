@@ -0,0 +1,109 @@
+"""Columnar Parquet store for sensor history, partitioned by region and month.
+
+``write_store`` streams a sensor CSV (see ``ingest.iter_parsed``) into a hive
+partitioned dataset ``<root>/өңір=<region>/ай=<YYYY-MM>/*.parquet`` with typed
+columns and ``уақыт`` already parsed. ``read_store`` reads back only the requested
+columns, and region/time predicates prune whole partitions before any file is
+opened.
+
+The ``SensorAggregates`` of exactly the rows written are saved alongside
+(``<root>/_aggregates``), so the dashboard's aggregate tabs and its row-level
+reads of the store describe the same data (``load_aggregates``).
+"""
+import json
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from . import aggregate_cache
+from .ingest import CHUNK_ROWS, SensorAggregates, iter_parsed
+from .schema import CATEGORY_COLS, REGION_COL, TIME_COL
+
+MONTH_COL = "ай"
+MANIFEST = "_store.json"  # leading "_" keeps it out of the dataset scan
+AGGREGATES = "_aggregates"
+PARTITIONING = ds.partitioning(pa.schema([(REGION_COL, pa.string()), (MONTH_COL, pa.string())]), flavor="hive")
+
+
+def write_store(source, root, chunk_rows=CHUNK_ROWS):
+    """Convert a sensor CSV into the partitioned store; returns the manifest dict.
+
+    ``root`` should be empty: parts left over from an earlier conversion would be read too.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rows, aggregates = 0, SensorAggregates()
+    for number, (chunk, invalid) in enumerate(iter_parsed(source, chunk_rows)):
+        aggregates.update(chunk, invalid)
+        chunk[REGION_COL] = chunk[REGION_COL].astype(str)
+        chunk[MONTH_COL] = chunk[TIME_COL].dt.strftime("%Y-%m")
+        ds.write_dataset(
+            pa.Table.from_pandas(chunk, preserve_index=False), root, format="parquet",
+            partitioning=PARTITIONING, basename_template=f"part-{number:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        rows += len(chunk)
+    shutil.rmtree(root / AGGREGATES, ignore_errors=True)
+    aggregate_cache.store(AGGREGATES, aggregates, root)
+    manifest = {"rows": rows, "chunk_rows": chunk_rows, "created": time.time()}
+    # Written last: readers key their cache on this file, so it marks a finished store.
+    (root / MANIFEST).write_text(json.dumps(manifest))
+    return manifest
+
+
+def _filter(regions, start, end):
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if regions is not None:
+        expr = both(expr, ds.field(REGION_COL).isin([str(r) for r in regions]))
+    if start is not None:
+        start = pd.Timestamp(start)
+        expr = both(expr, ds.field(MONTH_COL) >= start.strftime("%Y-%m"))
+        expr = both(expr, ds.field(TIME_COL) >= pa.scalar(start.to_datetime64(), pa.timestamp("ns")))
+    if end is not None:
+        end = pd.Timestamp(end)
+        expr = both(expr, ds.field(MONTH_COL) <= end.strftime("%Y-%m"))
+        expr = both(expr, ds.field(TIME_COL) < pa.scalar(end.to_datetime64(), pa.timestamp("ns")))
+    return expr
+
+
+def read_store(root, columns=None, regions=None, start=None, end=None):
+    """Load ``columns`` for ``regions`` and ``start <= уақыт < end`` as a typed frame."""
+    dataset = ds.dataset(Path(root), format="parquet", partitioning=PARTITIONING)
+    if columns is not None:
+        columns = list(columns)
+    table = dataset.to_table(columns=columns, filter=_filter(regions, start, end))
+    frame = table.to_pandas()
+    if columns is None and MONTH_COL in frame.columns:
+        frame = frame.drop(columns=MONTH_COL)
+    for col in CATEGORY_COLS:
+        if col in frame.columns:
+            frame[col] = frame[col].astype("category")
+    return frame
+
+
+def load_aggregates(root, chunk_rows=CHUNK_ROWS):
+    """``SensorAggregates`` of the rows in the store.
+
+    Stores written before the aggregates were saved with them are scanned once
+    and the result is saved.
+    """
+    aggregates = aggregate_cache.load(AGGREGATES, root)
+    if aggregates is None:
+        aggregates = SensorAggregates()
+        dataset = ds.dataset(Path(root), format="parquet", partitioning=PARTITIONING)
+        for batch in dataset.to_batches(batch_size=chunk_rows):
+            chunk = batch.to_pandas().drop(columns=MONTH_COL)
+            for col in CATEGORY_COLS:
+                if col in chunk.columns:
+                    chunk[col] = chunk[col].astype("category")
+            aggregates.update(chunk)
+        aggregate_cache.store(AGGREGATES, aggregates, root)
+    return aggregates
@@ -0,0 +1,190 @@
+"""Continuous anomaly detection over a sensor feed as an asyncio pipeline.
+
+    source ──packets──▶ batcher ──windows──▶ scorer ──scored──▶ alert sink
+
+``replay_source`` stands in for the plant gateways: it replays a sensor CSV in
+packets of ``packet_rows`` readings, optionally paced against the ``уақыт``
+column. The batcher concatenates packets into windows of up to
+``window_rows`` readings (or whatever arrived within ``window_seconds``) and
+converts each window to the model's float32 input matrix once. The anomaly
+model scores every reading on its own, so no features span readings. The
+scorer runs the model on a worker thread; windows are far larger than
+``forest.SMALL_BATCH``, so the compiled forest from
+``resources.load_anomaly_detector`` hands them to the pickled model, its
+fastest path for batches. ``AlertSink`` writes one JSON line per flagged reading.
+
+Stages are joined by bounded queues, so a slow stage blocks the one before it
+(backpressure) instead of letting readings pile up. Memory is then bounded by
+the queue sizes times the window size. Every stage records rows, busy time and
+per-item latency in a ``StageStats``: the processing time of each item, except
+for the sink, whose latency is end to end (source emission to alert written).
+"""
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from . import ingest, resources, scoring
+from .schema import DATA_PATH, FEATURES, REGION_COL, TIME_COL
+
+PACKET_ROWS = 1_000
+WINDOW_ROWS = 16_384
+WINDOW_SECONDS = 0.05
+QUEUE_SIZE = 8
+LATENCY_SAMPLES = 10_000
+ALERT_COLS = [TIME_COL, REGION_COL, "температура", "тұздылық", "pH", "кіру_қысымы", "фильтр_тиімділігі"]
+
+
+class StageStats:
+    """Rows, items and busy time of one stage plus a bounded sample of per-item latencies."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.rows = 0
+        self.busy = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, rows, busy, latency=None):
+        self.items += 1
+        self.rows += rows
+        self.busy += busy
+        self.latencies.append(busy if latency is None else latency)
+
+    def summary(self, elapsed):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {
+            "stage": self.name, "items": self.items, "rows": self.rows,
+            "rows_per_sec": self.rows / elapsed if elapsed else 0.0,
+            "busy_pct": 100 * self.busy / elapsed if elapsed else 0.0,
+            "p50_ms": float(p50), "p99_ms": float(p99),
+        }
+
+
+class Packet:
+    """Readings handed from one stage to the next; ``born`` is when the source emitted them."""
+
+    __slots__ = ("frame", "born", "X", "flags")
+
+    def __init__(self, frame, born, X=None, flags=None):
+        self.frame = frame
+        self.born = born
+        self.X = X
+        self.flags = flags
+
+
+async def replay_source(out, stats, path=DATA_PATH, packet_rows=PACKET_ROWS, speed=None, repeat=1,
+                        chunk_rows=ingest.CHUNK_ROWS):
+    """Emit the CSV as packets; ``speed`` replays that many data-seconds per wall second."""
+    wall_start = data_start = None
+    for _ in range(repeat):
+        chunks = ingest.iter_chunks(path, chunk_rows)
+        # CSV parsing runs on a worker thread so the downstream stages keep moving.
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            for start in range(0, len(chunk), packet_rows):
+                if speed and TIME_COL in chunk.columns:
+                    stamp, now = chunk[TIME_COL].iloc[start], time.perf_counter()
+                    if data_start is None:
+                        wall_start, data_start = now, stamp
+                    delay = (stamp - data_start).total_seconds() / speed - (now - wall_start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                began = time.perf_counter()
+                packet = chunk.iloc[start:start + packet_rows]
+                born = time.perf_counter()
+                await out.put(Packet(packet, born))
+                stats.record(len(packet), born - began)
+    await out.put(None)
+
+
+async def batcher(inp, out, stats, window_rows=WINDOW_ROWS, window_seconds=WINDOW_SECONDS):
+    """Concatenate packets into windows and convert each to the model's input matrix."""
+    loop = asyncio.get_running_loop()
+    done = False
+    while not done:
+        first = await inp.get()
+        if first is None:
+            break
+        packets, rows = [first], len(first.frame)
+        deadline = loop.time() + window_seconds
+        while rows < window_rows:
+            timeout = deadline - loop.time()
+            try:
+                packet = inp.get_nowait() if timeout <= 0 else await asyncio.wait_for(inp.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if packet is None:
+                done = True
+                break
+            packets.append(packet)
+            rows += len(packet.frame)
+        began = time.perf_counter()
+        frame = pd.concat([p.frame for p in packets], ignore_index=True) if len(packets) > 1 else first.frame
+        window = Packet(frame, first.born, scoring.feature_matrix(frame))
+        stats.record(len(frame), time.perf_counter() - began)
+        await out.put(window)
+    await out.put(None)
+
+
+async def scorer(inp, out, stats, model):
+    """Flag anomalous readings of each window with ``model.predict`` on a worker thread."""
+    while (window := await inp.get()) is not None:
+        began = time.perf_counter()
+        window.flags = await asyncio.to_thread(_predict_flags, model, window.X)
+        stats.record(len(window.frame), time.perf_counter() - began)
+        await out.put(window)
+    await out.put(None)
+
+
+def _predict_flags(model, X):
+    # Wrapping the float32 block keeps sklearn's feature-name check without a copy.
+    return model.predict(pd.DataFrame(X, columns=FEATURES, copy=False)) == -1
+
+
+class AlertSink:
+    """Counts flagged readings per region and writes them as JSON lines to ``stream`` (if given)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.alerts = 0
+        self.by_region = {}
+
+    def __call__(self, window):
+        flagged = window.frame.loc[window.flags, [col for col in ALERT_COLS if col in window.frame.columns]]
+        if flagged.empty:
+            return
+        self.alerts += len(flagged)
+        for region, count in flagged[REGION_COL].astype(str).value_counts().items():
+            self.by_region[region] = self.by_region.get(region, 0) + int(count)
+        if self.stream is not None:
+            self.stream.write(flagged.to_json(orient="records", lines=True, force_ascii=False, date_format="iso"))
+            self.stream.write("\n")
+
+
+async def alert_stage(inp, stats, sink):
+    while (window := await inp.get()) is not None:
+        began = time.perf_counter()
+        sink(window)
+        finished = time.perf_counter()
+        stats.record(len(window.frame), finished - began, finished - window.born)
+
+
+async def run_pipeline(path=DATA_PATH, model=None, sink=None, packet_rows=PACKET_ROWS, window_rows=WINDOW_ROWS,
+                       window_seconds=WINDOW_SECONDS, queue_size=QUEUE_SIZE, speed=None, repeat=1):
+    """Run the pipeline to the end of the feed; returns per-stage summaries and the sink."""
+    model = model if model is not None else resources.load_anomaly_detector()
+    sink = sink if sink is not None else AlertSink()
+    packets, windows, scored = (asyncio.Queue(queue_size) for _ in range(3))
+    stats = {name: StageStats(name) for name in ("source", "batch", "score", "sink")}
+    started = time.perf_counter()
+    await asyncio.gather(
+        replay_source(packets, stats["source"], path, packet_rows, speed, repeat),
+        batcher(packets, windows, stats["batch"], window_rows, window_seconds),
+        scorer(windows, scored, stats["score"], model),
+        alert_stage(scored, stats["sink"], sink),
+    )
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "stages": [s.summary(elapsed) for s in stats.values()], "sink": sink}
@@ -0,0 +1,162 @@
+"""What-if sweeps of the process model and the regression model over N-d grids.
+
+A ``Grid`` is the Cartesian product of named axes and is never materialized:
+``Grid.chunks`` yields the coordinates of ``chunk_points`` consecutive grid
+points at a time, ``process_chunks`` and ``model_chunks`` evaluate each chunk in
+one vectorized call, and ``reduce`` folds the stream into 2-D surfaces
+(mean/min/max over the remaining axes) for ``heatmap_figure``. Peak memory
+therefore depends on the chunk size, not the grid size.
+"""
+import numpy as np
+import pandas as pd
+
+from . import resources
+from .process import SLIDERS, DesalinationProcess
+from .schema import FEATURES, TARGETS
+
+CHUNK_POINTS = 262_144
+# Process-model inputs that are not sliders but still accepted as axes or fixed values.
+PROCESS_EXTRAS = {"maintenance": 0, "membrane_age": 0}
+REDUCTIONS = ("mean", "min", "max")
+
+
+class Grid:
+    """Cartesian product of ``{name: values}``; points are numbered in C order."""
+
+    def __init__(self, axes):
+        if not axes:
+            raise ValueError("a grid needs at least one axis")
+        self.names = list(axes)
+        self.axes = [np.asarray(values, dtype=np.float64).ravel() for values in axes.values()]
+        self.shape = tuple(len(axis) for axis in self.axes)
+        self.size = int(np.prod(self.shape, dtype=np.int64))
+
+    @classmethod
+    def linspace(cls, spec):
+        """``{name: (low, high, points)}`` to a grid of evenly spaced axes."""
+        return cls({name: np.linspace(low, high, int(points)) for name, (low, high, points) in spec.items()})
+
+    def axis(self, name):
+        return self.axes[self.names.index(name)]
+
+    def indices(self, start, stop):
+        """Per-axis index arrays of points ``start..stop``."""
+        return np.unravel_index(np.arange(start, stop, dtype=np.int64), self.shape)
+
+    def chunks(self, chunk_points=CHUNK_POINTS):
+        """Yield ``(start, {name: values})`` for consecutive blocks of grid points."""
+        for start in range(0, self.size, chunk_points):
+            index = self.indices(start, min(start + chunk_points, self.size))
+            yield start, {name: axis[i] for name, axis, i in zip(self.names, self.axes, index)}
+
+
+def _inputs(names, grid, fixed, values):
+    unknown = [name for name in grid.names if name not in names]
+    if unknown:
+        raise ValueError(f"Unknown axes: {', '.join(unknown)}")
+    missing = [name for name in names if name not in grid.names and name not in fixed]
+    if missing:
+        raise ValueError(f"Neither an axis nor a fixed value: {', '.join(missing)}")
+    return [values[name] if name in values else fixed[name] for name in names]
+
+
+def process_chunks(grid, fixed=None, process=None, chunk_points=CHUNK_POINTS):
+    """Yield ``(start, {output: values})`` of ``DesalinationProcess.evaluate`` over ``grid``.
+
+    Inputs that are not axes are taken from ``fixed`` (keys as in ``process.SLIDERS``).
+    """
+    process = process or DesalinationProcess()
+    fixed = {**PROCESS_EXTRAS, **(fixed or {})}
+    names = list(SLIDERS) + list(PROCESS_EXTRAS)
+    for start, values in grid.chunks(chunk_points):
+        outputs = process.evaluate(*_inputs(names, grid, fixed, values))
+        n = len(next(iter(values.values())))
+        yield start, {name: np.broadcast_to(v, (n,)) for name, v in outputs._asdict().items()}
+
+
+def _predict_chunk(model, start, X):
+    # Wrapping the float32 block keeps sklearn's feature-name check without a copy.
+    predictions = model.predict(pd.DataFrame(X, columns=FEATURES, copy=False))
+    return start, np.asarray(predictions).reshape(len(X), -1)
+
+
+def _feature_block(grid, fixed, values):
+    n = len(next(iter(values.values())))
+    X = np.empty((n, len(FEATURES)), dtype=np.float32)
+    for j, column in enumerate(_inputs(FEATURES, grid, fixed, values)):
+        X[:, j] = column
+    return X
+
+
+def model_chunks(grid, fixed=None, model=None, chunk_points=CHUNK_POINTS, n_jobs=None):
+    """Yield ``(start, {target: values})`` of the regression model over ``grid``.
+
+    Axes and ``fixed`` are keyed by ``schema.FEATURES`` names. Chunks are scored
+    on ``n_jobs`` threads and yielded in grid order as they finish.
+    """
+    model = model if model is not None else resources.load_predictor()
+    fixed = fixed or {}
+    blocks = ((start, _feature_block(grid, fixed, values)) for start, values in grid.chunks(chunk_points))
+    if n_jobs == 1:
+        scored = (_predict_chunk(model, start, X) for start, X in blocks)
+    else:
+        from joblib import Parallel, delayed
+
+        scored = Parallel(n_jobs=n_jobs or -1, prefer="threads", return_as="generator")(
+            delayed(_predict_chunk)(model, start, X) for start, X in blocks
+        )
+    for start, predictions in scored:
+        yield start, {target: predictions[:, j] for j, target in enumerate(TARGETS)}
+
+
+def reduce(grid, chunks, x, y, outputs=None, how="mean"):
+    """Fold a chunk stream into ``{output: (len(x axis), len(y axis)) array}``.
+
+    Every other axis is collapsed with ``how`` (one of ``REDUCTIONS``).
+    """
+    if how not in REDUCTIONS:
+        raise ValueError(f"how must be one of {REDUCTIONS}, got {how!r}")
+    ix, iy = grid.names.index(x), grid.names.index(y)
+    cells = grid.shape[ix] * grid.shape[iy]
+    fill = {"mean": 0.0, "min": np.inf, "max": -np.inf}[how]
+    acc, counts = {}, np.zeros(cells)
+    for start, values in chunks:
+        outputs = outputs or list(values)
+        index = grid.indices(start, start + len(values[outputs[0]]))
+        cell = index[ix] * grid.shape[iy] + index[iy]
+        if how == "mean":
+            counts += np.bincount(cell, minlength=cells)
+        for name in outputs:
+            target = acc.setdefault(name, np.full(cells, fill))
+            if how == "mean":
+                target += np.bincount(cell, weights=values[name], minlength=cells)
+            else:
+                (np.minimum if how == "min" else np.maximum).at(target, cell, values[name])
+    if how == "mean":
+        acc = {name: total / counts for name, total in acc.items()}
+    return {name: surface.reshape(grid.shape[ix], grid.shape[iy]) for name, surface in acc.items()}
+
+
+def to_frame(grid, chunks):
+    """Concatenate a chunk stream into one long frame (axes plus outputs); for small grids."""
+    frames = []
+    for start, values in chunks:
+        index = grid.indices(start, start + len(next(iter(values.values()))))
+        coords = {name: axis[i] for name, axis, i in zip(grid.names, grid.axes, index)}
+        frames.append(pd.DataFrame({**coords, **values}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def heatmap_figure(grid, surface, x, y, title=None, kind="heatmap", template=None, labels=None):
+    """Plotly heatmap or contour of a ``reduce`` surface; ``labels`` maps axis names to titles."""
+    import plotly.graph_objects as go
+
+    labels = labels or {}
+    trace = go.Contour(contours={"showlabels": True}) if kind == "contour" else go.Heatmap()
+    trace.update(x=grid.axis(x), y=grid.axis(y), z=np.asarray(surface).T, colorscale="Viridis")
+    figure = go.Figure(trace)
+    figure.update_layout(
+        title=title, template=template,
+        xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y),
+    )
+    return figure
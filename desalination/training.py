@@ -0,0 +1,253 @@
+"""Training of the regression model: time-series CV search and versioned artifacts.
+
+``load_training_data`` reads only the feature, target and time columns from the
+Parquet store or a CSV and orders them by time (by default the store, or the
+bundled CSV if the store has not been built). ``search`` scores every
+parameter set on ``TimeSeriesSplit`` folds (each fold trains on the past and is
+evaluated on the block that follows it), spreading the (parameters, fold) fits
+over a process pool. ``train`` refits the best parameters on all rows and
+``save_artifact`` writes the model with a ``manifest.json`` (features, targets,
+data fingerprint, parameters, CV metrics and timings) into a new version
+directory of ``ARTIFACT_DIR``; ``promote`` makes a version the one the app loads.
+"""
+import hashlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import resources
+from .schema import DATA_PATH, FEATURES, FOREST_PATH, MODEL_PATH, PARSE_DTYPES, ROOT, STORE_PATH, TARGETS, TIME_COL
+
+ARTIFACT_DIR = ROOT / "models" / "registry"
+MANIFEST = "manifest.json"
+MODEL_FILE = "model.pkl"
+N_SPLITS = 4
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 16],
+    "min_samples_leaf": [1, 5],
+    "max_features": [1.0, 0.5],
+    # Bounds the rows each tree sees, which keeps fits tractable on large datasets.
+    "max_samples": [None, 0.3],
+}
+# "native": one forest whose trees predict all targets; "multioutput": one forest per target.
+MODEL_KINDS = ("native", "multioutput")
+
+
+def default_source():
+    """The Parquet store if it has been built (``scripts/build_store.py``), else the bundled CSV."""
+    return STORE_PATH if resources.has_store() else DATA_PATH
+
+
+def load_frame(columns, source=None, max_rows=None):
+    """``columns`` of the Parquet store or a CSV (default: ``default_source()``), ordered by time.
+
+    ``max_rows`` keeps every k-th row, which thins the data evenly over time.
+    """
+    columns = list(dict.fromkeys(columns + [TIME_COL]))
+    source = Path(source if source is not None else default_source())
+    if source.is_dir():
+        from .store import read_store
+
+        frame = read_store(source, columns=columns)
+    else:
+        from .ingest import coerce_numbers
+
+        dtypes = {col: dtype for col, dtype in PARSE_DTYPES.items() if col in columns}
+        frame = coerce_numbers(pd.read_csv(source, usecols=columns, dtype=dtypes, parse_dates=[TIME_COL]))[0]
+    frame = frame.sort_values(TIME_COL, kind="stable", ignore_index=True)
+    if max_rows is not None and len(frame) > max_rows:
+        frame = frame.iloc[::-(-len(frame) // max_rows)].reset_index(drop=True)
+    return frame
+
+
+def load_training_data(source=None, max_rows=None):
+    """``(X, y, times)`` ordered by time from the Parquet store or a CSV (see ``load_frame``)."""
+    frame = load_frame(FEATURES + TARGETS, source, max_rows)
+    X = np.ascontiguousarray(frame[FEATURES].to_numpy(dtype=np.float32))
+    y = np.ascontiguousarray(frame[TARGETS].to_numpy(dtype=np.float64))
+    return X, y, frame[TIME_COL].to_numpy()
+
+
+def data_fingerprint(X, y):
+    """``blake2b`` of the exact training matrices, independent of where they were read from."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (X, y):
+        digest.update(str(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+
+def make_model(params, kind="native", seed=42, n_jobs=1):
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.multioutput import MultiOutputRegressor
+
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"kind must be one of {MODEL_KINDS}, got {kind!r}")
+    if kind == "native":
+        return RandomForestRegressor(random_state=seed, n_jobs=n_jobs, **params)
+    return MultiOutputRegressor(RandomForestRegressor(random_state=seed, n_jobs=n_jobs, **params))
+
+
+def metrics(y_true, y_pred, targets=TARGETS):
+    """Per-target RMSE, MAE and R²."""
+    from sklearn.metrics import mean_absolute_error, r2_score, root_mean_squared_error
+
+    return {
+        target: {
+            "rmse": float(root_mean_squared_error(y_true[:, i], y_pred[:, i])),
+            "mae": float(mean_absolute_error(y_true[:, i], y_pred[:, i])),
+            "r2": float(r2_score(y_true[:, i], y_pred[:, i])),
+        }
+        for i, target in enumerate(targets)
+    }
+
+
+def param_sets(grid=PARAM_GRID, trials=None, seed=42):
+    """All combinations of ``grid``, or ``trials`` of them drawn without replacement."""
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    if trials is not None and trials < len(combos):
+        picks = np.random.default_rng(seed).choice(len(combos), trials, replace=False)
+        combos = [combos[i] for i in sorted(picks)]
+    return combos
+
+
+def folds(n_rows, n_splits=N_SPLITS, gap=0):
+    """Expanding-window train/test index pairs over time-ordered rows."""
+    from sklearn.model_selection import TimeSeriesSplit
+
+    return list(TimeSeriesSplit(n_splits=n_splits, gap=gap).split(np.empty((n_rows, 1))))
+
+
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data["X"], _worker_data["y"] = X, y
+
+
+def _fit_fold(task):
+    index, params, kind, seed, (train, test) = task
+    X, y = _worker_data["X"], _worker_data["y"]
+    start = time.perf_counter()
+    model = make_model(params, kind, seed).fit(X[train], y[train])
+    return index, metrics(y[test], model.predict(X[test])), time.perf_counter() - start
+
+
+def _summarize(fold_metrics):
+    summary = {}
+    for target in TARGETS:
+        summary[target] = {}
+        for name in ("rmse", "mae", "r2"):
+            values = [m[target][name] for m in fold_metrics]
+            summary[target][name] = float(np.mean(values))
+            summary[target][f"{name}_std"] = float(np.std(values))
+    return summary
+
+
+def search(X, y, candidates, kind="native", n_splits=N_SPLITS, gap=0, workers=None, seed=42):
+    """Score every parameter set on time-series folds; results are sorted best first.
+
+    Ranking is by R² averaged over targets and folds, so targets on different
+    scales weigh the same.
+    """
+    splits = folds(len(X), n_splits, gap)
+    tasks = [(i, params, kind, seed, split) for i, params in enumerate(candidates) for split in splits]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        _init_worker(X, y)
+        done = [_fit_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(X, y)) as pool:
+            done = list(pool.map(_fit_fold, tasks))
+
+    results = []
+    for i, params in enumerate(candidates):
+        fold_metrics = [m for index, m, _ in done if index == i]
+        summary = _summarize(fold_metrics)
+        results.append({
+            "params": params,
+            "score": float(np.mean([summary[t]["r2"] for t in TARGETS])),
+            "metrics": summary,
+            "fit_seconds": float(sum(s for index, _, s in done if index == i)),
+        })
+    return sorted(results, key=lambda r: -r["score"])
+
+
+def train(source=None, kind="native", grid=PARAM_GRID, trials=None, n_splits=N_SPLITS, gap=0,
+          workers=None, seed=42, max_rows=None):
+    """Search, refit the best parameters on all rows and return ``(model, manifest)``."""
+    import sklearn
+
+    started = time.perf_counter()
+    X, y, times = load_training_data(source, max_rows)
+    loaded = time.perf_counter()
+    results = search(X, y, param_sets(grid, trials, seed), kind, n_splits, gap, workers, seed)
+    searched = time.perf_counter()
+    best = results[0]
+    # Fitted on a frame so the model records feature_names_in_ like the notebook-trained one.
+    frame = pd.DataFrame(X, columns=FEATURES, copy=False)
+    model = make_model(best["params"], kind, seed, n_jobs=workers or -1).fit(frame, y)
+    fitted = time.perf_counter()
+
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": str(source if source is not None else default_source()),
+        "data_fingerprint": data_fingerprint(X, y),
+        "rows": int(len(X)),
+        "time_range": [str(times[0]), str(times[-1])] if len(times) else None,
+        "features": FEATURES,
+        "targets": TARGETS,
+        "kind": kind,
+        "params": best["params"],
+        "seed": seed,
+        "cv": {"scheme": "TimeSeriesSplit", "n_splits": n_splits, "gap": gap},
+        "metrics": best["metrics"],
+        "search": results,
+        "timing": {
+            "load_seconds": loaded - started,
+            "search_seconds": searched - loaded,
+            "fit_seconds": fitted - searched,
+            "total_seconds": fitted - started,
+        },
+        "versions": {"python": platform.python_version(), "sklearn": sklearn.__version__, "numpy": np.__version__},
+    }
+    return model, manifest
+
+
+def save_artifact(model, manifest, root=ARTIFACT_DIR):
+    """Write ``model.pkl`` and ``manifest.json`` into a new version directory; returns its path."""
+    import joblib
+
+    version = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{manifest['data_fingerprint'][:8]}"
+    path = Path(root) / version
+    path.mkdir(parents=True, exist_ok=False)
+    joblib.dump(model, path / MODEL_FILE)
+    manifest = {"version": version, **manifest}
+    (path / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1))
+    return path
+
+
+def list_artifacts(root=ARTIFACT_DIR):
+    """Manifests of all saved versions, oldest first."""
+    return [json.loads(p.read_text()) for p in sorted(Path(root).glob(f"*/{MANIFEST}"))]
+
+
+def promote(version_dir, model_path=MODEL_PATH, forest_path=FOREST_PATH):
+    """Install a version as the app's model: copy the pickle and rebuild the compiled forest."""
+    import joblib
+
+    from .forest import compile_forest
+
+    version_dir = Path(version_dir)
+    shutil.copyfile(version_dir / MODEL_FILE, model_path)
+    compile_forest(joblib.load(model_path)).save(forest_path)
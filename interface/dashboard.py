@@ -0,0 +1,37 @@
+"""Run the Streamlit dashboard with warm-up and readiness probes.
+
+    python interface/dashboard.py --port 8501 --health-port 8502
+
+Equivalent to ``streamlit run interface/streamlit_app.py`` except that the
+server process warms up (``desalination.startup``) before any browser connects
+and answers ``/health`` and ``/ready`` on ``--health-port``.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from desalination import startup
+
+APP = Path(__file__).resolve().parent / "streamlit_app.py"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--address", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--health-port", type=int, default=startup.HEALTH_PORT)
+    args = parser.parse_args()
+
+    # Streamlit's own imports do not take startup.import_lock, so they finish before the warm-up starts.
+    from streamlit.web import bootstrap
+
+    startup.start(args.health_port, args.address)
+    flag_options = {"server.address": args.address, "server.port": args.port, "server.headless": True}
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(str(APP), False, [], flag_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Async HTTP prediction service for the regression and anomaly models.
+
+    python interface/service.py --port 8000
+
+    GET  /               the ``templates/index.html`` form (output-pressure prediction)
+    POST /               form submission, rendered back with the prediction
+    POST /predict        one JSON object of features -> targets and anomaly flag
+    POST /predict/batch  {"rows": [{...}, ...]} -> {"predictions": [{...}, ...]}
+    GET  /health         model status and micro-batch counters
+
+Both models are loaded once at startup. Requests are scored through a shared
+``MicroBatcher``, so concurrent callers are coalesced into one model call.
+Features may be given by their ``schema.FEATURES`` names or by the form field
+names; features left out take the median of the sample rows.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+import tornado.web
+from jinja2 import Environment, FileSystemLoader
+
+from desalination import resources, scoring
+from desalination.microbatch import MAX_ROWS, MAX_WAIT, MicroBatcher
+from desalination.schema import FEATURES, REGION_COL, REGIONS, TARGETS
+
+TEMPLATES = Path(__file__).resolve().parent / "templates"
+FORM_FIELDS = {
+    "temperature": "температура", "salinity": "тұздылық", "ph": "pH",
+    "input_pressure": "кіру_қысымы", "water_level": "су_деңгейі",
+}
+MAX_BULK_ROWS = 10_000
+# Features are scored as float32; larger magnitudes would become infinite.
+MAX_FEATURE_VALUE = float(np.finfo(np.float32).max)
+
+
+class PredictionService:
+    def __init__(self, model, anomaly_model, defaults, max_rows=MAX_ROWS, max_wait=MAX_WAIT):
+        self.model = model
+        self.anomaly_model = anomaly_model
+        self.defaults = defaults
+        self.batcher = MicroBatcher(self.score, max_rows, max_wait)
+
+    @classmethod
+    def load(cls, **batching):
+        try:
+            sample = resources.load_aggregates().sample()
+            defaults = sample[FEATURES].median().to_dict() if len(sample) else {}
+        except FileNotFoundError:
+            defaults = {}
+        return cls(resources.load_predictor(), resources.load_anomaly_detector(), defaults, **batching)
+
+    def score(self, X):
+        frame = pd.DataFrame(X, columns=FEATURES, copy=False)
+        return scoring.predict_batch(frame, self.model, self.anomaly_model, n_jobs=1)
+
+    def feature_row(self, payload):
+        """Feature vector of one request; raises ``ValueError`` with a client-facing message."""
+        if not isinstance(payload, dict):
+            raise ValueError("expected a JSON object of features")
+        values = dict(self.defaults)
+        for key, value in payload.items():
+            if key == REGION_COL:
+                if value not in REGIONS:
+                    raise ValueError(f"unknown region: {value}")
+                key, value = "өңір_код", REGIONS.index(value)
+            key = FORM_FIELDS.get(key, key)
+            if key not in FEATURES:
+                raise ValueError(f"unknown feature: {key}")
+            if value not in (None, ""):
+                values[key] = value
+        missing = [col for col in FEATURES if col not in values]
+        if missing:
+            raise ValueError(f"missing features: {', '.join(missing)}")
+        try:
+            row = [float(values[col]) for col in FEATURES]
+        except (TypeError, ValueError):
+            raise ValueError("feature values must be numbers") from None
+        # json.loads accepts NaN and Infinity, and float() accepts "nan"; NaN fails the comparison too.
+        invalid = [col for col, value in zip(FEATURES, row) if not abs(value) <= MAX_FEATURE_VALUE]
+        if invalid:
+            raise ValueError(f"feature values must be finite numbers: {', '.join(invalid)}")
+        return row
+
+    async def predict(self, rows):
+        X = np.array([self.feature_row(row) for row in rows], dtype=np.float32).reshape(-1, len(FEATURES))
+        scored = await self.batcher.submit(X)
+        return [
+            {**{target: float(row[target]) for target in TARGETS}, scoring.ANOMALY_COL: bool(row[scoring.ANOMALY_COL])}
+            for row in scored.to_dict("records")
+        ]
+
+
+class JsonHandler(tornado.web.RequestHandler):
+    @property
+    def service(self):
+        return self.settings["service"]
+
+    def write_json(self, payload, status=200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(json.dumps(payload, ensure_ascii=False))
+
+    def json_body(self):
+        try:
+            return json.loads(self.request.body or b"null")
+        except ValueError:
+            raise ValueError("request body is not valid JSON") from None
+
+    async def respond(self, work):
+        try:
+            self.write_json(await work())
+        except ValueError as exc:
+            self.write_json({"error": str(exc)}, status=400)
+
+
+class PredictHandler(JsonHandler):
+    async def post(self):
+        async def work():
+            return (await self.service.predict([self.json_body()]))[0]
+        await self.respond(work)
+
+
+class BatchPredictHandler(JsonHandler):
+    async def post(self):
+        async def work():
+            body = self.json_body()
+            rows = body.get("rows") if isinstance(body, dict) else body
+            if not isinstance(rows, list):
+                raise ValueError('expected {"rows": [...]} or a JSON array')
+            if len(rows) > MAX_BULK_ROWS:
+                raise ValueError(f"at most {MAX_BULK_ROWS} rows per request")
+            return {"predictions": await self.service.predict(rows)}
+        await self.respond(work)
+
+
+class HealthHandler(JsonHandler):
+    def get(self):
+        service = self.service
+        self.write_json({
+            "status": "ok",
+            "model": type(service.model).__name__,
+            "anomaly_model": type(service.anomaly_model).__name__,
+            **service.batcher.stats(),
+        })
+
+
+class FormHandler(tornado.web.RequestHandler):
+    def render_form(self, prediction=None, error=None):
+        template = self.settings["templates"].get_template("index.html")
+        self.finish(template.render(prediction=prediction, error=error))
+
+    def get(self):
+        self.render_form()
+
+    async def post(self):
+        fields = {name: self.get_body_argument(name, "") for name in FORM_FIELDS}
+        try:
+            prediction = (await self.settings["service"].predict([fields]))[0][TARGETS[0]]
+        except ValueError as exc:
+            self.set_status(400)
+            self.render_form(error=str(exc))
+            return
+        self.render_form(prediction)
+
+
+def make_app(service):
+    return tornado.web.Application(
+        [
+            (r"/", FormHandler),
+            (r"/predict", PredictHandler),
+            (r"/predict/batch", BatchPredictHandler),
+            (r"/health", HealthHandler),
+        ],
+        service=service,
+        templates=Environment(loader=FileSystemLoader(TEMPLATES), autoescape=True),
+    )
+
+
+async def serve(args):
+    service = PredictionService.load(max_rows=args.max_rows, max_wait=args.max_wait_ms / 1000)
+    service.batcher.start()
+    make_app(service).listen(args.port, args.host)
+    print(f"Serving on http://{args.host}:{args.port}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async HTTP prediction service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-rows", type=int, default=MAX_ROWS, help="rows per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1000, help="max wait to fill a batch")
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,49 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-import plotly.express as px
-import plotly.graph_objects as go
-from scipy.optimize import minimize
 import streamlit.components.v1 as components
 
-# Load models and data
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from desalination import startup
+
+# The warm-up thread may be importing the same packages; see ``startup.import_lock``.
+with startup.import_lock:
+    import pandas as pd
+    import numpy as np
+
+    from desalination import explain, ingest, optimize, process, resources, rollup, scoring, sweep
+# plotly and scipy are imported by the stages that use them, so they do not delay the first render.
+
+# Load models and data (cached per process, reloaded only when the files change)
 try:
-    model = joblib.load("models/kz_model.pkl")
-    anomaly_model = joblib.load("models/anomaly_model.pkl")
+    model = resources.load_predictor()
+    anomaly_model = resources.load_anomaly_detector()
 except FileNotFoundError:
     st.error("Модель файлдары табылмады. 'kz_model.pkl' және 'anomaly_model.pkl' файлдарын 'models/' қалтасына орналастырыңыз.")
     st.stop()
 
 try:
-    df = pd.read_csv("data/sensor_data_kz_realistic.csv")
-    df["уақыт"] = pd.to_datetime(df["уақыт"])
+    stats = resources.load_aggregates()
+    # With the Parquet store, row-level tabs read only the partitions they need.
+    df = None if resources.has_store() else resources.load_dataset()
 except FileNotFoundError:
     st.error("Деректер файлы табылмады. 'data/sensor_data_kz_realistic.csv' файлын 'data/' қалтасына орналастырыңыз.")
     st.stop()
 
+
+def active_upload():
+    """Scored CSV from Stage 1 that replaces the bundled dataset, if one is loaded."""
+    key = st.session_state.get("active_upload")
+    return st.session_state[key] if key else None
+
+
+if active_upload() is not None:
+    stats = active_upload()["stats"]
+    df = stats.sample()
+# Memoized results are keyed on this, so they are recomputed after an upload.
+source_key = st.session_state.get("active_upload") or "dataset"
+
 # Set page configuration
 st.set_page_config(page_title="Суды тұщыландыру жүйесі", layout="wide", page_icon="💧")
 
@@ -73,7 +95,7 @@ st.markdown("""
         background-color: #42A5F5;
         border-radius: 10px;
     }
-    .stTabs { 
+    .st-key-current_tab { 
         background-color: var(--info-bg); 
         padding: 10px; 
         border-radius: 15px; 
@@ -118,11 +140,25 @@ components.html("""
     });
 </script>
 """)
+STAGE_LABELS = [
+    "1. Датасет", 
+    "2. Өңірлер", 
+    "3. Корреляция", 
+    "4. Модельді үйрету", 
+    "5. Болжам", 
+    "6. Тұщыландыру", 
+    "7. Өңір статистикасы", 
+    "8. Параметр маңыздылығы"
+]
+# Session keys of the Tab 6 sliders, in the order of ``process.quantize``.
+PROCESS_KEYS = ["initial_salinity", "r_nano", "r_ro", "input_pressure", "flow_rate", "energy_efficiency"]
+IMPORTANCE_KINDS = ["Орташа |SHAP|", "Ағаштардағы маңыздылық"]
+st.session_state.setdefault('current_tab', 0)
 tab_action = st.text_input("Tab action", label_visibility="hidden")
-if tab_action == "next_tab" and st.session_state.get('current_tab', 0) < 7:
+if tab_action == "next_tab" and st.session_state['current_tab'] < len(STAGE_LABELS) - 1:
     st.session_state['current_tab'] += 1
     st.rerun()
-elif tab_action == "prev_tab" and st.session_state.get('current_tab', 0) > 0:
+elif tab_action == "prev_tab" and st.session_state['current_tab'] > 0:
     st.session_state['current_tab'] -= 1
     st.rerun()
 
@@ -141,73 +177,183 @@ with st.expander("ℹ️ Анықтама"):
 # Display the "Interactive Tutorial" label without functionality
 st.markdown("📖 Интерактивті нұсқаулық")
 
-# Tabs for each stage
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
-    "1. Датасет", 
-    "2. Өңірлер", 
-    "3. Корреляция", 
-    "4. Модельді үйрету", 
-    "5. Болжам", 
-    "6. Тұщыландыру", 
-    "7. Өңір статистикасы", 
-    "8. Параметр маңыздылығы"
-])
+
+# Only the selected stage is drawn on a rerun. Widgets of stages that are not drawn
+# lose their state, so their values are re-assigned here to survive stage switches.
+WIDGET_DEFAULTS = {
+    "dataset_rows": 5, "region_select": None, "region_select_tab6": None, "method_select": "кері осмос",
+    "sweep_x": "initial_salinity", "sweep_y": "pressure", "sweep_output": "operational_cost",
+    "optimization_goal": "Минимизация затрат", "min_salinity": 300, "max_salinity": 500,
+    "history_metric": "шығыс_қысымы", "history_range": None,
+    "shap_target": "шығыс_қысымы", "importance_kind": "Орташа |SHAP|", "importance_target": "шығыс_қысымы",
+}
+for key, default in WIDGET_DEFAULTS.items():
+    value = st.session_state.get(key, default)
+    if value is not None:
+        st.session_state[key] = value
+
+
+def keep_choice(key, options):
+    """Point a persisted selectbox at a valid option; the data or another widget may have changed."""
+    if st.session_state.get(key) not in options:
+        st.session_state[key] = options[0]
+
+
+def memo(name, key, compute):
+    """``compute()`` once per ``key`` for this session, so revisiting a stage does not redo its work."""
+    results = st.session_state.setdefault("_memo", {})
+    if name not in results or results[name][0] != key:
+        results[name] = (key, compute())
+    return results[name][1]
+
+
+def selected_region():
+    """Region chosen in Stage 2, also used by Stages 5 and 6."""
+    keep_choice("region_select", sorted(stats.region_counts().index))
+    return st.session_state["region_select"]
+
+
+def example_rows(region):
+    """One sampled nanofiltration/RO reading of ``region``, kept until the region or data changes."""
+    def draw():
+        rows = resources.load_history(regions=[region]) if df is None else df[df["өңір"] == region]
+        valid = rows[rows["әдіс"].isin(["нанофильтрация", "кері осмос"])]
+        return valid.sample(1) if len(valid) else None
+    return memo("example", (source_key, region), draw)
+
+
+def forget_upload():
+    if st.session_state.get("dataset_upload") is None:
+        st.session_state["active_upload"] = None
+
 
 # Stage 1: Dataset Structure
-with tab1:
+def stage_dataset():
     st.markdown('<div class="stage-title">📁 1. Датасет құрылымы</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Сенсорлардан жиналған деректер: температура, тұздылық, pH, қысым, су деңгейі, шығындар және әдіс.</div>', unsafe_allow_html=True)
-    uploaded_file = st.file_uploader("Сенсор деректерін жүктеу (CSV)", type="csv")
+    uploaded_file = st.file_uploader("Сенсор деректерін жүктеу (CSV)", type="csv", key="dataset_upload", on_change=forget_upload)
     if uploaded_file:
-        uploaded_df = pd.read_csv(uploaded_file)
-        required_cols = ["өңір", "температура", "тұздылық", "pH", "кіру_қысымы", "су_деңгейі", "фильтр_тиімділігі", "мембрана_жасы", "техникалық_жағдай", "зауыт_сыйымдылығы"]
-        if all(col in uploaded_df.columns for col in required_cols):
-            df = uploaded_df
-            st.success("Деректер сәтті жүктелді!")
+        # Stream the upload once per file: aggregates + scoring per chunk, raw rows are not kept.
+        upload_key = f"upload_{uploaded_file.file_id}"
+        if upload_key not in st.session_state:
+            upload = {"scored": [], "rows": 0, "anomalies": 0, "error": None, "name": uploaded_file.name}
+
+            def score_chunk(chunk):
+                if upload["error"] is not None:
+                    return
+                try:
+                    scored = scoring.predict_batch(chunk, model, anomaly_model)
+                except ValueError as exc:
+                    upload["error"] = str(exc)
+                    return
+                upload["rows"] += len(scored)
+                upload["anomalies"] += int(scored["аномалия"].sum())
+                if sum(len(part) for part in upload["scored"]) < 20:
+                    upload["scored"].append(scored.head(20))
+
+            try:
+                upload["stats"] = ingest.ingest(uploaded_file, on_chunk=score_chunk)
+            except ingest.MissingColumnsError as exc:
+                upload = {"missing": str(exc)}
+            except ValueError as exc:
+                upload = {"unreadable": str(exc)}
+            st.session_state[upload_key] = upload
+        if "missing" in st.session_state[upload_key]:
+            st.error(f"CSV файлы қажетті бағандарды қамтымайды. {st.session_state[upload_key]['missing']}")
+        elif "unreadable" in st.session_state[upload_key]:
+            st.error(f"CSV файлының мәндерін оқу мүмкін болмады (деректер түрі қате). {st.session_state[upload_key]['unreadable']}")
+        else:
+            st.session_state["active_upload"] = upload_key
+    elif active_upload() is not None and st.button("Бастапқы деректерге оралу"):
+        st.session_state["active_upload"] = None
+        st.rerun()
+
+    upload = active_upload()
+    sample = df if df is not None else stats.sample()
+    if upload is not None:
+        sample = upload["stats"].sample()
+        st.success(f"Деректер сәтті жүктелді: {upload['name']}")
+        if upload["stats"].rejected:
+            st.info(f"Бос немесе қате мәндері бар {upload['stats'].rejected:,} жол есепке алынбады.")
+        if upload["error"] is not None:
+            st.warning(f"Болжам жасалмады: {upload['error']}")
         else:
-            st.error("CSV файлы қажетті бағандарды қамтымайды.")
-    rows = st.slider("Көрсетілетін жолдар саны", 5, 20, 5, key="dataset_rows")
-    st.dataframe(df.head(rows), use_container_width=True)
+            col_rows, col_anomalies = st.columns(2)
+            col_rows.metric("Бағаланған жолдар", f"{upload['rows']:,}")
+            col_anomalies.metric("Аномалиялар", f"{upload['anomalies']:,}")
+            st.dataframe(pd.concat(upload["scored"]).head(20), use_container_width=True)
+    rows = st.slider("Көрсетілетін жолдар саны", 5, 20, key="dataset_rows")
+    st.dataframe(sample.head(rows), use_container_width=True)
+
 
 # Stage 2: Regional Visualization
-with tab2:
+def stage_regions():
+    px = startup.imported("plotly.express")
+    startup.imported("plotly.graph_objects")
+
     st.markdown('<div class="stage-title">🌍 2. Өңірлер бойынша визуализация</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Өңір таңдап, тұщыландыру әдістерінің таралуын гистограммада көріңіз.</div>', unsafe_allow_html=True)
-    selected_region = st.selectbox("Өңірді таңдаңыз:", sorted(df["өңір"].unique()), key="region_select")
-    filtered_df = df[df["өңір"] == selected_region]
-    fig_map = px.histogram(filtered_df, x="әдіс", title=f"{selected_region} өңіріндегі әдістер жиілігі", color="әдіс", template=theme)
+    selected_region()
+    region = st.selectbox("Өңірді таңдаңыз:", sorted(stats.region_counts().index), key="region_select")
+    method_counts = stats.method_counts()
+    method_counts = method_counts[method_counts["өңір"] == region]
+    fig_map = px.bar(method_counts, x="әдіс", y="count", title=f"{region} өңіріндегі әдістер жиілігі", color="әдіс", template=theme)
     st.plotly_chart(fig_map, use_container_width=True)
 
+    # History from the time rollups, downsampled to a fixed number of points whatever the range
+    st.markdown("### 📈 Уақыт бойынша көрсеткіштер")
+    span = stats.rollups.span()
+    if span is None:
+        st.info("Деректерде уақыт бағаны жоқ.")
+        return
+    first, last = (bound.to_pydatetime() for bound in span)
+    saved = st.session_state.get("history_range")
+    if not saved or saved[0] < first or saved[1] > last:
+        st.session_state["history_range"] = (first, last)
+    metric = st.selectbox("Көрсеткіш:", rollup.METRICS, key="history_metric")
+    start, end = st.slider("Кезең:", first, last, step=pd.Timedelta(hours=1).to_pytimedelta(), format="YYYY-MM-DD HH:mm", key="history_range")
+    resolution, series = memo("history", (source_key, region, metric, start, end),
+                              lambda: stats.rollups.series(metric, region, start, end))
+    points = rollup.downsample(series)
+    st.plotly_chart(rollup.history_figure(points, f"{region}: {metric}", theme, metric), use_container_width=True)
+    st.caption(f"Деңгей: {resolution}, {len(series):,} аралықтан {len(points):,} нүкте көрсетілді.")
+
+
 # Stage 3: Parameter Correlation
-with tab3:
+def stage_correlation():
+    px = startup.imported("plotly.express")
+
     st.markdown('<div class="stage-title">📊 3. Параметрлер арасындағы байланыс</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Корреляциялық матрица параметрлердің өзара байланысын көрсетеді.</div>', unsafe_allow_html=True)
-    numeric_cols = ["температура", "тұздылық", "pH", "кіру_қысымы", "шығыс_қысымы", "энергия_шығыны", "операциялық_шығын"]
-    corr = df[numeric_cols].corr()
+    corr = memo("correlation", source_key, stats.correlation)
     fig_corr = px.imshow(corr, text_auto=True, title="Корреляциялық матрица", color_continuous_scale="RdBu", template=theme)
     st.plotly_chart(fig_corr, use_container_width=True)
 
+
 # Stage 4: Model Training
-with tab4:
+def stage_training():
     st.markdown('<div class="stage-title">🧠 4. Модель қалай үйретілді?</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">RandomForestRegressor қысымды, энергияны және шығындарды болжау үшін параметрлерді талдайды.</div>', unsafe_allow_html=True)
     st.markdown("""
-    - **Модель**: MultiOutputRegressor(RandomForestRegressor)  
+    - **Модель**: RandomForestRegressor — бір орман үш нысананы бірге болжайды  
     - **Нысаналар**: Шығыс қысымы, Энергия шығыны, Операциялық шығын  
     - **Параметрлер**: Өңір коды, Температура, Тұздылық, pH, Кіру қысымы, Су деңгейі, Фильтр тиімділігі, Мембрана жасы, Техникалық жағдай, Зауыт сыйымдылығы
     """)
-    st.button("Модель туралы толығырақ", help="MultiOutputRegressor бірнеше нысананы болжауға мүмкіндік береді.")
+    st.button("Модель туралы толығырақ", help="Әр ағаш үш нысананың мәндерін бірден береді, сондықтан бір орман барлық нысананы болжайды.")
+
 
 # Stage 5: Model Prediction
-with tab5:
+def stage_prediction():
+    go = startup.imported("plotly.graph_objects")
+
     st.markdown('<div class="stage-title">🧪 5. Модель болжамы</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Модель қысымды, энергияны және шығындарды болжайды, аномалияларды анықтайды.</div>', unsafe_allow_html=True)
-    valid_df = filtered_df[filtered_df["әдіс"].isin(["нанофильтрация", "кері осмос"])]
-    if len(valid_df) == 0:
-        st.warning(f"{selected_region} өңірінде 'нанофильтрация' немесе 'кері осмос' әдістері жоқ.")
-        example = None
+    region = selected_region()
+    example_row = example_rows(region)
+    if example_row is None:
+        st.warning(f"{region} өңірінде 'нанофильтрация' немесе 'кері осмос' әдістері жоқ.")
     else:
-        example = valid_df.sample(1).iloc[0]
+        example = example_row.iloc[0]
         st.markdown(f"""
         **Мысал деректер:**  
         - Өңір: {example['өңір']}  
@@ -221,23 +367,12 @@ with tab5:
         - Техникалық жағдай: {'Қызмет көрсетуде' if example['техникалық_жағдай'] else 'Қалыпты'}  
         - Зауыт сыйымдылығы: {example['зауыт_сыйымдылығы']} м³/тәулік
         """)
-        predict_input_dict = {
-            "өңір_код": example["өңір_код"],
-            "температура": example["температура"],
-            "тұздылық": example["тұздылық"],
-            "pH": example["pH"],
-            "кіру_қысымы": example["кіру_қысымы"],
-            "су_деңгейі": example["су_деңгейі"],
-            "фильтр_тиімділігі": example["фильтр_тиімділігі"],
-            "мембрана_жасы": example["мембрана_жасы"],
-            "техникалық_жағдай": example["техникалық_жағдай"],
-            "зауыт_сыйымдылығы": example["зауыт_сыйымдылығы"]
-        }
-        predict_input = pd.DataFrame([predict_input_dict])
-        is_anomaly = anomaly_model.predict(predict_input)[0] == -1
+        scored = memo("example_scores", (source_key, region, example_row.index[0]),
+                      lambda: scoring.predict_batch(example_row, model, anomaly_model))
+        is_anomaly = scored["аномалия"].iloc[0]
         if is_anomaly:
             st.warning("⚠️ Аномалия анықталды! Болжам дәл болмауы мүмкін.")
-        predictions = model.predict(predict_input)[0]
+        predictions = scored[scoring.TARGETS].iloc[0].to_numpy()
         st.success(f"""
         📌 Болжамдар:
         - Шығыс қысымы: **{predictions[0]:.2f} бар**
@@ -254,23 +389,34 @@ with tab5:
         if predictions[1] > 2.5:
             st.warning("⚠️ Энергия шығыны жоғары – тиімділікті арттырыңыз.")
         
-        pressure_formula = 0.002 * example['тұздылық'] + 0.04 * example['температура'] - 0.25 * example['pH'] + 0.1 * example['кіру_қысымы'] - 0.05 * (example['мембрана_жасы'] / 365)
-        st.write(f"Формула бойынша қысым: **{pressure_formula:.2f} бар**")
-        
-        weights = {
-            "Тұздылық": 0.002 * example['тұздылық'],
-            "Температура": 0.04 * example['температура'],
-            "pH (теріс)": -0.25 * example['pH'],
-            "Кіру қысымы": 0.1 * example['кіру_қысымы'],
-            "Мембрана жасы (теріс)": -0.05 * (example['мембрана_жасы'] / 365)
-        }
-        df_weights = pd.DataFrame.from_dict(weights, orient="index", columns=["Қосқан үлесі (бар)"]).reset_index()
-        df_weights.rename(columns={"index": "Фактор"}, inplace=True)
-        fig_formula = px.bar(df_weights, x="Фактор", y="Қосқан үлесі (бар)", title="Формула параметрлерінің үлесі", text_auto=True, template=theme)
-        st.plotly_chart(fig_formula, use_container_width=True)
+        # Attributions from the model's own trees (TreeSHAP): average prediction + contributions = prediction
+        st.markdown("### 🔍 Болжамның түсіндірмесі")
+        try:
+            values, expected = memo("example_shap", (source_key, region, example_row.index[0], id(model)),
+                                    lambda: explain.explain(example_row, model))
+        except ValueError as exc:
+            st.info(f"Түсіндірме қолжетімсіз: {exc}")
+        else:
+            target = st.selectbox("Нысана:", scoring.TARGETS, key="shap_target")
+            t = scoring.TARGETS.index(target)
+            contributions = pd.Series(values[0, :, t], index=scoring.FEATURES).sort_values(key=np.abs, ascending=False)
+            fig_shap = go.Figure(go.Waterfall(
+                x=["Орташа болжам", *contributions.index, "Болжам"],
+                y=[expected[t], *contributions.to_numpy(), 0.0],
+                measure=["absolute"] + ["relative"] * len(contributions) + ["total"],
+                text=[f"{expected[t]:.3f}", *(f"{v:+.3f}" for v in contributions), f"{predictions[t]:.3f}"],
+            ))
+            fig_shap.update_layout(title=f"Факторлардың болжамға қосқан үлесі: {target}", template=theme, showlegend=False)
+            st.plotly_chart(fig_shap, use_container_width=True)
+
 
 # Stage 6: Two-Stage Desalination (Enhanced)
-with tab6:
+def stage_desalination():
+    px = startup.imported("plotly.express")
+    go = startup.imported("plotly.graph_objects")
+    for name in ("scipy.interpolate", "scipy.optimize"):
+        startup.imported(name)
+
     st.markdown('<div class="stage-title">💧 6. Екі кезеңді тұщыландыру – Толық талдау</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Нанофильтрация және кері осмос арқылы судың тұздылығын азайту. Өңір мен әдісті таңдап, тиімділікті салыстырыңыз.</div>', unsafe_allow_html=True)
 
@@ -287,45 +433,35 @@ with tab6:
     - Энергия шығыны: $$E = \frac{P \times Q_{in}}{η \times 3600}$$
     """)
 
-    if example is None:
+    example_row = example_rows(selected_region())
+    if example_row is None:
         st.warning("Алдыңғы кезеңде деректер таңдалмаған. 'Нанофильтрация' немесе 'кері осмос' әдісі бар өңірді таңдаңыз.")
     else:
+        example = example_row.iloc[0]
         st.subheader("⚙️ Өңір және әдіс бойынша тиімділікті салыстыру")
         # Select region and method
-        region = st.selectbox("Өңірді таңдаңыз:", sorted(df["өңір"].unique()), key="region_select_tab6")
+        keep_choice("region_select_tab6", sorted(stats.region_counts().index))
+        region = st.selectbox("Өңірді таңдаңыз:", sorted(stats.region_counts().index), key="region_select_tab6")
         method = st.selectbox("Әдісті таңдаңыз:", ["кері осмос", "нанофильтрация"], key="method_select")
 
         # Calculate region-specific averages from dataset
-        region_data = df[df["өңір"] == region]
-        avg_salinity = region_data["тұздылық"].mean()
-        avg_pressure = region_data["кіру_қысымы"].mean()
-        avg_efficiency = region_data["фильтр_тиімділігі"].mean()
+        region_data = memo("region_means", source_key, stats.region_means).loc[region]
+        avg_salinity = region_data["тұздылық"]
+        avg_pressure = region_data["кіру_қысымы"]
+        avg_efficiency = region_data["фильтр_тиімділігі"]
         avg_flow_rate = 5.0  # Default value
         avg_r_nano = 0.6 if method == "нанофильтрация" else 0.5
         avg_r_ro = 0.95 if method == "кері осмос" else 0.9
 
-        # Initialize session state for parameters
-        if 'initial_salinity' not in st.session_state:
-            st.session_state.initial_salinity = float(avg_salinity)
-        if 'r_nano' not in st.session_state:
-            st.session_state.r_nano = avg_r_nano
-        if 'r_ro' not in st.session_state:
-            st.session_state.r_ro = avg_r_ro
-        if 'input_pressure' not in st.session_state:
-            st.session_state.input_pressure = float(avg_pressure)
-        if 'flow_rate' not in st.session_state:
-            st.session_state.flow_rate = avg_flow_rate
-        if 'energy_efficiency' not in st.session_state:
-            st.session_state.energy_efficiency = float(avg_efficiency)
+        # Region averages snapped to the slider grid, so every number on the page uses the same state
+        defaults = dict(zip(PROCESS_KEYS, process.quantize(
+            avg_salinity, avg_r_nano, avg_r_ro, avg_pressure, avg_flow_rate, avg_efficiency)))
+        for key, value in defaults.items():
+            st.session_state.setdefault(key, value)
 
         # Button to load region averages
         if st.button("Өңірдің орташа параметрлерін жүктеу"):
-            st.session_state.initial_salinity = float(avg_salinity)
-            st.session_state.r_nano = avg_r_nano
-            st.session_state.r_ro = avg_r_ro
-            st.session_state.input_pressure = float(avg_pressure)
-            st.session_state.flow_rate = avg_flow_rate
-            st.session_state.energy_efficiency = float(avg_efficiency)
+            st.session_state.update(defaults)
             st.rerun()
 
         # Sliders for manual parameter adjustment
@@ -340,25 +476,19 @@ with tab6:
             st.session_state.flow_rate = st.slider("Кіріс ағыны (м³/сағ)", 1.0, 10.0, st.session_state.flow_rate, step=0.5)
             st.session_state.energy_efficiency = st.slider("Энергия тиімділігі (η)", 0.7, 0.9, st.session_state.energy_efficiency, step=0.01)
 
-        # Retrieve values from session state
-        initial_salinity = st.session_state.initial_salinity
-        r_nano = st.session_state.r_nano
-        r_ro = st.session_state.r_ro
-        input_pressure = st.session_state.input_pressure
-        flow_rate = st.session_state.flow_rate
-        energy_efficiency = st.session_state.energy_efficiency
-
-        # Calculations
-        sal_nano = initial_salinity * (1 - r_nano)
-        sal_ro = sal_nano * (1 - r_ro)
-        recovery_nano = 0.6
-        recovery_ro = 0.4
-        total_recovery = recovery_nano * recovery_ro
-        output_flow = flow_rate * total_recovery
-        energy_nano = (input_pressure * flow_rate) / (energy_efficiency * 3600) * 0.5
-        energy_ro = (input_pressure * flow_rate * 1.5) / (energy_efficiency * 3600)
-        total_energy = energy_nano + energy_ro
-        operational_cost = total_energy * 0.1 + (0.2 if example['техникалық_жағдай'] else 0.05) + 0.01 * (example['мембрана_жасы'] / 365)
+        # Retrieve values from session state, on the same grid the cached evaluation uses
+        initial_salinity, r_nano, r_ro, input_pressure, flow_rate, energy_efficiency = process.quantize(
+            *(st.session_state[key] for key in PROCESS_KEYS))
+
+        # Calculations (memoized on the slider state)
+        outputs = process.evaluate_cached(
+            initial_salinity, r_nano, r_ro, input_pressure, flow_rate, energy_efficiency,
+            example['техникалық_жағдай'], example['мембрана_жасы'],
+        )
+        sal_nano, sal_ro = outputs.sal_nano, outputs.sal_ro
+        total_recovery, output_flow = outputs.total_recovery, outputs.output_flow
+        energy_nano, energy_ro, total_energy = outputs.energy_nano, outputs.energy_ro, outputs.total_energy
+        operational_cost = outputs.operational_cost
 
         # Visualization
         st.subheader("📊 Тұздылықтың төмендеуі")
@@ -381,6 +511,38 @@ with tab6:
         - **Операциялық шығын**: {operational_cost:.2f} $/м³
         """)
 
+        # Sensitivity map over two sliders, the others held at their current values
+        st.subheader("🗺️ Сезімталдық картасы")
+        slider_labels = {
+            "initial_salinity": "Бастапқы тұздылық (ppm)", "r_nano": "R_nano", "r_ro": "R_ro",
+            "pressure": "Кіріс қысымы (бар)", "flow_rate": "Кіріс ағыны (м³/сағ)", "energy_efficiency": "Энергия тиімділігі (η)",
+        }
+        output_labels = {"sal_ro": "Соңғы тұздылық (ppm)", "total_energy": "Энергия шығыны (кВт·сағ/м³)", "operational_cost": "Операциялық шығын ($/м³)"}
+        col_x, col_y, col_out = st.columns(3)
+        with col_x:
+            sweep_x = st.selectbox("X осі:", list(slider_labels), format_func=slider_labels.get, key="sweep_x")
+        with col_y:
+            y_options = [k for k in slider_labels if k != sweep_x]
+            keep_choice("sweep_y", y_options)
+            sweep_y = st.selectbox("Y осі:", y_options, format_func=slider_labels.get, key="sweep_y")
+        with col_out:
+            sweep_output = st.selectbox("Көрсеткіш:", list(output_labels), format_func=output_labels.get, key="sweep_output")
+
+        grid = sweep.Grid({name: process.slider_axis(name) for name in (sweep_x, sweep_y)})
+        current = {
+            "initial_salinity": initial_salinity, "r_nano": r_nano, "r_ro": r_ro, "pressure": input_pressure,
+            "flow_rate": flow_rate, "energy_efficiency": energy_efficiency,
+            "maintenance": example['техникалық_жағдай'], "membrane_age": example['мембрана_жасы'],
+        }
+        surfaces = memo("sweep", (sweep_x, sweep_y, sweep_output, tuple(current.values())),
+                        lambda: sweep.reduce(grid, sweep.process_chunks(grid, current), sweep_x, sweep_y, [sweep_output]))
+        col_heat, col_contour = st.columns(2)
+        for column, kind in ((col_heat, "heatmap"), (col_contour, "contour")):
+            with column:
+                st.plotly_chart(sweep.heatmap_figure(
+                    grid, surfaces[sweep_output], sweep_x, sweep_y, output_labels[sweep_output], kind, theme, slider_labels,
+                ), use_container_width=True)
+
         # Optimization
         st.subheader("🔧 Оптимизация")
         st.markdown("Оптимизируйте процесс, выбрав цель и диапазон целевой солёности.")
@@ -395,43 +557,24 @@ with tab6:
         # Input for salinity range
         col_sal1, col_sal2 = st.columns(2)
         with col_sal1:
-            min_salinity = st.number_input("Минимальная целевая солёность (ppm)", 100, 500, 300, step=10)
+            min_salinity = st.number_input("Минимальная целевая солёность (ppm)", 100, 500, step=10, key="min_salinity")
         with col_sal2:
-            max_salinity = st.number_input("Максимальная целевая солёность (ppm)", min_salinity, 500, 500, step=10)
-
-        # Define objective function
-        def objective_function(params, goal=optimization_goal):
-            r_nano, r_ro, pressure = params
-            sal_nano = initial_salinity * (1 - r_nano)
-            sal_ro = sal_nano * (1 - r_ro)
-            energy = (pressure * flow_rate * (1.5 if r_ro > 0.95 else 1.0)) / (energy_efficiency * 3600)
-            cost = energy * 0.1 + (0.2 if example['техникалық_жағдай'] else 0.05) + 0.01 * (example['мембрана_жасы'] / 365)
-            
-            # Penalty for salinity outside target range
-            penalty = 0
-            if sal_ro < min_salinity or sal_ro > max_salinity:
-                penalty = 1000 + abs(sal_ro - (min_salinity + max_salinity) / 2) * 10
-            
-            # Define objective based on goal
-            if goal == "Минимизация затрат":
-                return cost + penalty
-            elif goal == "Минимизация энергопотребления":
-                return energy + penalty
-            else:  # Баланс затрат и энергии
-                return (cost + energy) / 2 + penalty
-
-        # Run optimization
-        initial_guess = [r_nano, r_ro, input_pressure]
-        bounds = [(0.5, 0.8), (0.9, 0.98), (2.0, 7.0)]
-        result = minimize(objective_function, initial_guess, bounds=bounds, method='SLSQP')
+            st.session_state.max_salinity = max(st.session_state.max_salinity, min_salinity)
+            max_salinity = st.number_input("Максимальная целевая солёность (ppm)", min_salinity, 500, step=10, key="max_salinity")
+
+        # Run optimization (smooth two-regime formulation with analytic gradients)
+        goal = {"Минимизация затрат": "cost", "Минимизация энергопотребления": "energy"}.get(optimization_goal, "balance")
+        problem_args = (
+            initial_salinity, flow_rate, energy_efficiency, example['техникалық_жағдай'], example['мембрана_жасы'],
+            min_salinity, max_salinity, goal,
+        )
+        result = memo("optimization", problem_args, lambda: optimize.solve(optimize.TwoStageProblem(*problem_args)))
 
         if result.success:
             opt_r_nano, opt_r_ro, opt_pressure = result.x
-            # Calculate optimized values
-            opt_sal_nano = initial_salinity * (1 - opt_r_nano)
-            opt_sal_ro = opt_sal_nano * (1 - opt_r_ro)
-            opt_energy = (opt_pressure * flow_rate * (1.5 if opt_r_ro > 0.95 else 1.0)) / (energy_efficiency * 3600)
-            opt_cost = opt_energy * 0.1 + (0.2 if example['техникалық_жағдай'] else 0.05) + 0.01 * (example['мембрана_жасы'] / 365)
+            opt_sal_ro = result.sal_ro
+            opt_energy = result.energy
+            opt_cost = result.cost
 
             st.success(f"""
             Оптималды параметрлер:
@@ -490,22 +633,56 @@ with tab6:
         if operational_cost > 1.0:
             st.warning("Операциялық шығын жоғары. Техникалық қызметті жоспарлаңыз немесе мембрананы ауыстырыңыз.")
 
+
 # Stage 7: Regional Statistics
-with tab7:
+def stage_region_stats():
+    px = startup.imported("plotly.express")
+
     st.markdown('<div class="stage-title">📊 7. Өңірлер бойынша статистика</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Өңірлердің орташа параметрлері мен шығындары. Ең жоғары мәндер ерекшеленеді.</div>', unsafe_allow_html=True)
-    region_summary = df.groupby("өңір")[["температура", "тұздылық", "pH", "кіру_қысымы", "шығыс_қысымы", "энергия_шығыны", "операциялық_шығын"]].mean().round(2).reset_index()
-    st.dataframe(region_summary.style.highlight_max(axis=0), use_container_width=True)
-    cost_summary = df.groupby("өңір")[["энергия_шығыны", "операциялық_шығын"]].mean().reset_index()
+    summary_cols = ["температура", "тұздылық", "pH", "кіру_қысымы", "шығыс_қысымы", "энергия_шығыны", "операциялық_шығын"]
+    region_means = memo("region_means", source_key, stats.region_means)
+    region_summary = region_means[summary_cols].round(2).reset_index()
+    st.dataframe(region_summary.style.highlight_max(axis=0, subset=summary_cols), use_container_width=True)
+    cost_summary = region_means[["энергия_шығыны", "операциялық_шығын"]].reset_index()
     fig_cost = px.bar(cost_summary, x="өңір", y=["энергия_шығыны", "операциялық_шығын"], barmode="group", title="Өңірлер бойынша шығындар", template=theme)
     st.plotly_chart(fig_cost, use_container_width=True)
 
+
 # Stage 8: Feature Importance
-with tab8:
+def stage_importance():
+    px = startup.imported("plotly.express")
+
     st.markdown('<div class="stage-title">🧠 8. Параметрлердің маңыздылығы</div>', unsafe_allow_html=True)
     st.markdown('<div class="info-box">Модельдің болжамға қай параметрлер көбірек әсер ететіні.</div>', unsafe_allow_html=True)
-    features = model.estimators_[0].feature_names_in_ if hasattr(model.estimators_[0], 'feature_names_in_') else ["өңір_код", "температура", "тұздылық", "pH", "кіру_қысымы", "су_деңгейі", "фильтр_тиімділігі", "мембрана_жасы", "техникалық_жағдай", "зауыт_сыйымдылығы"]
-    importances = np.mean([est.feature_importances_ for est in model.estimators_], axis=0)
-    df_feat = pd.DataFrame({"Фактор": features, "Маңыздылығы": importances})
+    kind = st.radio("Әдіс:", IMPORTANCE_KINDS, horizontal=True, key="importance_kind")
+    if kind == IMPORTANCE_KINDS[0]:
+        # Mean |SHAP| over the loaded data, per target: bundled rows are explained once per process,
+        # an upload's sample once per session
+        try:
+            if active_upload() is None:
+                values, _ = resources.load_sample_shap()
+            else:
+                values, _ = memo("shap_rows", (source_key, id(model)), lambda: explain.explain(df, model))
+        except ValueError as exc:
+            st.info(f"SHAP мәндері қолжетімсіз: {exc}")
+            return
+        target = st.selectbox("Нысана:", scoring.TARGETS, key="importance_target")
+        importances = explain.mean_abs(values)[target]
+        st.caption(f"{len(values):,} жол бойынша орташа |SHAP| ({target} бірліктерінде)")
+    else:
+        importances = memo("importances", id(model), lambda: scoring.feature_importances(model))
+    df_feat = pd.DataFrame({"Фактор": importances.index, "Маңыздылығы": importances.to_numpy()})
     fig_feat = px.bar(df_feat.sort_values("Маңыздылығы", ascending=True), x="Маңыздылығы", y="Фактор", orientation="h", title="Параметрлердің маңыздылығы", template=theme)
-    st.plotly_chart(fig_feat, use_container_width=True)
\ No newline at end of file
+    st.plotly_chart(fig_feat, use_container_width=True)
+
+
+STAGES = [
+    stage_dataset, stage_regions, stage_correlation, stage_training,
+    stage_prediction, stage_desalination, stage_region_stats, stage_importance,
+]
+stage = st.radio(
+    "Кезең", range(len(STAGES)), format_func=STAGE_LABELS.__getitem__, horizontal=True,
+    key="current_tab", label_visibility="collapsed",
+)
+STAGES[stage]()
@@ -0,0 +1,30 @@
+"""Convert a sensor CSV into the Parquet store partitioned by region and month.
+
+    python scripts/build_store.py data/sensor_data_kz_realistic.csv data/sensor_store
+"""
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from desalination.ingest import CHUNK_ROWS
+from desalination.schema import DATA_PATH, STORE_PATH
+from desalination.store import write_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=str(DATA_PATH))
+    parser.add_argument("root", nargs="?", default=str(STORE_PATH))
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    shutil.rmtree(args.root, ignore_errors=True)
+    manifest = write_store(args.source, args.root, args.chunk_rows)
+    print(f"{manifest['rows']:,} rows -> {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Export the pickled regression model as flat node arrays for sklearn-free serving.
+
+    python scripts/compile_forest.py models/kz_model.pkl models/kz_model.flat
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import numpy as np
+
+from desalination import resources
+from desalination.forest import FlatForest, compile_forest
+from desalination.schema import DATA_PATH, FEATURES, FOREST_PATH, MODEL_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", nargs="?", default=str(MODEL_PATH))
+    parser.add_argument("output", nargs="?", default=str(FOREST_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH), help="rows used to check the export")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    compile_forest(model).save(args.output)
+    forest = FlatForest.load(args.output)
+
+    X = resources.read_dataset(args.data)[FEATURES]
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-9, atol=1e-9)
+    print(f"{forest.n_trees} trees, {len(forest.feature):,} nodes, depth {forest.max_depth} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
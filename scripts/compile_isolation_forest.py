@@ -0,0 +1,42 @@
+"""Export the pickled IsolationForest as flat node arrays for sklearn-free scoring.
+
+Checks ``score_samples``, ``decision_function`` and ``predict`` of the export
+against the pickled model on the sensor data before reporting success.
+
+    python scripts/compile_isolation_forest.py models/anomaly_model.pkl models/anomaly_model.flat
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import numpy as np
+
+from desalination import resources
+from desalination.isolation import FlatIsolationForest, compile_isolation_forest
+from desalination.schema import ANOMALY_FOREST_PATH, ANOMALY_MODEL_PATH, DATA_PATH, FEATURES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", nargs="?", default=str(ANOMALY_MODEL_PATH))
+    parser.add_argument("output", nargs="?", default=str(ANOMALY_FOREST_PATH))
+    parser.add_argument("--data", default=str(DATA_PATH), help="rows used to check the export")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    compile_isolation_forest(model).save(args.output)
+    forest = FlatIsolationForest.load(args.output)
+
+    X = resources.read_dataset(args.data)[FEATURES]
+    np.testing.assert_allclose(forest.score_samples(X), model.score_samples(X), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(forest.decision_function(X), model.decision_function(X), rtol=1e-12, atol=1e-12)
+    mismatched = int((forest.predict(X) != model.predict(X)).sum())
+    assert mismatched == 0, f"{mismatched} rows labelled differently"
+    print(f"{forest.n_trees} trees, {len(forest.feature):,} nodes, depth {forest.max_depth} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
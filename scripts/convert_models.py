@@ -0,0 +1,83 @@
+"""Convert pickled models to the memory-mappable flat format of ``desalination.artifact``.
+
+    python scripts/convert_models.py                       # the app's two models
+    python scripts/convert_models.py models/kz_model_kazakh.pkl output/models/anomaly_model.pkl
+
+Regression forests become ``FlatForest`` files and isolation forests
+``FlatIsolationForest`` files, written next to the pickle with a ``.flat``
+suffix unless ``--out-dir`` is given. Each export is checked against the pickle
+on the dataset columns the model was fitted with, before it is written and
+again after loading it back; a file that fails the second check is removed.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+import numpy as np
+
+from desalination import artifact, resources
+from desalination.forest import compile_forest
+from desalination.isolation import compile_isolation_forest
+from desalination.schema import ANOMALY_FOREST_PATH, ANOMALY_MODEL_PATH, DATA_PATH, FOREST_PATH, MODEL_PATH
+
+
+def convert(model):
+    """``(compiled, check)``: the flat model and a function comparing it to ``model`` on the dataset ``data``."""
+    from sklearn.ensemble import IsolationForest
+
+    if isinstance(model, IsolationForest):
+        flat, method, atol = compile_isolation_forest(model), "score_samples", 1e-12
+    else:
+        flat, method, atol = compile_forest(model), "predict", 1e-9
+    features = list(flat.feature_names_in_)
+    if len(features) != model.n_features_in_:
+        raise ValueError(f"model takes {model.n_features_in_} features, compiled {len(features)}")
+
+    def check(compiled, data):
+        missing = [col for col in features if col not in data.columns]
+        if missing:
+            raise ValueError(f"dataset lacks the model's features {missing}")
+        X = data[features] if hasattr(model, "feature_names_in_") else data[features].to_numpy()
+        expected = np.asarray(getattr(model, method)(X)).reshape(len(X), -1)
+        actual = np.asarray(getattr(compiled, method)(data[features])).reshape(len(X), -1)
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=atol)
+    return flat, check
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("models", nargs="*", help=f"pickles to convert (default: {MODEL_PATH.name}, "
+                                                   f"{ANOMALY_MODEL_PATH.name})")
+    parser.add_argument("--out-dir", default=None, help="write the .flat files here instead of next to each pickle")
+    parser.add_argument("--data", default=str(DATA_PATH), help="rows used to check the exports")
+    args = parser.parse_args()
+
+    if args.models:
+        jobs = [Path(p) for p in args.models]
+        outputs = [Path(args.out_dir or p.parent) / p.with_suffix(".flat").name for p in jobs]
+    else:
+        jobs, outputs = [MODEL_PATH, ANOMALY_MODEL_PATH], [FOREST_PATH, ANOMALY_FOREST_PATH]
+        if args.out_dir:
+            outputs = [Path(args.out_dir) / p.name for p in outputs]
+
+    data = resources.read_dataset(args.data)
+    for source, output in zip(jobs, outputs):
+        model = joblib.load(source)
+        flat, check = convert(model)
+        check(flat, data)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        flat.save(output)
+        try:
+            check(artifact.load(output), data)
+        except Exception:
+            output.unlink()
+            raise
+        print(f"{source} ({source.stat().st_size / 2**20:.1f} MB) -> {output} "
+              f"({output.stat().st_size / 2**20:.1f} MB, {flat.n_trees} trees, {len(flat.feature):,} nodes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Explain every row of a sensor CSV with TreeSHAP and write the attributions.
+
+    python scripts/explain_dataset.py data/sensor_data_kz_realistic.csv -o output/data/shap.parquet
+
+The CSV is read in chunks, so the dataset does not have to fit in memory. The
+attributions are spread over ``--workers`` threads. The output has one column
+per (target, feature), named ``<target>|<feature>``, and keeps the row order of
+the input. Mean |SHAP| per feature and target is printed at the end.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from desalination import explain, ingest, resources
+from desalination.schema import DATA_PATH, FEATURES, TARGETS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=str(DATA_PATH))
+    parser.add_argument("-o", "--output", help="Parquet file of per-row attributions")
+    parser.add_argument("--chunk-rows", type=int, default=ingest.CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=-1)
+    args = parser.parse_args()
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    model = resources.load_predictor()
+    columns = [f"{target}|{feature}" for target in TARGETS for feature in FEATURES]
+    total, rows, writer = np.zeros((len(FEATURES), len(TARGETS))), 0, None
+    start = time.perf_counter()
+    for chunk in ingest.iter_chunks(args.source, args.chunk_rows):
+        values, expected = explain.explain(chunk, model, n_jobs=args.workers)
+        total += np.abs(values).sum(axis=0)
+        rows += len(values)
+        if args.output:
+            table = pa.Table.from_pandas(pd.DataFrame(
+                values.transpose(0, 2, 1).reshape(len(values), -1), columns=columns,
+            ), preserve_index=False)
+            writer = writer or pq.ParquetWriter(args.output, table.schema)
+            writer.write_table(table)
+    if writer is not None:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{rows:,} rows in {elapsed:.1f} s ({rows / max(elapsed, 1e-9):,.0f} rows/s)"
+          + (f" -> {args.output}" if args.output else ""))
+    print("expected value: " + ", ".join(f"{t} {v:.4f}" for t, v in zip(TARGETS, expected if rows else [])))
+    print(pd.DataFrame(total / max(rows, 1), index=FEATURES, columns=TARGETS).round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Per-region what-if maps of the regression model over salinity × inlet pressure.
+
+For every region the other features (including ``өңір_код``) are held at the
+median of that region's sample rows; each target gets a heatmap and a contour
+plot written as HTML.
+
+    python scripts/sweep.py --points 200 -o output/plots/sweep
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from desalination import resources, sweep
+from desalination.schema import DATA_PATH, FEATURES, REGION_COL, TARGETS
+
+X_AXIS, Y_AXIS = "тұздылық", "кіру_қысымы"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=str(DATA_PATH), help="source of the per-region feature medians")
+    parser.add_argument("--points", type=int, default=200, help="grid points per axis")
+    parser.add_argument("--salinity", type=float, nargs=2, default=(1000, 15000))
+    parser.add_argument("--pressure", type=float, nargs=2, default=(2, 7))
+    parser.add_argument("--how", choices=sweep.REDUCTIONS, default="mean")
+    parser.add_argument("-o", "--output", default="output/plots/sweep")
+    args = parser.parse_args()
+
+    model = resources.load_predictor()
+    sample = resources.load_aggregates(args.data).sample()
+    medians = sample.groupby(sample[REGION_COL].astype(str), observed=True)[FEATURES].median()
+    grid = sweep.Grid.linspace({X_AXIS: (*args.salinity, args.points), Y_AXIS: (*args.pressure, args.points)})
+    out = Path(args.output)
+    out.mkdir(parents=True, exist_ok=True)
+    for region, row in medians.iterrows():
+        code = int(row["өңір_код"])
+        fixed = {col: row[col] for col in FEATURES if col not in grid.names}
+        surfaces = sweep.reduce(grid, sweep.model_chunks(grid, fixed, model), X_AXIS, Y_AXIS, how=args.how)
+        for target in TARGETS:
+            for kind in ("heatmap", "contour"):
+                figure = sweep.heatmap_figure(grid, surfaces[target], X_AXIS, Y_AXIS, f"{region}: {target}", kind)
+                figure.write_html(out / f"{code:02d}-{target}-{kind}.html", include_plotlyjs="cdn")
+        print(f"{region}: {grid.size:,} points -> {out}")
+
+
+if __name__ == "__main__":
+    main()
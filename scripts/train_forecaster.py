@@ -0,0 +1,43 @@
+"""Train the multi-horizon pressure/energy forecaster on per-plant history and save it.
+
+    python scripts/train_forecaster.py --source data/sensor_store --horizons 1 2 4 8
+
+Reports holdout RMSE/R² per series and horizon (last 20% of time), then saves
+the forecaster refit on all rows to ``models/forecast_model.pkl``.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import joblib
+
+from desalination import forecast
+from desalination.schema import FORECAST_MODEL_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Parquet store directory or sensor CSV (default: the store, or the bundled CSV without one)")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(forecast.HORIZONS), help="readings ahead")
+    parser.add_argument("--params", help="JSON object overriding the forest parameters")
+    parser.add_argument("--workers", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=str(FORECAST_MODEL_PATH))
+    args = parser.parse_args()
+
+    params = {**forecast.PARAMS, **json.loads(args.params)} if args.params else forecast.PARAMS
+    forecaster, report = forecast.train(args.source, args.horizons, params, args.workers, args.seed)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(forecaster, args.output)
+
+    print(f"{report['rows']:,} rows ({report['train_rows']:,} train / {report['test_rows']:,} test from "
+          f"{report['cutoff']}), step {report['step']} -> {args.output}")
+    for target, values in report["metrics"].items():
+        print(f"  {target}: RMSE {values['rmse']:.4f}, MAE {values['mae']:.4f}, R² {values['r2']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Search hyperparameters with time-series CV, save a versioned model and optionally promote it.
+
+    python scripts/train_model.py --source data/sensor_store --trials 8 --workers 8 --promote
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from desalination import training
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Parquet store directory or sensor CSV (default: the store, or the bundled CSV without one)")
+    parser.add_argument("--kind", choices=training.MODEL_KINDS, default=training.MODEL_KINDS[0])
+    parser.add_argument("--trials", type=int, default=None, help="random subset of the parameter grid")
+    parser.add_argument("--grid", help="JSON object overriding the parameter grid")
+    parser.add_argument("--splits", type=int, default=training.N_SPLITS)
+    parser.add_argument("--gap", type=int, default=0, help="rows left out between train and test")
+    parser.add_argument("--max-rows", type=int, default=None, help="thin the data evenly over time")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=str(training.ARTIFACT_DIR))
+    parser.add_argument("--promote", action="store_true", help="install as models/kz_model.pkl (+ .flat)")
+    args = parser.parse_args()
+
+    grid = json.loads(args.grid) if args.grid else training.PARAM_GRID
+    model, manifest = training.train(
+        args.source, args.kind, grid, args.trials, args.splits, args.gap, args.workers, args.seed, args.max_rows,
+    )
+    path = training.save_artifact(model, manifest, args.output)
+    if args.promote:
+        training.promote(path)
+
+    for result in manifest["search"]:
+        print(f"{result['score']:.4f}  {result['params']}")
+    print(f"{manifest['rows']:,} rows, {manifest['timing']['total_seconds']:.1f} s -> {path}"
+          + (" (promoted)" if args.promote else ""))
+    for target, values in manifest["metrics"].items():
+        print(f"  {target}: RMSE {values['rmse']:.4f} ± {values['rmse_std']:.4f}, R² {values['r2']:.4f}")
+
+
+if __name__ == "__main__":
+    main()